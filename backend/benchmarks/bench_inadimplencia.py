@@ -0,0 +1,90 @@
+"""Benchmark da consulta de inadimplência (N+1 antigo x consulta agregada).
+
+Uso: python benchmarks/bench_inadimplencia.py [--membros 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+from src.models import db
+from src.models.membro import Membro, PagamentoMensalidade
+from src.services.inadimplencia import contar_inadimplentes, listar_inadimplentes, mes_atual
+
+
+def criar_app(caminho_db):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{caminho_db}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def popular(total_membros, mes):
+    db.session.execute(Membro.__table__.insert(), [
+        {'nome': f'Membro {i:06d}', 'valor_mensalidade': 50.0, 'ativo': True}
+        for i in range(total_membros)
+    ])
+    # Dois terços dos membros pagaram o mês
+    db.session.execute(PagamentoMensalidade.__table__.insert(), [
+        {'membro_id': i, 'mes_referencia': mes, 'valor_pago': 50.0}
+        for i in range(1, total_membros + 1) if i % 3
+    ])
+    db.session.commit()
+
+
+def legado(mes):
+    # Laço N+1 que existia em get_membros_inadimplentes / get_resumo_membros
+    inadimplentes = []
+    for membro in Membro.query.filter_by(ativo=True).all():
+        pagamento_mes = PagamentoMensalidade.query.filter_by(
+            membro_id=membro.id,
+            mes_referencia=mes
+        ).first()
+        if not pagamento_mes and membro.valor_mensalidade > 0:
+            inadimplentes.append(membro.to_dict())
+    return inadimplentes
+
+
+def medir(nome, funcao, contador):
+    db.session.expunge_all()
+    contador['consultas'] = 0
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = (time.perf_counter() - inicio) * 1000
+    tamanho = resultado if isinstance(resultado, int) else len(resultado)
+    print(f'{nome:<28} {contador["consultas"]:>8} consultas {duracao:>10.1f} ms  ({tamanho} inadimplentes)')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--membros', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = criar_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            mes = mes_atual()
+            popular(args.membros, mes)
+
+            contador = {'consultas': 0}
+
+            @event.listens_for(db.engine, 'before_cursor_execute')
+            def contar(*_):
+                contador['consultas'] += 1
+
+            print(f'{args.membros} membros, mês {mes}')
+            medir('legado (N+1)', lambda: legado(mes), contador)
+            medir('listar_inadimplentes', lambda: listar_inadimplentes([mes]), contador)
+            medir('contar_inadimplentes', lambda: contar_inadimplentes([mes]), contador)
+            medir('listar_inadimplentes 12m', lambda: listar_inadimplentes([f'{mes[:4]}-{m:02d}' for m in range(1, 13)]), contador)
+
+
+if __name__ == '__main__':
+    main()
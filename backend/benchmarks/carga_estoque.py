@@ -0,0 +1,109 @@
+"""Teste de carga: leituras concorrentes enquanto movimentar_estoque escreve.
+
+Sobe o app num servidor HTTP com threads e mede a latência das leituras
+com journal_mode WAL e com o modo antigo (DELETE).
+
+Uso: python benchmarks/carga_estoque.py [--segundos 5] [--leitores 8] [--escritores 2]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+from src.config import configuracao_padrao
+from src.main import create_app
+
+TOTAL_MATERIAIS = 200
+
+
+def requisitar(url, dados=None):
+    corpo = json.dumps(dados).encode() if dados is not None else None
+    req = urllib.request.Request(url, data=corpo, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=30) as resposta:
+        return resposta.read()
+
+
+def rodar(journal_mode, args, tmp):
+    pragmas = dict(configuracao_padrao()['SQLITE_PRAGMAS'], journal_mode=journal_mode)
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, f'carga_{journal_mode}.db')}",
+        'SQLITE_PRAGMAS': pragmas
+    })
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    base = f'http://127.0.0.1:{servidor.server_port}/api'
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    requisitar(f'{base}/import/materiais', [
+        {'nome': f'Material {i}', 'categoria': 'Velas', 'preco_unitario': 1, 'quantidade_atual': 1000}
+        for i in range(TOTAL_MATERIAIS)
+    ])
+
+    fim = time.monotonic() + args.segundos
+    latencias, escritas, erros = [], [0], [0]
+    lock = threading.Lock()
+
+    def leitor(n):
+        while time.monotonic() < fim:
+            inicio = time.perf_counter()
+            try:
+                requisitar(f'{base}/materiais/{n % TOTAL_MATERIAIS + 1}')
+            except Exception:
+                with lock:
+                    erros[0] += 1
+                continue
+            with lock:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            n += 1
+
+    def escritor(n):
+        while time.monotonic() < fim:
+            try:
+                requisitar(f'{base}/materiais/{n % TOTAL_MATERIAIS + 1}/movimentar', {
+                    'tipo_movimentacao': 'entrada', 'quantidade': 1, 'motivo': 'carga'
+                })
+                with lock:
+                    escritas[0] += 1
+            except Exception:
+                with lock:
+                    erros[0] += 1
+            n += 7
+
+    threads = [threading.Thread(target=leitor, args=(i,)) for i in range(args.leitores)]
+    threads += [threading.Thread(target=escritor, args=(i,)) for i in range(args.escritores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    servidor.shutdown()
+
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95)] if latencias else 0
+    print(f'{journal_mode:<7} leituras={len(latencias):>6} escritas={escritas[0]:>5} erros={erros[0]:>3} '
+          f'p50={statistics.median(latencias) if latencias else 0:>7.2f}ms p95={p95:>7.2f}ms '
+          f'max={latencias[-1] if latencias else 0:>8.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--leitores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        for modo in ('DELETE', 'WAL'):
+            rodar(modo, args, tmp)
+
+
+if __name__ == '__main__':
+    main()
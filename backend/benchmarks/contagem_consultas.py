@@ -0,0 +1,107 @@
+"""Regressão de N+1: cada rota de listagem deve executar um número fixo de
+comandos SQL, independente de quantas linhas devolve.
+
+Uso: python benchmarks/contagem_consultas.py   (sai com código 1 se alguma
+rota executar mais comandos com mais dados). Roda também no pytest
+(tests/test_consultas.py).
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from src.main import create_app
+from src.models import db
+from src.models.estoque import Material, MovimentacaoEstoque
+from src.models.financeiro import Transacao
+from src.models.membro import Membro, PagamentoMensalidade
+
+ROTAS = [
+    '/api/transacoes',
+    '/api/pagamentos-mensalidade',
+    '/api/membros/1/pagamentos',
+    '/api/membros',
+    '/api/materiais',
+    '/api/movimentacoes',
+    '/api/materiais/1/movimentacoes',
+    '/api/membros/inadimplentes',
+]
+
+MODELOS_POPULADOS = (Membro, Material, Transacao, PagamentoMensalidade, MovimentacaoEstoque)
+
+
+def _exigir(resposta):
+    # Uma carga que falha em silêncio faria a contagem rodar sobre tabelas vazias
+    if resposta.status_code >= 400:
+        raise RuntimeError(f'falha ao popular: {resposta.status_code} {resposta.get_data(as_text=True)[:200]}')
+    return resposta
+
+
+def popular(cliente, quantidade):
+    _exigir(cliente.post('/api/import/membros', json=[
+        {'nome': f'Membro {i}', 'valor_mensalidade': 50} for i in range(quantidade)
+    ]))
+    _exigir(cliente.post('/api/import/materiais', json=[
+        {'nome': f'Material {i}', 'categoria': 'Velas', 'preco_unitario': 1, 'quantidade_atual': 10}
+        for i in range(quantidade)
+    ]))
+    _exigir(cliente.post('/api/import/transacoes', json=[
+        {'descricao': f'T{i}', 'valor': 1, 'tipo': 'receita', 'categoria': 'Doações'} for i in range(quantidade)
+    ]))
+    for i in range(quantidade):
+        # Um pai diferente por linha, para que um lazy load por linha apareça na contagem
+        _exigir(cliente.post('/api/pagamentos-mensalidade', json={
+            'membro_id': i + 1, 'mes_referencia': '2024-01', 'valor_pago': 50
+        }))
+        _exigir(cliente.post(f'/api/materiais/{i + 1}/movimentar', json={
+            'tipo_movimentacao': 'entrada', 'quantidade': 1, 'motivo': 'teste'
+        }))
+
+
+def linhas_por_tabela():
+    return {modelo.__tablename__: modelo.query.count() for modelo in MODELOS_POPULADOS}
+
+
+def contar(app, quantidade):
+    """Popula o banco e retorna ({tabela: linhas}, {rota: comandos SQL})."""
+    with app.app_context():
+        cliente = app.test_client()
+        popular(cliente, quantidade)
+        linhas = linhas_por_tabela()
+        contador = {'n': 0}
+
+        def incrementar(*_):
+            contador['n'] += 1
+
+        event.listen(db.engine, 'before_cursor_execute', incrementar)
+        comandos = {}
+        for rota in ROTAS:
+            contador['n'] = 0
+            _exigir(cliente.get(rota))
+            comandos[rota] = contador['n']
+        event.remove(db.engine, 'before_cursor_execute', incrementar)
+        db.engine.dispose()
+    return linhas, comandos
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        linhas_poucos, poucos = contar(create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'a.db')}"}), 5)
+        linhas_muitos, muitos = contar(create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'b.db')}"}), 80)
+
+    falhas = 0
+    for tabela in linhas_poucos:
+        if linhas_poucos[tabela] < 5 or linhas_muitos[tabela] < 80:
+            falhas += 1
+            print(f"FALHA  {tabela}: dados não foram populados ({linhas_poucos[tabela]} / {linhas_muitos[tabela]} linhas)")
+    for rota in ROTAS:
+        ok = poucos[rota] == muitos[rota]
+        falhas += not ok
+        print(f"{'ok' if ok else 'FALHA':<6} {rota:<36} {poucos[rota]} comandos (5 linhas) / {muitos[rota]} (80 linhas)")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Gerador de um templo sintético para benchmarks.
+
+Insere em lotes (executemany) diretamente nas tabelas dos modelos, sem
+montar instâncias ORM, para que volumes de milhões de linhas caibam em
+memória constante.
+"""
+import random
+from datetime import date, datetime, timedelta
+from src.models import db
+from src.models.estoque import Material, MovimentacaoEstoque
+from src.models.financeiro import Transacao
+from src.models.membro import Membro, PagamentoMensalidade
+from src.routes.estoque import CATEGORIAS_MATERIAIS
+from src.routes.financeiro import CATEGORIAS_DESPESA, CATEGORIAS_RECEITA
+from src.services.estoque import reconstruir_resumo_estoque
+from src.services.historico_estoque import gerar_snapshots
+from src.services.previsao_estoque import reconstruir_consumo
+from src.services.resumo_financeiro import reconstruir_resumo
+
+LOTE = 10000
+VOLUMES_PADRAO = {
+    'membros': 5000,
+    'meses_pagamento': 12,
+    'transacoes': 200000,
+    'materiais': 500,
+    'movimentacoes': 50000
+}
+
+
+def _inserir(tabela, linhas):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= LOTE:
+            db.session.execute(tabela.insert(), lote)
+            lote = []
+    if lote:
+        db.session.execute(tabela.insert(), lote)
+    db.session.commit()
+
+
+def _meses(total, hoje):
+    ano, mes = hoje.year, hoje.month
+    for _ in range(total):
+        yield f'{ano:04d}-{mes:02d}'
+        mes -= 1
+        if mes == 0:
+            ano, mes = ano - 1, 12
+
+
+def popular(volumes=None, semente=42, progresso=print):
+    volumes = dict(VOLUMES_PADRAO, **(volumes or {}))
+    rnd = random.Random(semente)
+    agora = datetime.utcnow()
+    hoje = agora.date()
+    dias_historico = 365 * 5
+
+    progresso(f"membros: {volumes['membros']}")
+    _inserir(Membro.__table__, (
+        {
+            'nome': f'Membro {i:07d}',
+            'telefone': f'(11) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}',
+            'email': f'membro{i}@example.com',
+            'data_ingresso': hoje - timedelta(days=rnd.randint(0, dias_historico)),
+            'valor_mensalidade': rnd.choice([0.0, 30.0, 50.0, 80.0, 100.0]),
+            'ativo': rnd.random() > 0.1,
+            'created_at': agora,
+            'updated_at': agora
+        }
+        for i in range(volumes['membros'])
+    ))
+
+    meses = list(_meses(volumes['meses_pagamento'], hoje))
+    progresso(f"pagamentos: até {volumes['membros'] * len(meses)}")
+    _inserir(PagamentoMensalidade.__table__, (
+        {
+            'membro_id': membro_id,
+            'mes_referencia': mes,
+            'valor_pago': 50.0,
+            'data_pagamento': date(int(mes[:4]), int(mes[5:]), rnd.randint(1, 28)),
+            'created_at': agora
+        }
+        for membro_id in range(1, volumes['membros'] + 1)
+        for mes in meses
+        if rnd.random() < 0.8
+    ))
+
+    progresso(f"transações: {volumes['transacoes']}")
+    _inserir(Transacao.__table__, (
+        {
+            'descricao': f'Lançamento {i}',
+            'valor': round(rnd.uniform(5, 2000), 2),
+            'tipo': tipo,
+            'categoria': rnd.choice(CATEGORIAS_RECEITA if tipo == 'receita' else CATEGORIAS_DESPESA),
+            'data': agora - timedelta(minutes=rnd.randint(0, dias_historico * 24 * 60)),
+            'created_at': agora
+        }
+        for i, tipo in ((i, 'receita' if rnd.random() < 0.6 else 'despesa') for i in range(volumes['transacoes']))
+    ))
+    reconstruir_resumo()
+    db.session.commit()
+
+    progresso(f"materiais: {volumes['materiais']}")
+    _inserir(Material.__table__, (
+        {
+            'nome': f'Material {i:05d}',
+            'categoria': rnd.choice(CATEGORIAS_MATERIAIS),
+            'unidade_medida': 'unidade',
+            'preco_unitario': round(rnd.uniform(1, 200), 2),
+            'quantidade_atual': float(rnd.randint(0, 100)),
+            'quantidade_minima': 5.0,
+            'fornecedor': f'Fornecedor {rnd.randint(1, 30)}',
+            'ativo': True,
+            'created_at': agora,
+            'updated_at': agora
+        }
+        for i in range(volumes['materiais'])
+    ))
+
+    progresso(f"movimentações: {volumes['movimentacoes']}")
+    _inserir(MovimentacaoEstoque.__table__, (
+        {
+            'material_id': rnd.randint(1, volumes['materiais']),
+            'tipo_movimentacao': rnd.choice(['entrada', 'saida', 'saida', 'saida']),
+            'quantidade': float(rnd.randint(1, 10)),
+            'motivo': 'Gerado',
+            'data_movimentacao': agora - timedelta(minutes=rnd.randint(0, dias_historico * 24 * 60)),
+            'created_at': agora
+        }
+        for _ in range(volumes['movimentacoes'])
+    ))
+    reconstruir_resumo_estoque()
+    reconstruir_consumo()
+    db.session.commit()
+    gerar_snapshots()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
@@ -0,0 +1,70 @@
+"""Verifica com EXPLAIN QUERY PLAN que as consultas quentes usam índices.
+
+Uso: python benchmarks/plano_consultas.py   (sai com código 1 se alguma
+consulta fizer varredura completa de tabela). O pytest (tests/test_consultas.py)
+confere os mesmos planos num banco populado e com ANALYZE.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import text
+from src.models import db
+from src.migrations import aplicar_migracoes
+
+CONSULTAS = {
+    'transacoes por data': 'SELECT * FROM transacoes ORDER BY data DESC, id DESC LIMIT 50',
+    'transacoes por tipo/categoria': "SELECT categoria, SUM(valor) FROM transacoes WHERE tipo = 'receita' GROUP BY categoria",
+    'pagamento do membro no mês': "SELECT id FROM pagamentos_mensalidade WHERE membro_id = 1 AND mes_referencia = '2024-01'",
+    'receita do mês': "SELECT SUM(valor_pago) FROM pagamentos_mensalidade WHERE mes_referencia = '2024-01'",
+    'pagamentos por data': 'SELECT * FROM pagamentos_mensalidade ORDER BY data_pagamento DESC, id DESC LIMIT 50',
+    'movimentações do material': 'SELECT * FROM movimentacoes_estoque WHERE material_id = 1 ORDER BY data_movimentacao DESC',
+    'últimas movimentações': 'SELECT * FROM movimentacoes_estoque ORDER BY data_movimentacao DESC LIMIT 50',
+    'materiais ativos': 'SELECT * FROM materiais WHERE ativo = 1 ORDER BY categoria, nome',
+    'alertas de estoque': 'SELECT * FROM materiais WHERE ativo = 1 AND quantidade_atual <= quantidade_minima ORDER BY categoria, nome, id LIMIT 50',
+    'consumo por material': "SELECT m.id, SUM(c.quantidade) FROM materiais m LEFT JOIN consumo_diario_material c ON c.material_id = m.id AND c.dia >= '2024-01-01' WHERE m.ativo = 1 GROUP BY m.id",
+    'membros ativos': 'SELECT * FROM membros WHERE ativo = 1 ORDER BY nome',
+}
+
+
+# Consultas que leem por definição todas as linhas (ativas) de uma tabela pequena;
+# com estatísticas (ANALYZE) o SQLite prefere varrê-la a usar o índice de ativo
+VARREDURAS_ESPERADAS = {
+    'consumo por material': {'SCAN m'},
+}
+
+
+def varreduras(plano, esperadas=()):
+    # Linhas "SCAN <tabela>" sem índice indicam leitura da tabela inteira
+    return [linha for linha in plano if linha.startswith('SCAN') and 'INDEX' not in linha and linha not in esperadas]
+
+
+def planos(conn):
+    """{nome: (linhas do plano, varreduras completas)} para cada consulta quente."""
+    resultado = {}
+    for nome, sql in CONSULTAS.items():
+        plano = [row[3] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+        resultado[nome] = (plano, varreduras(plano, VARREDURAS_ESPERADAS.get(nome, ())))
+    return resultado
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'plano.db')}"
+        db.init_app(app)
+        falhas = 0
+        with app.app_context():
+            aplicar_migracoes()
+            with db.engine.connect() as conn:
+                for nome, (plano, ruins) in planos(conn).items():
+                    falhas += bool(ruins)
+                    print(f"{'FALHA' if ruins else 'ok':<6} {nome}: {' | '.join(plano)}")
+        sys.exit(1 if falhas else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Teste de estresse: centenas de saídas paralelas sobre o mesmo estoque.
+
+Verifica que o saldo final nunca fica negativo e que cada saída aceita
+corresponde exatamente a uma movimentação registrada.
+
+Uso: python benchmarks/stress_estoque.py [--requisicoes 400] [--threads 32] [--estoque 100]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+from src.main import create_app
+from src.models import db
+from src.models.estoque import Material, MovimentacaoEstoque
+
+
+def postar(url, dados):
+    req = urllib.request.Request(url, data=json.dumps(dados).encode(), headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resposta:
+            return resposta.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requisicoes', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--estoque', type=int, default=100)
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'stress.db')}"})
+        servidor = make_server('127.0.0.1', 0, app, threaded=True)
+        base = f'http://127.0.0.1:{servidor.server_port}/api'
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+        for nome in ('Vela branca', 'Pemba'):
+            postar(f'{base}/materiais', {'nome': nome, 'categoria': 'Velas', 'preco_unitario': 1, 'quantidade_atual': args.estoque})
+
+        def requisicao(i):
+            if i % 4 == 0:
+                # Lote cruzando os dois materiais
+                return postar(f'{base}/movimentacoes/lote', {'motivo': 'Gira', 'movimentacoes': [
+                    {'material_id': 1, 'tipo_movimentacao': 'saida', 'quantidade': 1},
+                    {'material_id': 2, 'tipo_movimentacao': 'saida', 'quantidade': 1}
+                ]})
+            return postar(f'{base}/materiais/{i % 2 + 1}/movimentar', {
+                'tipo_movimentacao': 'saida', 'quantidade': 1, 'motivo': 'stress'
+            })
+
+        with ThreadPoolExecutor(args.threads) as executor:
+            status = list(executor.map(requisicao, range(args.requisicoes)))
+        servidor.shutdown()
+
+        with app.app_context():
+            falhas = 0
+            for material in Material.query.order_by(Material.id):
+                saidas = MovimentacaoEstoque.query.filter_by(material_id=material.id, tipo_movimentacao='saida').count()
+                ok = material.quantidade_atual >= 0 and material.quantidade_atual == args.estoque - saidas
+                falhas += not ok
+                print(f'{material.nome:<12} saldo={material.quantidade_atual:>6} saídas registradas={saidas:>4} '
+                      f"{'ok' if ok else 'INCONSISTENTE'}")
+            db.engine.dispose()
+        print(f"respostas: {status.count(200)} aceitas, {status.count(400)} recusadas por saldo, "
+              f"{len(status) - status.count(200) - status.count(400)} outras")
+        sys.exit(1 if falhas else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Suíte de benchmarks das rotas de financeiro, membro e estoque.
+
+Popula um SQLite com o gerador sintético, exercita cada rota pelo test
+client do Flask e reporta p50/p95 de latência, comandos SQL por requisição
+e pico de memória (tracemalloc).
+
+Uso:
+    python benchmarks/suite.py --transacoes 2000000 --membros 50000 --movimentacoes 500000 --db /tmp/bench.db
+    python benchmarks/suite.py --salvar baseline.json
+    python benchmarks/suite.py --comparar baseline.json --tolerancia 0.25
+
+Com --db, um banco já populado é reaproveitado entre execuções.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from benchmarks.gerador import VOLUMES_PADRAO, popular
+from src.main import create_app
+from src.models import db
+from src.models.membro import Membro
+from src.services.cache import cache_respostas
+
+_seq = count(1)
+
+# (nome, método, url, corpo) — url e corpo recebem um número sequencial
+CENARIOS = [
+    # financeiro
+    ('GET /transacoes', 'GET', lambda i: '/api/transacoes', None),
+    ('GET /transacoes filtrado', 'GET', lambda i: '/api/transacoes?tipo=despesa&data_inicio=2024-01-01&limit=200', None),
+    ('POST /transacoes', 'POST', lambda i: '/api/transacoes',
+     lambda i: {'descricao': f'Bench {i}', 'valor': 10, 'tipo': 'receita', 'categoria': 'Doações'}),
+    ('GET /transacoes/<id>', 'GET', lambda i: f'/api/transacoes/{i}', None),
+    ('PUT /transacoes/<id>', 'PUT', lambda i: f'/api/transacoes/{i}', lambda i: {'valor': 11}),
+    ('DELETE /transacoes/<id>', 'DELETE', lambda i: f'/api/transacoes/{next(_seq)}', None),
+    ('GET /resumo-financeiro', 'GET', lambda i: '/api/resumo-financeiro', None),
+    ('GET /resumo-financeiro?periodo', 'GET', lambda i: '/api/resumo-financeiro?periodo=2024', None),
+    ('GET /categorias', 'GET', lambda i: '/api/categorias', None),
+    # membro
+    ('GET /membros', 'GET', lambda i: '/api/membros', None),
+    ('POST /membros', 'POST', lambda i: '/api/membros', lambda i: {'nome': f'Bench {i}', 'valor_mensalidade': 50}),
+    ('GET /membros/<id>', 'GET', lambda i: f'/api/membros/{i}', None),
+    ('PUT /membros/<id>', 'PUT', lambda i: f'/api/membros/{i}', lambda i: {'telefone': '0'}),
+    ('GET /membros/<id>/pagamentos', 'GET', lambda i: f'/api/membros/{i}/pagamentos', None),
+    ('GET /pagamentos-mensalidade', 'GET', lambda i: '/api/pagamentos-mensalidade', None),
+    ('POST /pagamentos-mensalidade', 'POST', lambda i: '/api/pagamentos-mensalidade',
+     lambda i: {'membro_id': i, 'mes_referencia': '1999-01', 'valor_pago': 50}),
+    ('GET /membros/inadimplentes', 'GET', lambda i: '/api/membros/inadimplentes', None),
+    ('GET /membros/<id>/extrato', 'GET', lambda i: f'/api/membros/{i}/extrato', None),
+    ('GET /extratos', 'GET', lambda i: '/api/extratos', None),
+    ('GET /resumo-membros', 'GET', lambda i: '/api/resumo-membros', None),
+    # estoque
+    ('GET /materiais', 'GET', lambda i: '/api/materiais', None),
+    ('POST /materiais', 'POST', lambda i: '/api/materiais',
+     lambda i: {'nome': f'Bench {i}', 'categoria': 'Velas', 'preco_unitario': 1, 'quantidade_atual': 10}),
+    ('GET /materiais/<id>', 'GET', lambda i: f'/api/materiais/{i}', None),
+    ('PUT /materiais/<id>', 'PUT', lambda i: f'/api/materiais/{i}', lambda i: {'fornecedor': 'Bench'}),
+    ('POST /materiais/<id>/movimentar', 'POST', lambda i: f'/api/materiais/{i}/movimentar',
+     lambda i: {'tipo_movimentacao': 'entrada', 'quantidade': 1, 'motivo': 'bench'}),
+    ('POST /movimentacoes/lote', 'POST', lambda i: '/api/movimentacoes/lote',
+     lambda i: {'motivo': 'bench', 'movimentacoes': [
+         {'material_id': i, 'tipo_movimentacao': 'entrada', 'quantidade': 1},
+         {'material_id': i + 1, 'tipo_movimentacao': 'entrada', 'quantidade': 1}
+     ]}),
+    ('GET /materiais/<id>/movimentacoes', 'GET', lambda i: f'/api/materiais/{i}/movimentacoes', None),
+    ('GET /movimentacoes', 'GET', lambda i: '/api/movimentacoes', None),
+    ('GET /resumo-estoque', 'GET', lambda i: '/api/resumo-estoque', None),
+    ('GET /alertas-estoque', 'GET', lambda i: '/api/alertas-estoque', None),
+    ('GET /previsao-consumo', 'GET', lambda i: '/api/previsao-consumo', None),
+    ('GET /reposicao', 'GET', lambda i: '/api/reposicao', None),
+    ('GET /posicao-estoque', 'GET', lambda i: f'/api/posicao-estoque?data=2024-{i % 12 + 1:02d}-15', None),
+    ('GET /consistencia-estoque', 'GET', lambda i: '/api/consistencia-estoque', None),
+    ('GET /dashboard', 'GET', lambda i: '/api/dashboard', None),
+    ('GET /auditoria', 'GET', lambda i: f'/api/auditoria?entidade=membros&registro_id={i}', None),
+    ('GET /categorias-materiais', 'GET', lambda i: '/api/categorias-materiais', None),
+    # busca
+    ('GET /busca', 'GET', lambda i: f'/api/busca?q=material {i % 500:05d}', None),
+    ('GET /busca transacoes', 'GET', lambda i: f'/api/busca?q=lancamento {i}&tipos=transacoes', None),
+    ('DELETE /materiais/<id>', 'DELETE', lambda i: f'/api/materiais/{i}', None),
+    ('DELETE /membros/<id>', 'DELETE', lambda i: f'/api/membros/{i}', None),
+]
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def executar(cliente, metodo, url, corpo):
+    resposta = cliente.open(url, method=metodo, json=corpo)
+    if resposta.status_code >= 500:
+        raise RuntimeError(f'{metodo} {url} -> {resposta.status_code}')
+    resposta.get_data()
+    return resposta.status_code
+
+
+def medir(cliente, repeticoes, com_cache):
+    comandos = {'n': 0}
+
+    def contar(*_):
+        comandos['n'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    resultados = {}
+    for nome, metodo, url, corpo in CENARIOS:
+        latencias, sql = [], []
+        for i in range(1, repeticoes + 1):
+            if not com_cache:
+                cache_respostas.limpar()
+            comandos['n'] = 0
+            inicio = time.perf_counter()
+            executar(cliente, metodo, url(i), corpo(i) if corpo else None)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            sql.append(comandos['n'])
+
+        # Pico de memória numa execução separada, para não distorcer a latência
+        if not com_cache:
+            cache_respostas.limpar()
+        tracemalloc.start()
+        executar(cliente, metodo, url(repeticoes + 1), corpo(repeticoes + 1) if corpo else None)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resultados[nome] = {
+            'p50_ms': round(statistics.median(latencias), 3),
+            'p95_ms': round(percentil(latencias, 0.95), 3),
+            'sql_por_requisicao': max(sql),
+            'pico_memoria_kb': round(pico / 1024, 1)
+        }
+    event.remove(db.engine, 'before_cursor_execute', contar)
+    return resultados
+
+
+def comparar(resultados, baseline, tolerancia):
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = baseline.get('resultados', {}).get(nome)
+        if not anterior:
+            continue
+        # p50 é mais estável que p95 com poucas repetições; ignora variações < 2 ms
+        if atual['p50_ms'] > anterior['p50_ms'] * (1 + tolerancia) and atual['p50_ms'] - anterior['p50_ms'] > 2:
+            regressoes.append(f"{nome}: p50 {anterior['p50_ms']} -> {atual['p50_ms']} ms")
+        if atual['sql_por_requisicao'] > anterior['sql_por_requisicao']:
+            regressoes.append(f"{nome}: SQL {anterior['sql_por_requisicao']} -> {atual['sql_por_requisicao']}")
+        if atual['pico_memoria_kb'] > anterior['pico_memoria_kb'] * (1 + tolerancia) + 64:
+            regressoes.append(f"{nome}: memória {anterior['pico_memoria_kb']} -> {atual['pico_memoria_kb']} KiB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for volume, padrao in VOLUMES_PADRAO.items():
+        parser.add_argument(f'--{volume.replace("_", "-")}', dest=volume, type=int, default=padrao)
+    parser.add_argument('--db', help='arquivo SQLite a reaproveitar (padrão: temporário)')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--com-cache', action='store_true', help='não limpa o cache de respostas entre requisições')
+    parser.add_argument('--salvar', help='grava os resultados como baseline JSON')
+    parser.add_argument('--comparar', help='compara com um baseline JSON e falha em regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.25)
+    args = parser.parse_args()
+    volumes = {volume: getattr(args, volume) for volume in VOLUMES_PADRAO}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = args.db or os.path.join(tmp, 'bench.db')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(caminho)}'})
+        with app.app_context():
+            if Membro.query.first() is None:
+                inicio = time.perf_counter()
+                popular(volumes, progresso=lambda msg: print(f'gerando {msg}', file=sys.stderr))
+                print(f'dados gerados em {time.perf_counter() - inicio:.1f}s', file=sys.stderr)
+            resultados = medir(app.test_client(), args.repeticoes, args.com_cache)
+            app.extensions['auditoria'].parar()
+            db.engine.dispose()
+
+    print(f"{'rota':<38} {'p50 ms':>9} {'p95 ms':>9} {'SQL':>5} {'pico KiB':>10}")
+    for nome, r in resultados.items():
+        print(f"{nome:<38} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['sql_por_requisicao']:>5} {r['pico_memoria_kb']:>10.1f}")
+
+    if args.salvar:
+        with open(args.salvar, 'w') as arquivo:
+            json.dump({'volumes': volumes, 'resultados': resultados}, arquivo, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+        for regressao in regressoes:
+            print(f'REGRESSÃO {regressao}')
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == '__main__':
+    main()
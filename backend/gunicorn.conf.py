@@ -0,0 +1,32 @@
+"""Configuração do gunicorn para produção.
+
+Uso (a partir de backend/): gunicorn -c gunicorn.conf.py src.wsgi:app
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Cada cliente de /api/changes/stream ocupa uma thread: MAX_STREAMS (padrão 2) deve ficar abaixo disto
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+keepalive = 5
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = '-'
+
+
+def on_starting(server):
+    # Aplica as migrações uma única vez no processo mestre, antes dos workers
+    from sqlalchemy import create_engine
+    from src.config import DATABASE_DIR, configuracao_padrao
+    from src.migrations import aplicar_migracoes
+
+    url = configuracao_padrao()['SQLALCHEMY_DATABASE_URI']
+    if url.startswith(f'sqlite:///{DATABASE_DIR}'):
+        os.makedirs(DATABASE_DIR, exist_ok=True)
+    engine = create_engine(url)
+    aplicar_migracoes(engine)
+    engine.dispose()
+    os.environ['APLICAR_MIGRACOES'] = '0'
@@ -0,0 +1,79 @@
+"""Configuração do app a partir de variáveis de ambiente.
+
+DATABASE_URL          URL do SQLAlchemy (padrão: SQLite em src/database/app.db)
+DB_POOL_SIZE          conexões mantidas no pool por processo (padrão: 5)
+DB_MAX_OVERFLOW       conexões extras permitidas em picos (padrão: 10)
+DB_POOL_TIMEOUT       segundos esperando uma conexão livre (padrão: 30)
+SQLITE_JOURNAL_MODE   WAL por padrão; DELETE volta ao comportamento antigo
+SQLITE_BUSY_TIMEOUT   ms que um escritor espera pelo lock (padrão: 5000)
+SQLITE_MMAP_SIZE      bytes mapeados em memória (padrão: 256 MiB)
+SQLITE_CACHE_SIZE     páginas de cache; negativo = KiB (padrão: -64000)
+JOBS_DIR              onde ficam os resultados dos jobs (padrão: src/database/jobs)
+JOBS_WORKERS          threads de jobs por processo (padrão: 2)
+JOBS_RETENCAO_HORAS   por quanto tempo um resultado fica disponível (padrão: 24)
+JOBS_MAX_MB           espaço total dos resultados; acima disso os mais antigos saem (padrão: 1024)
+ALTERACOES_RETENCAO_DIAS  dias que o feed de alterações guarda (padrão: 30)
+AUDITORIA_DATABASE_URL    banco separado da trilha de auditoria (padrão: ao lado do banco
+                          principal, app.db -> app-auditoria.db)
+"""
+import os
+from sqlalchemy.engine import make_url
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_DIR = os.path.join(BASE_DIR, 'database')
+
+
+def _inteiro(nome, padrao):
+    return int(os.environ.get(nome, padrao))
+
+
+def url_auditoria(url_principal):
+    """Banco da auditoria ao lado do principal, para que cada banco (inclusive
+    os temporários de testes e benchmarks) tenha a sua própria trilha."""
+    url = make_url(url_principal)
+    if url.get_backend_name() != 'sqlite':
+        return f"sqlite:///{os.path.join(DATABASE_DIR, 'auditoria.db')}"
+    if not url.database or url.database == ':memory:':
+        return 'sqlite://'
+    base, extensao = os.path.splitext(url.database)
+    return url.set(database=f'{base}-auditoria{extensao or ".db"}').render_as_string(hide_password=False)
+
+
+def configuracao_padrao():
+    url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(DATABASE_DIR, 'app.db')}"
+
+    opcoes_engine = {'pool_pre_ping': True}
+    if url != 'sqlite://' and ':memory:' not in url:
+        opcoes_engine.update({
+            'pool_size': _inteiro('DB_POOL_SIZE', 5),
+            'max_overflow': _inteiro('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _inteiro('DB_POOL_TIMEOUT', 30)
+        })
+    if url.startswith('sqlite'):
+        # O Flask-SQLAlchemy devolve a conexão ao pool no fim de cada requisição,
+        # e a próxima pode vir de outra thread
+        opcoes_engine['connect_args'] = {'check_same_thread': False}
+    else:
+        opcoes_engine['pool_recycle'] = 1800
+
+    return {
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT'),
+        'SQLALCHEMY_DATABASE_URI': url,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SQLALCHEMY_ENGINE_OPTIONS': opcoes_engine,
+        'JOBS_DIR': os.environ.get('JOBS_DIR') or os.path.join(DATABASE_DIR, 'jobs'),
+        'JOBS_WORKERS': _inteiro('JOBS_WORKERS', 2),
+        'JOBS_RETENCAO_HORAS': _inteiro('JOBS_RETENCAO_HORAS', 24),
+        'JOBS_MAX_MB': _inteiro('JOBS_MAX_MB', 1024),
+        'ALTERACOES_RETENCAO_DIAS': _inteiro('ALTERACOES_RETENCAO_DIAS', 30),
+        # None: derivado de SQLALCHEMY_DATABASE_URI no create_app (ver url_auditoria)
+        'AUDITORIA_DATABASE_URL': os.environ.get('AUDITORIA_DATABASE_URL'),
+        'SQLITE_PRAGMAS': {
+            'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+            'synchronous': 'NORMAL',
+            'busy_timeout': _inteiro('SQLITE_BUSY_TIMEOUT', 5000),
+            'mmap_size': _inteiro('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+            'cache_size': _inteiro('SQLITE_CACHE_SIZE', -64000),
+            'temp_store': 'MEMORY'
+        }
+    }
@@ -3,48 +3,145 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import click
+from flask import Flask
 from flask_cors import CORS
-from src.models import db
+from src.config import DATABASE_DIR, configuracao_padrao, url_auditoria
+from src.models import db, configurar_sqlite
+from src.migrations import MIGRACOES, aplicar_migracoes, versao_atual
+from src.services.alteracoes import instalar_alteracoes, limpar_alteracoes
+from src.services.auditoria import instalar_auditoria
+from src.services.cobrancas import gerar_cobrancas
+from src.services.estaticos import IndiceEstatico, comprimir_estaticos
+from src.services.estoque import reconstruir_resumo_estoque
+from src.services.historico_estoque import gerar_snapshots
+from src.services.inadimplencia import mes_atual
+from src.services.jobs import limpar_expirados, marcar_orfaos
+from src.services.metricas import instalar_metricas
+from src.services.previsao_estoque import reconstruir_consumo
+from src.services.resumo_financeiro import reconstruir_resumo
 from src.routes.user import user_bp
 from src.routes.financeiro import financeiro_bp
 from src.routes.estoque import estoque_bp
 from src.routes.membro import membro_bp
+from src.routes.exportacao import exportacao_bp
+from src.routes.importacao import importacao_bp
+from src.routes.monitoramento import monitoramento_bp
+from src.routes.relatorios import relatorios_bp
+from src.routes.busca import busca_bp
+from src.routes.jobs import jobs_bp
+from src.routes.dashboard import dashboard_bp
+from src.routes.alteracoes import alteracoes_bp
+from src.routes.auditoria import auditoria_bp
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-
-# Configurar CORS para permitir comunicação com frontend
-CORS(app, origins=["http://localhost:5173"])
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(financeiro_bp, url_prefix='/api')
-app.register_blueprint(estoque_bp, url_prefix='/api')
-app.register_blueprint(membro_bp, url_prefix='/api')
-
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
+
+def create_app(config=None, migrar=True):
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config.update(configuracao_padrao())
+    app.config.update(config or {})
+
+    # Configurar CORS para permitir comunicação com frontend
+    CORS(app, origins=["http://localhost:5173"], expose_headers=["X-Next-Cursor", "Link", "ETag", "Last-Modified", "Server-Timing"])
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(financeiro_bp, url_prefix='/api')
+    app.register_blueprint(estoque_bp, url_prefix='/api')
+    app.register_blueprint(membro_bp, url_prefix='/api')
+    app.register_blueprint(exportacao_bp, url_prefix='/api')
+    app.register_blueprint(importacao_bp, url_prefix='/api')
+    app.register_blueprint(monitoramento_bp, url_prefix='/api')
+    app.register_blueprint(relatorios_bp, url_prefix='/api')
+    app.register_blueprint(busca_bp, url_prefix='/api')
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
+    app.register_blueprint(alteracoes_bp, url_prefix='/api')
+    app.register_blueprint(auditoria_bp, url_prefix='/api')
+
+    # A trilha de auditoria fica num banco à parte (bind 'auditoria')
+    if not app.config.get('AUDITORIA_DATABASE_URL'):
+        app.config['AUDITORIA_DATABASE_URL'] = url_auditoria(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_BINDS'] = {'auditoria': app.config['AUDITORIA_DATABASE_URL']}
+    urls = (app.config['SQLALCHEMY_DATABASE_URI'], app.config['AUDITORIA_DATABASE_URL'])
+    if any(url.startswith(f'sqlite:///{DATABASE_DIR}') for url in urls):
+        os.makedirs(DATABASE_DIR, exist_ok=True)
+    db.init_app(app)
+    with app.app_context():
+        configurar_sqlite(db.engine, app.config.get('SQLITE_PRAGMAS'))
+        configurar_sqlite(db.engines['auditoria'], app.config.get('SQLITE_PRAGMAS'))
+        instalar_metricas(app, db.engine)
+        instalar_alteracoes()
+        instalar_auditoria(app)
+        if migrar:
+            aplicar_migracoes()
+        # Jobs de um worker que morreu (o gunicorn recicla a cada max_requests) não vão terminar
+        if versao_atual() == MIGRACOES[-1][0]:
+            marcar_orfaos()
+
+    @app.cli.command('reconstruir-resumo')
+    def reconstruir_resumo_command():
+        """Recalcula do zero os resumos de transações, estoque e consumo."""
+        reconstruir_resumo()
+        reconstruir_resumo_estoque()
+        reconstruir_consumo()
+        db.session.commit()
+        print('Resumos reconstruídos')
+
+    @app.cli.command('gerar-cobrancas')
+    @click.option('--mes', default=None, help='Mês de referência (YYYY-MM); padrão: mês atual')
+    def gerar_cobrancas_command(mes):
+        """Gera as cobranças do mês e lança as receitas das mensalidades pagas."""
+        execucao = gerar_cobrancas(mes or mes_atual())
+        print(f"{execucao.mes_referencia}: {execucao.cobrancas_geradas} cobranças, "
+              f"{execucao.transacoes_lancadas} receitas lançadas")
+
+    @app.cli.command('snapshot-estoque')
+    def snapshot_estoque_command():
+        """Gera os snapshots mensais de estoque que ainda faltam."""
+        criados = gerar_snapshots()
+        print(f'Snapshots criados: {", ".join(c.date().isoformat() for c in criados)}' if criados
+              else 'Snapshots já estão em dia')
+
+    @app.cli.command('limpar-jobs')
+    def limpar_jobs_command():
+        """Remove os resultados de jobs vencidos e marca jobs órfãos como falhos."""
+        print(f'Jobs removidos: {limpar_expirados()}')
+
+    @app.cli.command('limpar-alteracoes')
+    @click.option('--dias', default=None, type=int, help='Retenção em dias; padrão: ALTERACOES_RETENCAO_DIAS')
+    def limpar_alteracoes_command(dias):
+        """Remove do feed de alterações as entradas mais antigas que a retenção."""
+        print(f'Alterações removidas: {limpar_alteracoes(dias or app.config["ALTERACOES_RETENCAO_DIAS"])}')
+
+    @app.cli.command('migrar')
+    def migrar_command():
+        """Aplica as migrações pendentes do banco."""
+        aplicadas = aplicar_migracoes()
+        print(f'Migrações aplicadas: {aplicadas}' if aplicadas else 'Banco já está atualizado')
+
+    @app.cli.command('comprimir-estaticos')
+    def comprimir_estaticos_command():
+        """Gera as variantes .gz/.br do build do frontend em static/."""
+        print(f'Variantes geradas: {comprimir_estaticos(app.static_folder)}')
+        estaticos.indexar()
+
+    # Indexa static/ uma vez; em modo debug reindexa quando algo não é encontrado
+    estaticos = IndiceEstatico(app.static_folder)
+    app.extensions['estaticos'] = estaticos
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if app.debug and path not in estaticos.arquivos:
+            estaticos.indexar()
+        response = estaticos.servir(path or 'index.html')
+        if response is None:
             return "index.html not found", 404
+        return response
+
+    return app
+
 
+app = create_app(migrar=os.environ.get('APLICAR_MIGRACOES', '1') == '1')
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,68 @@
+"""Migrações versionadas do esquema.
+
+Cada migração é uma função que recebe uma conexão aberta dentro de uma
+transação. A versão aplicada fica registrada em `schema_migrations`; ao
+iniciar, o app aplica em ordem apenas as migrações ainda pendentes.
+
+Migrações não importam os serviços: o SQL de cada uma fica escrito nela,
+congelado no esquema da sua versão (antes da v10, por exemplo, os valores
+ainda são FLOAT em reais).
+"""
+from datetime import datetime
+from sqlalchemy import text
+from src.models import db
+
+MIGRACOES = []
+
+
+def migracao(versao, nome):
+    def registrar(funcao):
+        MIGRACOES.append((versao, nome, funcao))
+        MIGRACOES.sort(key=lambda m: m[0])
+        return funcao
+    return registrar
+
+
+def _garantir_tabela_controle(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        ' versao INTEGER PRIMARY KEY,'
+        ' nome VARCHAR(200) NOT NULL,'
+        ' aplicada_em DATETIME NOT NULL)'
+    ))
+
+
+def versoes_aplicadas(conn):
+    _garantir_tabela_controle(conn)
+    return {row[0] for row in conn.execute(text('SELECT versao FROM schema_migrations'))}
+
+
+def aplicar_migracoes(engine=None):
+    """Aplica as migrações pendentes e retorna a lista de versões aplicadas."""
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        aplicadas = versoes_aplicadas(conn)
+
+    novas = []
+    for versao, nome, funcao in MIGRACOES:
+        if versao in aplicadas:
+            continue
+        with engine.begin() as conn:
+            funcao(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (versao, nome, aplicada_em) VALUES (:v, :n, :d)'),
+                {'v': versao, 'n': nome, 'd': datetime.utcnow()}
+            )
+        novas.append(versao)
+    return novas
+
+
+def versao_atual(engine=None):
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        aplicadas = versoes_aplicadas(conn)
+    return max(aplicadas) if aplicadas else 0
+
+
+# Importa os módulos de migração para registrá-las
+from src.migrations import versoes  # noqa: E402,F401
@@ -0,0 +1,388 @@
+import re
+from sqlalchemy import text
+from src.migrations import migracao
+
+
+@migracao(1, 'esquema inicial')
+def esquema_inicial(conn):
+    # Esquema do antigo db.create_all(), congelado; bancos já existentes não mudam
+    for sql in [
+        """CREATE TABLE IF NOT EXISTS materiais (
+            id INTEGER NOT NULL,
+            nome VARCHAR(200) NOT NULL,
+            descricao TEXT,
+            categoria VARCHAR(100) NOT NULL,
+            subcategoria VARCHAR(100),
+            unidade_medida VARCHAR(20),
+            preco_unitario FLOAT NOT NULL,
+            quantidade_atual FLOAT,
+            quantidade_minima FLOAT,
+            fornecedor VARCHAR(200),
+            local_armazenamento VARCHAR(100),
+            observacoes TEXT,
+            ativo BOOLEAN,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS membros (
+            id INTEGER NOT NULL,
+            nome VARCHAR(200) NOT NULL,
+            telefone VARCHAR(20),
+            email VARCHAR(200),
+            endereco TEXT,
+            data_nascimento DATE,
+            data_ingresso DATE,
+            valor_mensalidade FLOAT,
+            ativo BOOLEAN,
+            observacoes TEXT,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS user (
+            id INTEGER NOT NULL,
+            username VARCHAR(80) NOT NULL,
+            email VARCHAR(120) NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (username),
+            UNIQUE (email)
+        )""",
+        """CREATE TABLE IF NOT EXISTS movimentacoes_estoque (
+            id INTEGER NOT NULL,
+            material_id INTEGER NOT NULL,
+            tipo_movimentacao VARCHAR(20) NOT NULL,
+            quantidade FLOAT NOT NULL,
+            motivo VARCHAR(200) NOT NULL,
+            observacoes TEXT,
+            data_movimentacao DATETIME,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(material_id) REFERENCES materiais (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS pagamentos_mensalidade (
+            id INTEGER NOT NULL,
+            membro_id INTEGER NOT NULL,
+            mes_referencia VARCHAR(7) NOT NULL,
+            valor_pago FLOAT NOT NULL,
+            data_pagamento DATE,
+            observacoes TEXT,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(membro_id) REFERENCES membros (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS transacoes (
+            id INTEGER NOT NULL,
+            descricao VARCHAR(200) NOT NULL,
+            valor FLOAT NOT NULL,
+            tipo VARCHAR(20) NOT NULL,
+            categoria VARCHAR(100) NOT NULL,
+            subcategoria VARCHAR(100),
+            data DATETIME,
+            membro_id INTEGER,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(membro_id) REFERENCES membros (id)
+        )""",
+    ]:
+        conn.execute(text(sql))
+
+
+@migracao(2, 'índices compostos e pagamento único por membro/mês')
+def indices_compostos(conn):
+    duplicados = conn.execute(text(
+        'SELECT membro_id, mes_referencia, COUNT(*) FROM pagamentos_mensalidade '
+        'GROUP BY membro_id, mes_referencia HAVING COUNT(*) > 1'
+    )).fetchall()
+    if duplicados:
+        lista = ', '.join(f'membro {m} em {mes} ({n}x)' for m, mes, n in duplicados)
+        raise RuntimeError(f'Pagamentos duplicados impedem a migração: {lista}')
+
+    for sql in [
+        'CREATE INDEX IF NOT EXISTS ix_transacoes_data_id ON transacoes (data, id)',
+        'CREATE INDEX IF NOT EXISTS ix_transacoes_tipo_categoria ON transacoes (tipo, categoria)',
+        'CREATE INDEX IF NOT EXISTS ix_membros_ativo_nome ON membros (ativo, nome)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamentos_membro_mes ON pagamentos_mensalidade (membro_id, mes_referencia)',
+        'CREATE INDEX IF NOT EXISTS ix_pagamentos_mes ON pagamentos_mensalidade (mes_referencia)',
+        'CREATE INDEX IF NOT EXISTS ix_pagamentos_data_id ON pagamentos_mensalidade (data_pagamento, id)',
+        'CREATE INDEX IF NOT EXISTS ix_materiais_ativo_categoria_nome ON materiais (ativo, categoria, nome)',
+        'CREATE INDEX IF NOT EXISTS ix_movimentacoes_material_data ON movimentacoes_estoque (material_id, data_movimentacao)',
+        'CREATE INDEX IF NOT EXISTS ix_movimentacoes_data ON movimentacoes_estoque (data_movimentacao)',
+    ]:
+        conn.execute(text(sql))
+    conn.execute(text('ANALYZE'))
+
+
+@migracao(3, 'resumo mensal de transações')
+def resumo_mensal_transacoes(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS resumo_mensal_transacoes ('
+        ' ano_mes VARCHAR(7) NOT NULL,'
+        ' tipo VARCHAR(20) NOT NULL,'
+        ' categoria VARCHAR(100) NOT NULL,'
+        ' soma FLOAT NOT NULL,'
+        ' contagem INTEGER NOT NULL,'
+        ' PRIMARY KEY (ano_mes, tipo, categoria))'
+    ))
+    conn.execute(text(
+        "INSERT INTO resumo_mensal_transacoes (ano_mes, tipo, categoria, soma, contagem) "
+        "SELECT strftime('%Y-%m', data), tipo, categoria, SUM(valor), COUNT(*) "
+        "FROM transacoes WHERE data IS NOT NULL "
+        "GROUP BY strftime('%Y-%m', data), tipo, categoria"
+    ))
+
+
+@migracao(4, 'cobranças de mensalidade')
+def cobrancas_mensalidade(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS cobrancas_mensalidade ('
+        ' id INTEGER NOT NULL,'
+        ' membro_id INTEGER NOT NULL,'
+        ' mes_referencia VARCHAR(7) NOT NULL,'
+        ' valor_esperado FLOAT NOT NULL,'
+        ' valor_pago FLOAT NOT NULL,'
+        ' status VARCHAR(10) NOT NULL,'
+        ' created_at DATETIME,'
+        ' PRIMARY KEY (id),'
+        ' FOREIGN KEY(membro_id) REFERENCES membros (id))'
+    ))
+    conn.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_cobrancas_membro_mes ON cobrancas_mensalidade (membro_id, mes_referencia)'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_cobrancas_mes_status ON cobrancas_mensalidade (mes_referencia, status)'
+    ))
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS execucoes_cobranca ('
+        ' mes_referencia VARCHAR(7) NOT NULL,'
+        ' executada_em DATETIME NOT NULL,'
+        ' cobrancas_geradas INTEGER NOT NULL,'
+        ' transacoes_lancadas INTEGER NOT NULL,'
+        ' PRIMARY KEY (mes_referencia))'
+    ))
+
+
+@migracao(5, 'resumo de estoque por categoria e índice de estoque baixo')
+def resumo_estoque(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS resumo_estoque_categoria ('
+        ' categoria VARCHAR(100) NOT NULL,'
+        ' total_materiais INTEGER NOT NULL,'
+        ' valor_total FLOAT NOT NULL,'
+        ' materiais_baixo_estoque INTEGER NOT NULL,'
+        ' PRIMARY KEY (categoria))'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_materiais_estoque_baixo ON materiais (categoria, nome) '
+        'WHERE ativo = 1 AND quantidade_atual <= quantidade_minima'
+    ))
+    # Nesta versão preco_unitario ainda é FLOAT em reais
+    conn.execute(text(
+        'INSERT INTO resumo_estoque_categoria '
+        '(categoria, total_materiais, valor_total, materiais_baixo_estoque) '
+        'SELECT categoria, COUNT(*), COALESCE(SUM(preco_unitario * quantidade_atual), 0), '
+        'SUM(CASE WHEN quantidade_atual <= quantidade_minima THEN 1 ELSE 0 END) '
+        'FROM materiais WHERE ativo = 1 GROUP BY categoria'
+    ))
+
+
+@migracao(6, 'consumo diário de materiais')
+def consumo_diario(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS consumo_diario_material ('
+        ' material_id INTEGER NOT NULL,'
+        ' dia VARCHAR(10) NOT NULL,'
+        ' quantidade FLOAT NOT NULL,'
+        ' PRIMARY KEY (material_id, dia),'
+        ' FOREIGN KEY(material_id) REFERENCES materiais (id))'
+    ))
+    conn.execute(text(
+        "INSERT INTO consumo_diario_material (material_id, dia, quantidade) "
+        "SELECT material_id, date(data_movimentacao), SUM(quantidade) "
+        "FROM movimentacoes_estoque "
+        "WHERE tipo_movimentacao = 'saida' AND data_movimentacao IS NOT NULL "
+        "GROUP BY material_id, date(data_movimentacao)"
+    ))
+
+
+@migracao(7, 'busca textual (FTS5)')
+def busca_textual(conn):
+    # Índices FTS5 de conteúdo externo, sincronizados por triggers (valem também
+    # para os INSERTs em lote da importação); o UPDATE só reindexa quando muda
+    # uma coluna indexada, então movimentar estoque não toca o índice.
+    indices = {
+        'busca_membros': ('membros', ['nome', 'email', 'telefone', 'observacoes']),
+        'busca_materiais': ('materiais', ['nome', 'descricao', 'fornecedor']),
+        'busca_transacoes': ('transacoes', ['descricao']),
+    }
+    for indice, (tabela, colunas) in indices.items():
+        lista = ', '.join(colunas)
+        novos = ', '.join(f'new.{c}' for c in colunas)
+        antigos = ', '.join(f'old.{c}' for c in colunas)
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {indice} USING fts5({lista}, "
+            f"content='{tabela}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {indice}_ai AFTER INSERT ON {tabela} BEGIN '
+            f'INSERT INTO {indice}(rowid, {lista}) VALUES (new.id, {novos}); END'
+        ))
+        conn.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {indice}_ad AFTER DELETE ON {tabela} BEGIN '
+            f"INSERT INTO {indice}({indice}, rowid, {lista}) VALUES ('delete', old.id, {antigos}); END"
+        ))
+        conn.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {indice}_au AFTER UPDATE OF {lista} ON {tabela} BEGIN '
+            f"INSERT INTO {indice}({indice}, rowid, {lista}) VALUES ('delete', old.id, {antigos}); "
+            f'INSERT INTO {indice}(rowid, {lista}) VALUES (new.id, {novos}); END'
+        ))
+        conn.execute(text(f"INSERT INTO {indice}({indice}) VALUES ('rebuild')"))
+
+
+@migracao(8, 'snapshots de estoque')
+def snapshots_estoque(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS snapshots_estoque ('
+        ' data_corte DATETIME NOT NULL,'
+        ' material_id INTEGER NOT NULL,'
+        ' quantidade FLOAT NOT NULL,'
+        ' PRIMARY KEY (data_corte, material_id),'
+        ' FOREIGN KEY(material_id) REFERENCES materiais (id))'
+    ))
+
+
+@migracao(9, 'fila de jobs')
+def fila_jobs(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS jobs ('
+        ' id VARCHAR(32) NOT NULL,'
+        ' tipo VARCHAR(50) NOT NULL,'
+        ' parametros TEXT NOT NULL,'
+        ' estado VARCHAR(20) NOT NULL,'
+        ' progresso FLOAT NOT NULL,'
+        ' mensagem VARCHAR(200),'
+        ' erro TEXT,'
+        ' cancelar BOOLEAN NOT NULL,'
+        ' arquivo VARCHAR(500),'
+        ' nome_arquivo VARCHAR(200),'
+        ' mimetype VARCHAR(100),'
+        ' tamanho INTEGER,'
+        ' criado_em DATETIME,'
+        ' iniciado_em DATETIME,'
+        ' atualizado_em DATETIME,'
+        ' concluido_em DATETIME,'
+        ' expira_em DATETIME,'
+        ' PRIMARY KEY (id))'
+    ))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_jobs_criado_em ON jobs (criado_em, id)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_jobs_estado_expira_em ON jobs (estado, expira_em)'))
+
+
+# Colunas monetárias, de FLOAT (reais) para INTEGER (centavos)
+COLUNAS_DINHEIRO = {
+    'transacoes': ['valor'],
+    'membros': ['valor_mensalidade'],
+    'pagamentos_mensalidade': ['valor_pago'],
+    'cobrancas_mensalidade': ['valor_esperado', 'valor_pago'],
+    'materiais': ['preco_unitario'],
+    'resumo_mensal_transacoes': ['soma'],
+    'resumo_estoque_categoria': ['valor_total'],
+}
+
+
+def _recriar_com_centavos(conn, tabela, colunas):
+    # O SQLite não altera o tipo de uma coluna: cria a tabela nova com o mesmo
+    # DDL, copia convertendo e recria índices e triggers (inclusive os da busca)
+    ddl = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :t"
+    ), {'t': tabela}).scalar()
+    dependentes = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = :t AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    ), {'t': tabela}).scalars().all()
+
+    nova = f'{tabela}_centavos'
+    ddl = re.sub(rf'^(\s*CREATE TABLE\s+(IF NOT EXISTS\s+)?)"?{tabela}"?', rf'\g<1>{nova}', ddl, count=1)
+    for coluna in colunas:
+        ddl, trocas = re.subn(rf'(\b{coluna}\s+)FLOAT\b', r'\1INTEGER', ddl, flags=re.IGNORECASE)
+        if not trocas:
+            raise RuntimeError(f'Coluna {tabela}.{coluna} não encontrada como FLOAT')
+    conn.execute(text(ddl))
+
+    todas = [linha[1] for linha in conn.execute(text(f'PRAGMA table_info({tabela})'))]
+    selecao = ', '.join(
+        f'CAST(ROUND({c} * 100) AS INTEGER)' if c in colunas else c for c in todas
+    )
+    conn.execute(text(f'INSERT INTO {nova} ({", ".join(todas)}) SELECT {selecao} FROM {tabela}'))
+    conn.execute(text(f'DROP TABLE {tabela}'))
+    conn.execute(text(f'ALTER TABLE {nova} RENAME TO {tabela}'))
+    for sql in dependentes:
+        conn.execute(text(sql))
+
+
+@migracao(10, 'valores monetários em centavos')
+def dinheiro_em_centavos(conn):
+    for tabela, colunas in COLUNAS_DINHEIRO.items():
+        _recriar_com_centavos(conn, tabela, colunas)
+    # Os resumos são recalculados com as somas inteiras, em vez de convertidos
+    conn.execute(text('DELETE FROM resumo_mensal_transacoes'))
+    conn.execute(text(
+        "INSERT INTO resumo_mensal_transacoes (ano_mes, tipo, categoria, soma, contagem) "
+        "SELECT strftime('%Y-%m', data), tipo, categoria, SUM(valor), COUNT(*) "
+        "FROM transacoes WHERE data IS NOT NULL "
+        "GROUP BY strftime('%Y-%m', data), tipo, categoria"
+    ))
+    conn.execute(text('DELETE FROM resumo_estoque_categoria'))
+    conn.execute(text(
+        'INSERT INTO resumo_estoque_categoria '
+        '(categoria, total_materiais, valor_total, materiais_baixo_estoque) '
+        'SELECT categoria, COUNT(*), '
+        'COALESCE(SUM(CAST(ROUND(preco_unitario * quantidade_atual) AS INTEGER)), 0), '
+        'SUM(CASE WHEN quantidade_atual <= quantidade_minima THEN 1 ELSE 0 END) '
+        'FROM materiais WHERE ativo = 1 GROUP BY categoria'
+    ))
+
+
+@migracao(11, 'feed de alterações')
+def feed_alteracoes(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS alteracoes ('
+        ' seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,'
+        ' tabela VARCHAR(50) NOT NULL,'
+        ' registro_id INTEGER NOT NULL,'
+        ' operacao VARCHAR(10) NOT NULL,'
+        ' criado_em DATETIME NOT NULL)'
+    ))
+
+
+@migracao(12, 'processo dono de cada job')
+def processo_dos_jobs(conn):
+    conn.execute(text('ALTER TABLE jobs ADD COLUMN processo INTEGER'))
+
+
+@migracao(13, 'receita de cada pagamento de mensalidade')
+def receita_dos_pagamentos(conn):
+    conn.execute(text(
+        'ALTER TABLE pagamentos_mensalidade ADD COLUMN transacao_id INTEGER REFERENCES transacoes (id)'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_pagamentos_transacao ON pagamentos_mensalidade (transacao_id)'
+    ))
+    # Receitas já lançadas pela cobrança: membro e mês de referência na subcategoria
+    conn.execute(text(
+        "UPDATE pagamentos_mensalidade SET transacao_id = ("
+        " SELECT MIN(t.id) FROM transacoes t WHERE t.categoria = 'Mensalidades'"
+        " AND t.membro_id = pagamentos_mensalidade.membro_id"
+        " AND t.subcategoria = pagamentos_mensalidade.mes_referencia)"
+    ))
+    # Mensalidades lançadas à mão para o membro no mês do pagamento viram a
+    # receita dele, em vez de a cobrança lançar outra
+    conn.execute(text(
+        "UPDATE pagamentos_mensalidade SET transacao_id = ("
+        " SELECT MIN(t.id) FROM transacoes t WHERE t.categoria = 'Mensalidades'"
+        " AND t.membro_id = pagamentos_mensalidade.membro_id"
+        " AND COALESCE(t.subcategoria, '') = ''"
+        " AND strftime('%Y-%m', t.data) IN (pagamentos_mensalidade.mes_referencia,"
+        "  strftime('%Y-%m', pagamentos_mensalidade.data_pagamento))"
+        " AND t.id NOT IN (SELECT transacao_id FROM pagamentos_mensalidade WHERE transacao_id IS NOT NULL)) "
+        "WHERE transacao_id IS NULL"
+    ))
@@ -1,3 +1,20 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
+
+
+def configurar_sqlite(engine, pragmas):
+    """Aplica os PRAGMAs em cada nova conexão SQLite do engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # busy_timeout primeiro: os demais podem esbarrar num escritor de outra conexão
+        for nome, valor in sorted(pragmas.items(), key=lambda item: item[0] != 'busy_timeout'):
+            if nome == 'journal_mode' and cursor.execute('PRAGMA journal_mode').fetchone()[0].lower() == str(valor).lower():
+                continue  # trocar o modo exige acesso exclusivo ao arquivo; se já está certo, não tenta
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
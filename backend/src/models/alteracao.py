@@ -0,0 +1,23 @@
+from datetime import datetime
+from . import db
+
+class Alteracao(db.Model):
+    __tablename__ = 'alteracoes'
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    # Feed de alterações para sincronização incremental (ver src/services/alteracoes.py);
+    # AUTOINCREMENT garante que seq nunca é reaproveitado depois de uma limpeza
+    seq = db.Column(db.Integer, primary_key=True)
+    tabela = db.Column(db.String(50), nullable=False)
+    registro_id = db.Column(db.Integer, nullable=False)
+    operacao = db.Column(db.String(10), nullable=False)  # 'insert', 'update', 'delete'
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'tabela': self.tabela,
+            'registro_id': self.registro_id,
+            'operacao': self.operacao,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None
+        }
@@ -0,0 +1,39 @@
+import json
+from datetime import datetime
+from . import db
+
+class RegistroAuditoria(db.Model):
+    __tablename__ = 'auditoria'
+    __bind_key__ = 'auditoria'
+    __table_args__ = (
+        db.Index('ix_auditoria_entidade', 'entidade', 'registro_id', 'seq'),
+        db.Index('ix_auditoria_usuario', 'usuario', 'seq'),
+        db.Index('ix_auditoria_criado_em', 'criado_em'),
+        {'sqlite_autoincrement': True},
+    )
+
+    # Trilha de auditoria, num banco separado e só de inclusão (ver src/services/auditoria.py)
+    seq = db.Column(db.Integer, primary_key=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    entidade = db.Column(db.String(50), nullable=False)
+    registro_id = db.Column(db.Integer, nullable=False)
+    operacao = db.Column(db.String(10), nullable=False)  # 'insert', 'update', 'delete'
+    usuario = db.Column(db.String(100))
+    ip = db.Column(db.String(45))
+    requisicao = db.Column(db.String(300))  # "PUT /api/transacoes/3"
+    antes = db.Column(db.Text)  # JSON com os campos alterados (ou o registro removido)
+    depois = db.Column(db.Text)  # JSON com os novos valores (ou o registro criado)
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'entidade': self.entidade,
+            'registro_id': self.registro_id,
+            'operacao': self.operacao,
+            'usuario': self.usuario,
+            'ip': self.ip,
+            'requisicao': self.requisicao,
+            'antes': json.loads(self.antes) if self.antes else None,
+            'depois': json.loads(self.depois) if self.depois else None
+        }
@@ -0,0 +1,61 @@
+"""Valores monetários guardados como centavos inteiros.
+
+No banco a coluna é INTEGER (SUMs exatos e mais baratos para o SQLite); no
+Python o valor é um Decimal com duas casas, que o JSON do Flask serializa
+como texto exato ("10.50"). Entradas float, int ou texto ("10,5") são
+arredondadas ao centavo (meio para cima).
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from sqlalchemy.types import Integer, TypeDecorator
+
+CENTAVO = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def para_decimal(valor):
+    """Converte número ou texto em Decimal com duas casas; ValueError se inválido."""
+    if valor is None:
+        return None
+    if isinstance(valor, bool):
+        raise ValueError(f'valor monetário inválido: {valor!r}')
+    if isinstance(valor, str):
+        valor = valor.strip().replace(',', '.')
+    elif isinstance(valor, float):
+        valor = repr(valor)  # 0.1 vira Decimal('0.1'), não a expansão binária
+    try:
+        return Decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f'valor monetário inválido: {valor!r}')
+
+
+def para_centavos(valor):
+    return int(para_decimal(valor).scaleb(2))
+
+
+def de_centavos(centavos):
+    if centavos is None:
+        return None
+    return Decimal(round(centavos)).scaleb(-2)
+
+
+def multiplicar(preco, quantidade):
+    """preço (Decimal) x quantidade (float de estoque), arredondado ao centavo."""
+    return (para_decimal(preco) * Decimal(repr(float(quantidade or 0)))).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+class Dinheiro(TypeDecorator):
+    impl = Integer
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Decimal
+
+    def process_bind_param(self, valor, dialect):
+        return None if valor is None else para_centavos(valor)
+
+    def process_literal_param(self, valor, dialect):
+        return str(self.process_bind_param(valor, dialect))
+
+    def process_result_value(self, valor, dialect):
+        return de_centavos(valor)
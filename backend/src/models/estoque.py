@@ -1,9 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from . import db
+from .dinheiro import Dinheiro, multiplicar, para_decimal
 
 class Material(db.Model):
     __tablename__ = 'materiais'
+    __table_args__ = (
+        db.Index('ix_materiais_ativo_categoria_nome', 'ativo', 'categoria', 'nome'),
+        # Índice parcial: contém só os materiais ativos com estoque baixo
+        db.Index(
+            'ix_materiais_estoque_baixo', 'categoria', 'nome',
+            sqlite_where=db.text('ativo = 1 AND quantidade_atual <= quantidade_minima')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(200), nullable=False)
@@ -11,7 +20,7 @@ class Material(db.Model):
     categoria = db.Column(db.String(100), nullable=False)  # Velas, Ervas, Incensos, etc.
     subcategoria = db.Column(db.String(100))  # Cor da vela, tipo de erva, etc.
     unidade_medida = db.Column(db.String(20), default='unidade')  # unidade, kg, litro, etc.
-    preco_unitario = db.Column(db.Float, nullable=False)
+    preco_unitario = db.Column(Dinheiro, nullable=False)
     quantidade_atual = db.Column(db.Float, default=0)
     quantidade_minima = db.Column(db.Float, default=5)  # Alerta de estoque baixo
     fornecedor = db.Column(db.String(200))
@@ -21,6 +30,10 @@ class Material(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @db.validates('preco_unitario')
+    def _validar_dinheiro(self, campo, valor):
+        return para_decimal(valor)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -36,7 +49,7 @@ class Material(db.Model):
             'local_armazenamento': self.local_armazenamento,
             'observacoes': self.observacoes,
             'ativo': self.ativo,
-            'valor_total': self.preco_unitario * self.quantidade_atual,
+            'valor_total': multiplicar(self.preco_unitario, self.quantidade_atual),
             'estoque_baixo': self.quantidade_atual <= self.quantidade_minima,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
@@ -44,6 +57,10 @@ class Material(db.Model):
 
 class MovimentacaoEstoque(db.Model):
     __tablename__ = 'movimentacoes_estoque'
+    __table_args__ = (
+        db.Index('ix_movimentacoes_material_data', 'material_id', 'data_movimentacao'),
+        db.Index('ix_movimentacoes_data', 'data_movimentacao'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     material_id = db.Column(db.Integer, db.ForeignKey('materiais.id'), nullable=False)
@@ -56,16 +73,82 @@ class MovimentacaoEstoque(db.Model):
     
     material = db.relationship('Material', backref='movimentacoes')
     
+    def to_dict(self):
+        return MovimentacaoEstoque.serializar(self, self.material.nome if self.material else None)
+    
+    @staticmethod
+    def serializar(registro, material_nome):
+        # Aceita tanto a instância ORM quanto uma linha de query_listagem()
+        return {
+            'id': registro.id,
+            'material_id': registro.material_id,
+            'material_nome': material_nome,
+            'tipo_movimentacao': registro.tipo_movimentacao,
+            'quantidade': registro.quantidade,
+            'motivo': registro.motivo,
+            'observacoes': registro.observacoes,
+            'data_movimentacao': registro.data_movimentacao.isoformat() if registro.data_movimentacao else None,
+            'created_at': registro.created_at.isoformat() if registro.created_at else None
+        }
+    
+    @classmethod
+    def query_listagem(cls):
+        """Projeção só de colunas, com o nome do material no mesmo SELECT."""
+        return db.session.query(
+            *cls.__table__.columns,
+            Material.nome.label('material_nome')
+        ).outerjoin(Material, Material.id == cls.material_id)
+    
+    @staticmethod
+    def linha_to_dict(linha):
+        return MovimentacaoEstoque.serializar(linha, linha.material_nome)
+
+
+class ResumoEstoqueCategoria(db.Model):
+    __tablename__ = 'resumo_estoque_categoria'
+    
+    # Mantido pelas rotas de estoque (ver retirar_do_resumo/somar_ao_resumo em src/services/estoque.py)
+    categoria = db.Column(db.String(100), primary_key=True)
+    total_materiais = db.Column(db.Integer, nullable=False, default=0)
+    valor_total = db.Column(Dinheiro, nullable=False, default=0)
+    materiais_baixo_estoque = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'categoria': self.categoria,
+            'total_materiais': self.total_materiais,
+            'valor_total': self.valor_total,
+            'materiais_baixo_estoque': self.materiais_baixo_estoque
+        }
+
+
+class ConsumoDiarioMaterial(db.Model):
+    __tablename__ = 'consumo_diario_material'
+    
+    # Soma das saídas por material e dia (ver src/services/previsao_estoque.py)
+    material_id = db.Column(db.Integer, db.ForeignKey('materiais.id'), primary_key=True)
+    dia = db.Column(db.String(10), primary_key=True)  # formato: YYYY-MM-DD
+    quantidade = db.Column(db.Float, nullable=False, default=0)
+    
     def to_dict(self):
         return {
-            'id': self.id,
             'material_id': self.material_id,
-            'material_nome': self.material.nome if self.material else None,
-            'tipo_movimentacao': self.tipo_movimentacao,
-            'quantidade': self.quantidade,
-            'motivo': self.motivo,
-            'observacoes': self.observacoes,
-            'data_movimentacao': self.data_movimentacao.isoformat() if self.data_movimentacao else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'dia': self.dia,
+            'quantidade': self.quantidade
         }
 
+
+class SnapshotEstoque(db.Model):
+    __tablename__ = 'snapshots_estoque'
+    
+    # Quantidade de cada material antes de data_corte (ver src/services/historico_estoque.py)
+    data_corte = db.Column(db.DateTime, primary_key=True)
+    material_id = db.Column(db.Integer, db.ForeignKey('materiais.id'), primary_key=True)
+    quantidade = db.Column(db.Float, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'data_corte': self.data_corte.isoformat() if self.data_corte else None,
+            'material_id': self.material_id,
+            'quantidade': self.quantidade
+        }
@@ -1,13 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from . import db
+from .dinheiro import Dinheiro, para_decimal
 
 class Transacao(db.Model):
     __tablename__ = 'transacoes'
+    __table_args__ = (
+        db.Index('ix_transacoes_data_id', 'data', 'id'),
+        db.Index('ix_transacoes_tipo_categoria', 'tipo', 'categoria'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     descricao = db.Column(db.String(200), nullable=False)
-    valor = db.Column(db.Float, nullable=False)
+    valor = db.Column(Dinheiro, nullable=False)
     tipo = db.Column(db.String(20), nullable=False)  # 'receita' ou 'despesa'
     categoria = db.Column(db.String(100), nullable=False)
     subcategoria = db.Column(db.String(100))
@@ -15,16 +20,49 @@ class Transacao(db.Model):
     membro_id = db.Column(db.Integer, db.ForeignKey('membros.id'))  # Para mensalidades
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    @db.validates('valor')
+    def _validar_dinheiro(self, campo, valor):
+        # Mantém em memória o mesmo Decimal que volta do banco
+        return para_decimal(valor)
+    
+    def to_dict(self):
+        return Transacao.linha_to_dict(self)
+    
+    @classmethod
+    def query_listagem(cls):
+        """Projeção só de colunas, sem montar instâncias ORM."""
+        return db.session.query(*cls.__table__.columns)
+    
+    @staticmethod
+    def linha_to_dict(linha):
+        # Aceita tanto a instância ORM quanto uma linha de query_listagem()
+        return {
+            'id': linha.id,
+            'descricao': linha.descricao,
+            'valor': linha.valor,
+            'tipo': linha.tipo,
+            'categoria': linha.categoria,
+            'subcategoria': linha.subcategoria,
+            'data': linha.data.isoformat() if linha.data else None,
+            'membro_id': linha.membro_id,
+            'created_at': linha.created_at.isoformat() if linha.created_at else None
+        }
+
+class ResumoMensalTransacao(db.Model):
+    __tablename__ = 'resumo_mensal_transacoes'
+    
+    # Agregado mantido pelas rotas de transações (ver src/services/resumo_financeiro.py)
+    ano_mes = db.Column(db.String(7), primary_key=True)  # formato: YYYY-MM
+    tipo = db.Column(db.String(20), primary_key=True)
+    categoria = db.Column(db.String(100), primary_key=True)
+    soma = db.Column(Dinheiro, nullable=False, default=0)
+    contagem = db.Column(db.Integer, nullable=False, default=0)
+    
     def to_dict(self):
         return {
-            'id': self.id,
-            'descricao': self.descricao,
-            'valor': self.valor,
+            'ano_mes': self.ano_mes,
             'tipo': self.tipo,
             'categoria': self.categoria,
-            'subcategoria': self.subcategoria,
-            'data': self.data.isoformat() if self.data else None,
-            'membro_id': self.membro_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'soma': self.soma,
+            'contagem': self.contagem
         }
-
@@ -0,0 +1,48 @@
+import json
+from datetime import datetime
+from . import db
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_criado_em', 'criado_em', 'id'),
+        db.Index('ix_jobs_estado_expira_em', 'estado', 'expira_em'),
+    )
+    
+    # Tarefas em segundo plano (ver src/services/jobs.py)
+    id = db.Column(db.String(32), primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    parametros = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    estado = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, executando, concluido, falhou, cancelado
+    progresso = db.Column(db.Float, nullable=False, default=0)  # 0 a 1
+    mensagem = db.Column(db.String(200))
+    erro = db.Column(db.Text)
+    cancelar = db.Column(db.Boolean, nullable=False, default=False)
+    processo = db.Column(db.Integer)  # pid do worker que vai executar; órfão se ele morrer
+    arquivo = db.Column(db.String(500))  # resultado no disco
+    nome_arquivo = db.Column(db.String(200))
+    mimetype = db.Column(db.String(100))
+    tamanho = db.Column(db.Integer)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    iniciado_em = db.Column(db.DateTime)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    concluido_em = db.Column(db.DateTime)
+    expira_em = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'parametros': json.loads(self.parametros or '{}'),
+            'estado': self.estado,
+            'progresso': self.progresso,
+            'mensagem': self.mensagem,
+            'erro': self.erro,
+            'cancelamento_solicitado': self.cancelar,
+            'nome_arquivo': self.nome_arquivo,
+            'tamanho': self.tamanho,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None,
+            'expira_em': self.expira_em.isoformat() if self.expira_em else None
+        }
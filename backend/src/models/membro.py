@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from . import db
+from .dinheiro import Dinheiro, para_decimal
 
 class Membro(db.Model):
     __tablename__ = 'membros'
+    __table_args__ = (
+        db.Index('ix_membros_ativo_nome', 'ativo', 'nome'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(200), nullable=False)
@@ -12,12 +16,16 @@ class Membro(db.Model):
     endereco = db.Column(db.Text)
     data_nascimento = db.Column(db.Date)
     data_ingresso = db.Column(db.Date, default=datetime.utcnow().date)
-    valor_mensalidade = db.Column(db.Float, default=0.0)
+    valor_mensalidade = db.Column(Dinheiro, default=0)
     ativo = db.Column(db.Boolean, default=True)
     observacoes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @db.validates('valor_mensalidade')
+    def _validar_dinheiro(self, campo, valor):
+        return para_decimal(valor)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -36,26 +44,101 @@ class Membro(db.Model):
 
 class PagamentoMensalidade(db.Model):
     __tablename__ = 'pagamentos_mensalidade'
+    __table_args__ = (
+        # Um pagamento por membro por mês
+        db.Index('uq_pagamentos_membro_mes', 'membro_id', 'mes_referencia', unique=True),
+        db.Index('ix_pagamentos_mes', 'mes_referencia'),
+        db.Index('ix_pagamentos_data_id', 'data_pagamento', 'id'),
+        db.Index('ix_pagamentos_transacao', 'transacao_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     membro_id = db.Column(db.Integer, db.ForeignKey('membros.id'), nullable=False)
     mes_referencia = db.Column(db.String(7), nullable=False)  # formato: YYYY-MM
-    valor_pago = db.Column(db.Float, nullable=False)
+    valor_pago = db.Column(Dinheiro, nullable=False)
     data_pagamento = db.Column(db.Date, default=datetime.utcnow().date)
     observacoes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    transacao_id = db.Column(db.Integer, db.ForeignKey('transacoes.id'))  # receita lançada (src/services/cobrancas.py)
+    
+    @db.validates('valor_pago')
+    def _validar_dinheiro(self, campo, valor):
+        return para_decimal(valor)
     
     membro = db.relationship('Membro', backref='pagamentos')
     
+    def to_dict(self):
+        return PagamentoMensalidade.serializar(self, self.membro.nome if self.membro else None)
+    
+    @staticmethod
+    def serializar(registro, membro_nome):
+        # Aceita tanto a instância ORM quanto uma linha de query_listagem()
+        return {
+            'id': registro.id,
+            'membro_id': registro.membro_id,
+            'membro_nome': membro_nome,
+            'mes_referencia': registro.mes_referencia,
+            'valor_pago': registro.valor_pago,
+            'data_pagamento': registro.data_pagamento.isoformat() if registro.data_pagamento else None,
+            'observacoes': registro.observacoes,
+            'created_at': registro.created_at.isoformat() if registro.created_at else None,
+            'transacao_id': registro.transacao_id
+        }
+    
+    @classmethod
+    def query_listagem(cls):
+        """Projeção só de colunas, com o nome do membro no mesmo SELECT."""
+        return db.session.query(
+            *cls.__table__.columns,
+            Membro.nome.label('membro_nome')
+        ).outerjoin(Membro, Membro.id == cls.membro_id)
+    
+    @staticmethod
+    def linha_to_dict(linha):
+        return PagamentoMensalidade.serializar(linha, linha.membro_nome)
+
+class CobrancaMensalidade(db.Model):
+    __tablename__ = 'cobrancas_mensalidade'
+    __table_args__ = (
+        db.Index('uq_cobrancas_membro_mes', 'membro_id', 'mes_referencia', unique=True),
+        db.Index('ix_cobrancas_mes_status', 'mes_referencia', 'status'),
+    )
+    
+    # Gerada em lote por src/services/cobrancas.py; valor_pago/status são reconciliados com os pagamentos
+    id = db.Column(db.Integer, primary_key=True)
+    membro_id = db.Column(db.Integer, db.ForeignKey('membros.id'), nullable=False)
+    mes_referencia = db.Column(db.String(7), nullable=False)  # formato: YYYY-MM
+    valor_esperado = db.Column(Dinheiro, nullable=False)
+    valor_pago = db.Column(Dinheiro, nullable=False, default=0)
+    status = db.Column(db.String(10), nullable=False, default='aberta')  # 'aberta', 'parcial', 'paga'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    membro = db.relationship('Membro')
+    
     def to_dict(self):
         return {
             'id': self.id,
             'membro_id': self.membro_id,
             'membro_nome': self.membro.nome if self.membro else None,
             'mes_referencia': self.mes_referencia,
+            'valor_esperado': self.valor_esperado,
             'valor_pago': self.valor_pago,
-            'data_pagamento': self.data_pagamento.isoformat() if self.data_pagamento else None,
-            'observacoes': self.observacoes,
+            'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class ExecucaoCobranca(db.Model):
+    __tablename__ = 'execucoes_cobranca'
+    
+    mes_referencia = db.Column(db.String(7), primary_key=True)
+    executada_em = db.Column(db.DateTime, nullable=False)
+    cobrancas_geradas = db.Column(db.Integer, nullable=False, default=0)
+    transacoes_lancadas = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'mes_referencia': self.mes_referencia,
+            'executada_em': self.executada_em.isoformat() if self.executada_em else None,
+            'cobrancas_geradas': self.cobrancas_geradas,
+            'transacoes_lancadas': self.transacoes_lancadas
+        }
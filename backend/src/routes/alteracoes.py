@@ -0,0 +1,53 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from src.services import alteracoes
+from src.services.paginacao import LIMITE_MAXIMO, ler_limite
+
+alteracoes_bp = Blueprint('alteracoes', __name__)
+
+
+def _ler_since(valor):
+    try:
+        since = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError('since deve ser um número inteiro')
+    if since < 0:
+        raise ValueError('since não pode ser negativo')
+    return since
+
+@alteracoes_bp.route('/changes', methods=['GET'])
+def get_alteracoes():
+    # ?since=<seq>&tabelas=membros,materiais&limit=; sem since, só devolve o seq atual
+    try:
+        tabelas = alteracoes.tabelas_da_requisicao(request.args)
+        limite = ler_limite(request.args, limite_padrao=LIMITE_MAXIMO)
+        if request.args.get('since') is None:
+            return jsonify({'ultimo_seq': alteracoes.seq_atual(), 'tem_mais': False, 'alteracoes': []})
+        return jsonify(alteracoes.alteracoes_desde(_ler_since(request.args['since']), limite, tabelas))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except alteracoes.HistoricoIndisponivel as e:
+        return jsonify({'error': str(e)}), 410
+
+@alteracoes_bp.route('/changes/stream', methods=['GET'])
+def stream_alteracoes():
+    # Server-Sent Events; ao reconectar o EventSource manda Last-Event-ID
+    try:
+        tabelas = alteracoes.tabelas_da_requisicao(request.args)
+        limite = ler_limite(request.args, limite_padrao=LIMITE_MAXIMO)
+        since = request.headers.get('Last-Event-ID') or request.args.get('since')
+        since = _ler_since(since) if since is not None else alteracoes.seq_atual()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    liberar = alteracoes.reservar_stream()
+    if liberar is None:
+        response = jsonify({'error': 'Muitos clientes no stream; use /api/changes?since='})
+        response.headers['Retry-After'] = str(int(alteracoes.DURACAO_STREAM))
+        return response, 503
+    response = Response(
+        stream_with_context(alteracoes.stream(since, limite, tabelas, current_app.json.dumps)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Chamado pelo servidor quando o cliente desconecta ou o stream termina
+    response.call_on_close(liberar)
+    return response
@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify, request
+from src.models.auditoria import RegistroAuditoria
+from src.services.alteracoes import modelos_rastreados
+from src.services.paginacao import aplicar_filtros, paginar, resposta_paginada
+
+auditoria_bp = Blueprint('auditoria', __name__)
+
+@auditoria_bp.route('/auditoria', methods=['GET'])
+def get_auditoria():
+    # ?entidade=transacoes&registro_id=&usuario=&operacao=&data_inicio=&data_fim=, mais recentes primeiro
+    entidade = request.args.get('entidade')
+    if entidade and entidade not in modelos_rastreados():
+        return jsonify({'error': f'entidade inválida (use {", ".join(sorted(modelos_rastreados()))})'}), 400
+    try:
+        query = aplicar_filtros(RegistroAuditoria.query, request.args, {
+            'entidade': RegistroAuditoria.entidade,
+            'registro_id': RegistroAuditoria.registro_id,
+            'usuario': RegistroAuditoria.usuario,
+            'operacao': RegistroAuditoria.operacao
+        }, coluna_data=RegistroAuditoria.criado_em)
+        registros, cursor = paginar(query, [RegistroAuditoria.seq], request.args, decrescente=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(registros, cursor)
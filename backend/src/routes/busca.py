@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify, request
+from src.services.busca import query_busca, tipos_da_requisicao
+from src.services.paginacao import paginar, resposta_paginada
+
+busca_bp = Blueprint('busca', __name__)
+
+@busca_bp.route('/busca', methods=['GET'])
+def buscar():
+    # ?q=texto&tipos=membros,materiais,transacoes&limit=&cursor=
+    try:
+        query, colunas = query_busca(request.args.get('q'), tipos_da_requisicao(request.args))
+        resultados, cursor = paginar(query, colunas, request.args, limite_padrao=20)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(resultados, cursor, lambda linha: dict(linha._mapping))
@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify, request
+from src.services.dashboard import montar_dashboard
+from src.services.resumo_financeiro import meses_do_periodo
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+def get_dashboard():
+    # Resumo financeiro, de membros e de estoque numa só requisição;
+    # aceita os mesmos ?periodo= / ?mes_inicio=&mes_fim= de /resumo-financeiro
+    try:
+        inicio, fim = meses_do_periodo(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    dados = montar_dashboard(inicio, fim)
+    response = jsonify(dados)
+    response.headers['Server-Timing'] = ', '.join(
+        f"{nome};dur={tempo['ms']}" for nome, tempo in dados['tempos'].items() if nome != 'total_ms'
+    )
+    return response
@@ -1,12 +1,54 @@
-from flask import Blueprint, jsonify, request
+from datetime import date, datetime
+from flask import Blueprint, abort, jsonify, request
 from src.models.estoque import Material, MovimentacaoEstoque, db
+from src.services import historico_estoque, previsao_estoque
+from src.services.cache import em_cache, invalidar_em_escritas
+from src.services.estoque import (
+    MaterialNaoEncontrado, aplicar_lote, aplicar_movimentacao, query_alertas, resumo_estoque,
+    retirar_do_resumo, somar_ao_resumo
+)
+from src.services.paginacao import aplicar_filtros, paginar, resposta_paginada
 
 estoque_bp = Blueprint('estoque', __name__)
+invalidar_em_escritas(estoque_bp)
+
+CATEGORIAS_MATERIAIS = [
+    'Velas',
+    'Ervas',
+    'Incensos',
+    'Óleos Essenciais',
+    'Cristais e Pedras',
+    'Imagens e Santos',
+    'Instrumentos Musicais',
+    'Tecidos e Roupas',
+    'Bebidas Ritualísticas',
+    'Flores',
+    'Charutos e Cigarros',
+    'Perfumes',
+    'Pólvoras e Pemba',
+    'Utensílios Diversos',
+    'Limpeza do Templo',
+    'Outros Materiais'
+]
+
+SUBCATEGORIAS_MATERIAIS = {
+    'Velas': ['Branca', 'Vermelha', 'Azul', 'Amarela', 'Verde', 'Rosa', 'Roxa', 'Preta', 'Dourada', 'Prateada'],
+    'Ervas': ['Arruda', 'Guiné', 'Alecrim', 'Manjericão', 'Espada de São Jorge', 'Comigo-ninguém-pode', 'Outras'],
+    'Incensos': ['Sândalo', 'Mirra', 'Benjoim', 'Olíbano', 'Lavanda', 'Rosa', 'Outros'],
+    'Cristais e Pedras': ['Quartzo Branco', 'Ametista', 'Citrino', 'Hematita', 'Obsidiana', 'Outros'],
+    'Instrumentos Musicais': ['Atabaque', 'Agogô', 'Xequerê', 'Caxixi', 'Outros']
+}
 
 @estoque_bp.route('/materiais', methods=['GET'])
 def get_materiais():
-    materiais = Material.query.filter_by(ativo=True).order_by(Material.categoria, Material.nome).all()
-    return jsonify([material.to_dict() for material in materiais])
+    try:
+        query = aplicar_filtros(Material.query.filter_by(ativo=True), request.args, {
+            'categoria': Material.categoria
+        })
+        materiais, cursor = paginar(query, [Material.categoria, Material.nome, Material.id], request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(materiais, cursor)
 
 @estoque_bp.route('/materiais', methods=['POST'])
 def create_material():
@@ -25,7 +67,7 @@ def create_material():
         observacoes=data.get('observacoes', '')
     )
     db.session.add(material)
-    db.session.commit()
+    db.session.flush()
     
     # Registrar movimentação inicial se quantidade > 0
     if material.quantidade_atual > 0:
@@ -36,7 +78,10 @@ def create_material():
             motivo='Estoque inicial'
         )
         db.session.add(movimentacao)
-        db.session.commit()
+    
+    db.session.flush()
+    somar_ao_resumo([material.id])
+    db.session.commit()
     
     return jsonify(material.to_dict()), 201
 
@@ -49,6 +94,7 @@ def get_material(material_id):
 def update_material(material_id):
     material = Material.query.get_or_404(material_id)
     data = request.json
+    retirar_do_resumo([material_id])
     
     material.nome = data.get('nome', material.nome)
     material.descricao = data.get('descricao', material.descricao)
@@ -61,117 +107,153 @@ def update_material(material_id):
     material.local_armazenamento = data.get('local_armazenamento', material.local_armazenamento)
     material.observacoes = data.get('observacoes', material.observacoes)
     
+    db.session.flush()
+    somar_ao_resumo([material_id])
     db.session.commit()
     return jsonify(material.to_dict())
 
 @estoque_bp.route('/materiais/<int:material_id>', methods=['DELETE'])
 def delete_material(material_id):
     material = Material.query.get_or_404(material_id)
+    retirar_do_resumo([material_id])
     material.ativo = False  # Soft delete
     db.session.commit()
     return '', 204
 
 @estoque_bp.route('/materiais/<int:material_id>/movimentar', methods=['POST'])
 def movimentar_estoque(material_id):
-    material = Material.query.get_or_404(material_id)
     data = request.json
     
-    tipo = data['tipo_movimentacao']  # 'entrada', 'saida', 'ajuste'
-    quantidade = float(data['quantidade'])
-    motivo = data['motivo']
-    
-    # Validar movimentação de saída
-    if tipo == 'saida' and material.quantidade_atual < quantidade:
-        return jsonify({'error': 'Quantidade insuficiente em estoque'}), 400
+    # Saldo validado e atualizado num único UPDATE condicional
+    try:
+        aplicar_movimentacao(material_id, data)
+    except MaterialNaoEncontrado:
+        db.session.rollback()
+        abort(404)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    db.session.commit()
     
-    # Atualizar quantidade do material
-    if tipo == 'entrada':
-        material.quantidade_atual += quantidade
-    elif tipo == 'saida':
-        material.quantidade_atual -= quantidade
-    elif tipo == 'ajuste':
-        material.quantidade_atual = quantidade
+    return jsonify(db.session.get(Material, material_id).to_dict())
+
+@estoque_bp.route('/movimentacoes/lote', methods=['POST'])
+def movimentar_estoque_lote():
+    # Ex.: tudo o que foi consumido numa gira, aplicado de uma vez (tudo ou nada)
+    data = request.json or {}
+    movimentacoes = data.get('movimentacoes')
+    if not isinstance(movimentacoes, list) or not movimentacoes:
+        return jsonify({'error': 'Envie uma lista não vazia em movimentacoes'}), 400
     
-    # Registrar movimentação
-    movimentacao = MovimentacaoEstoque(
-        material_id=material_id,
-        tipo_movimentacao=tipo,
-        quantidade=quantidade,
-        motivo=motivo,
-        observacoes=data.get('observacoes')
-    )
+    try:
+        afetados = aplicar_lote(movimentacoes, motivo_padrao=data.get('motivo'))
+    except (LookupError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     
-    db.session.add(movimentacao)
-    db.session.commit()
-    
-    return jsonify(material.to_dict())
+    materiais = Material.query.filter(Material.id.in_(afetados)).all()
+    return jsonify([material.to_dict() for material in materiais])
 
 @estoque_bp.route('/materiais/<int:material_id>/movimentacoes', methods=['GET'])
 def get_movimentacoes_material(material_id):
-    movimentacoes = MovimentacaoEstoque.query.filter_by(material_id=material_id).order_by(MovimentacaoEstoque.data_movimentacao.desc()).all()
-    return jsonify([mov.to_dict() for mov in movimentacoes])
+    try:
+        query = MovimentacaoEstoque.query_listagem().filter(MovimentacaoEstoque.material_id == material_id)
+        query = aplicar_filtros(query, request.args, {
+            'tipo_movimentacao': MovimentacaoEstoque.tipo_movimentacao
+        }, coluna_data=MovimentacaoEstoque.data_movimentacao)
+        movimentacoes, cursor = paginar(
+            query,
+            [MovimentacaoEstoque.data_movimentacao, MovimentacaoEstoque.id],
+            request.args,
+            decrescente=True
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(movimentacoes, cursor, MovimentacaoEstoque.linha_to_dict)
 
 @estoque_bp.route('/movimentacoes', methods=['GET'])
 def get_movimentacoes():
-    movimentacoes = MovimentacaoEstoque.query.order_by(MovimentacaoEstoque.data_movimentacao.desc()).limit(50).all()
-    return jsonify([mov.to_dict() for mov in movimentacoes])
+    try:
+        query = aplicar_filtros(MovimentacaoEstoque.query_listagem(), request.args, {
+            'material_id': MovimentacaoEstoque.material_id,
+            'tipo_movimentacao': MovimentacaoEstoque.tipo_movimentacao
+        }, coluna_data=MovimentacaoEstoque.data_movimentacao)
+        movimentacoes, cursor = paginar(
+            query,
+            [MovimentacaoEstoque.data_movimentacao, MovimentacaoEstoque.id],
+            request.args,
+            decrescente=True,
+            limite_padrao=50
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(movimentacoes, cursor, MovimentacaoEstoque.linha_to_dict)
 
 @estoque_bp.route('/resumo-estoque', methods=['GET'])
+@em_cache('estoque')
 def get_resumo_estoque():
-    total_materiais = Material.query.filter_by(ativo=True).count()
-    materiais_baixo_estoque = Material.query.filter(
-        Material.ativo == True,
-        Material.quantidade_atual <= Material.quantidade_minima
-    ).count()
-    
-    valor_total_estoque = db.session.query(
-        db.func.sum(Material.preco_unitario * Material.quantidade_atual)
-    ).filter_by(ativo=True).scalar() or 0
-    
-    # Materiais por categoria
-    materiais_por_categoria = db.session.query(
-        Material.categoria,
-        db.func.count(Material.id)
-    ).filter_by(ativo=True).group_by(Material.categoria).all()
-    
+    return jsonify(resumo_estoque())
+
+@estoque_bp.route('/alertas-estoque', methods=['GET'])
+def get_alertas_estoque():
+    try:
+        query = aplicar_filtros(query_alertas(), request.args, {'categoria': Material.categoria})
+        materiais, cursor = paginar(query, [Material.categoria, Material.nome, Material.id], request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(materiais, cursor, lambda material: dict(
+        material.to_dict(),
+        quantidade_faltante=material.quantidade_minima - material.quantidade_atual
+    ))
+
+@estoque_bp.route('/previsao-consumo', methods=['GET'])
+@em_cache('estoque', ttl=600)
+def get_previsao_consumo():
+    try:
+        parametros = previsao_estoque.parametros(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify({
-        'total_materiais': total_materiais,
-        'materiais_baixo_estoque': materiais_baixo_estoque,
-        'valor_total_estoque': valor_total_estoque,
-        'materiais_por_categoria': [{'categoria': cat, 'quantidade': qtd} for cat, qtd in materiais_por_categoria]
+        'janela': parametros['janela'],
+        'materiais': previsao_estoque.previsao(parametros['janela'], request.args.get('categoria'))
     })
 
+@estoque_bp.route('/reposicao', methods=['GET'])
+@em_cache('estoque', ttl=600)
+def get_reposicao():
+    try:
+        parametros = previsao_estoque.parametros(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(dict(
+        parametros,
+        fornecedores=previsao_estoque.sugestoes_reposicao(categoria=request.args.get('categoria'), **parametros)
+    ))
+
+@estoque_bp.route('/posicao-estoque', methods=['GET'])
+@em_cache('estoque')
+def get_posicao_estoque():
+    # ?data=YYYY-MM-DD (padrão: hoje)&categoria=&material_id=1,2
+    try:
+        dia = datetime.strptime(request.args['data'], '%Y-%m-%d').date() if request.args.get('data') else date.today()
+        material_ids = [int(i) for i in request.args.get('material_id', '').split(',') if i.strip()]
+    except ValueError:
+        return jsonify({'error': 'data (YYYY-MM-DD) ou material_id inválido'}), 400
+    return jsonify(historico_estoque.posicao_em(dia, material_ids, request.args.get('categoria')))
+
+@estoque_bp.route('/consistencia-estoque', methods=['GET'])
+def get_consistencia_estoque():
+    completo = request.args.get('completo', '').lower() in ('1', 'true', 'sim')
+    return jsonify(dict(historico_estoque.verificar_consistencia(completo), completo=completo))
+
+@estoque_bp.route('/snapshots-estoque', methods=['POST'])
+def gerar_snapshots_estoque():
+    criados = historico_estoque.gerar_snapshots()
+    return jsonify({'criados': [corte.isoformat() for corte in criados]}), 201 if criados else 200
+
 @estoque_bp.route('/categorias-materiais', methods=['GET'])
+@em_cache('estoque', ttl=0)
 def get_categorias_materiais():
-    categorias = [
-        'Velas',
-        'Ervas',
-        'Incensos',
-        'Óleos Essenciais',
-        'Cristais e Pedras',
-        'Imagens e Santos',
-        'Instrumentos Musicais',
-        'Tecidos e Roupas',
-        'Bebidas Ritualísticas',
-        'Flores',
-        'Charutos e Cigarros',
-        'Perfumes',
-        'Pólvoras e Pemba',
-        'Utensílios Diversos',
-        'Limpeza do Templo',
-        'Outros Materiais'
-    ]
-    
-    subcategorias = {
-        'Velas': ['Branca', 'Vermelha', 'Azul', 'Amarela', 'Verde', 'Rosa', 'Roxa', 'Preta', 'Dourada', 'Prateada'],
-        'Ervas': ['Arruda', 'Guiné', 'Alecrim', 'Manjericão', 'Espada de São Jorge', 'Comigo-ninguém-pode', 'Outras'],
-        'Incensos': ['Sândalo', 'Mirra', 'Benjoim', 'Olíbano', 'Lavanda', 'Rosa', 'Outros'],
-        'Cristais e Pedras': ['Quartzo Branco', 'Ametista', 'Citrino', 'Hematita', 'Obsidiana', 'Outros'],
-        'Instrumentos Musicais': ['Atabaque', 'Agogô', 'Xequerê', 'Caxixi', 'Outros']
-    }
-    
     return jsonify({
-        'categorias': categorias,
-        'subcategorias': subcategorias
+        'categorias': CATEGORIAS_MATERIAIS,
+        'subcategorias': SUBCATEGORIAS_MATERIAIS
     })
-
@@ -0,0 +1,29 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from src.services.exportacao import ENTIDADES, FORMATOS, comprimir, gerar_linhas, montar_query
+
+exportacao_bp = Blueprint('exportacao', __name__)
+
+
+@exportacao_bp.route('/export/<entidade>', methods=['GET'])
+def exportar(entidade):
+    if entidade not in ENTIDADES:
+        return jsonify({'error': f'Entidade inválida: {entidade}'}), 404
+
+    formato = request.args.get('formato', 'csv')
+    if formato not in FORMATOS:
+        return jsonify({'error': 'formato deve ser csv ou ndjson'}), 400
+
+    try:
+        query = montar_query(entidade, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    blocos = gerar_linhas(query, formato)
+    nome, mimetype = f'{entidade}.{formato}', FORMATOS[formato]
+    if request.args.get('gzip') in ('1', 'true'):
+        # O arquivo é o .gz: sem Content-Encoding, senão o cliente descomprime e salva um .gz em texto
+        blocos = comprimir(blocos)
+        nome, mimetype = f'{nome}.gz', 'application/gzip'
+
+    headers = {'Content-Disposition': f'attachment; filename={nome}'}
+    return Response(stream_with_context(blocos), mimetype=mimetype, headers=headers)
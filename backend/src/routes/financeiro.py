@@ -1,12 +1,56 @@
 from flask import Blueprint, jsonify, request
 from src.models.financeiro import Transacao, db
+from src.services import resumo_financeiro
+from src.services.cache import em_cache, invalidar_em_escritas
+from src.services.cobrancas import receita_do_pagamento
+from src.services.paginacao import aplicar_filtros, paginar, resposta_paginada
 
 financeiro_bp = Blueprint('financeiro', __name__)
+invalidar_em_escritas(financeiro_bp)
+
+CATEGORIAS_RECEITA = [
+    'Mensalidades',
+    'Doações',
+    'Eventos e Festivais',
+    'Consultas Espirituais',
+    'Trabalhos Espirituais',
+    'Vendas de Materiais',
+    'Outras Receitas'
+]
+
+CATEGORIAS_DESPESA = [
+    'Materiais Religiosos',
+    'Manutenção do Templo',
+    'Energia Elétrica',
+    'Água',
+    'Internet/Telefone',
+    'Limpeza',
+    'Alimentação (Eventos)',
+    'Transporte',
+    'Documentação',
+    'Outras Despesas'
+]
+
+def _recusar_receita_de_pagamento(transacao_id):
+    # A receita lançada pela cobrança muda ou sai junto com o pagamento
+    pagamento = receita_do_pagamento(transacao_id)
+    if pagamento is not None:
+        return jsonify({'error': f'Receita do pagamento de mensalidade {pagamento.id}: '
+                                 'altere ou exclua o pagamento'}), 409
+    return None
 
 @financeiro_bp.route('/transacoes', methods=['GET'])
 def get_transacoes():
-    transacoes = Transacao.query.order_by(Transacao.data.desc()).all()
-    return jsonify([transacao.to_dict() for transacao in transacoes])
+    try:
+        query = aplicar_filtros(Transacao.query_listagem(), request.args, {
+            'tipo': Transacao.tipo,
+            'categoria': Transacao.categoria,
+            'membro_id': Transacao.membro_id
+        }, coluna_data=Transacao.data)
+        transacoes, cursor = paginar(query, [Transacao.data, Transacao.id], request.args, decrescente=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(transacoes, cursor, Transacao.linha_to_dict)
 
 @financeiro_bp.route('/transacoes', methods=['POST'])
 def create_transacao():
@@ -20,6 +64,8 @@ def create_transacao():
         membro_id=data.get('membro_id')
     )
     db.session.add(transacao)
+    db.session.flush()
+    resumo_financeiro.registrar_insercao(transacao)
     db.session.commit()
     return jsonify(transacao.to_dict()), 201
 
@@ -31,76 +77,46 @@ def get_transacao(transacao_id):
 @financeiro_bp.route('/transacoes/<int:transacao_id>', methods=['PUT'])
 def update_transacao(transacao_id):
     transacao = Transacao.query.get_or_404(transacao_id)
+    recusa = _recusar_receita_de_pagamento(transacao_id)
+    if recusa:
+        return recusa
     data = request.json
+    chave_anterior, valor_anterior = resumo_financeiro.chave(transacao), transacao.valor
     transacao.descricao = data.get('descricao', transacao.descricao)
     transacao.valor = data.get('valor', transacao.valor)
     transacao.tipo = data.get('tipo', transacao.tipo)
     transacao.categoria = data.get('categoria', transacao.categoria)
     transacao.subcategoria = data.get('subcategoria', transacao.subcategoria)
     transacao.membro_id = data.get('membro_id', transacao.membro_id)
+    resumo_financeiro.registrar_alteracao(chave_anterior, valor_anterior, transacao)
     db.session.commit()
     return jsonify(transacao.to_dict())
 
 @financeiro_bp.route('/transacoes/<int:transacao_id>', methods=['DELETE'])
 def delete_transacao(transacao_id):
     transacao = Transacao.query.get_or_404(transacao_id)
+    recusa = _recusar_receita_de_pagamento(transacao_id)
+    if recusa:
+        return recusa
     db.session.delete(transacao)
+    resumo_financeiro.registrar_remocao(transacao)
     db.session.commit()
     return '', 204
 
 @financeiro_bp.route('/resumo-financeiro', methods=['GET'])
+@em_cache('financeiro')
 def get_resumo_financeiro():
-    receitas = db.session.query(db.func.sum(Transacao.valor)).filter(Transacao.tipo == 'receita').scalar() or 0
-    despesas = db.session.query(db.func.sum(Transacao.valor)).filter(Transacao.tipo == 'despesa').scalar() or 0
-    saldo = receitas - despesas
-    
-    # Receitas por categoria
-    receitas_por_categoria = db.session.query(
-        Transacao.categoria,
-        db.func.sum(Transacao.valor)
-    ).filter(Transacao.tipo == 'receita').group_by(Transacao.categoria).all()
-    
-    # Despesas por categoria
-    despesas_por_categoria = db.session.query(
-        Transacao.categoria,
-        db.func.sum(Transacao.valor)
-    ).filter(Transacao.tipo == 'despesa').group_by(Transacao.categoria).all()
-    
-    return jsonify({
-        'receitas': receitas,
-        'despesas': despesas,
-        'saldo': saldo,
-        'receitas_por_categoria': [{'categoria': cat, 'valor': val} for cat, val in receitas_por_categoria],
-        'despesas_por_categoria': [{'categoria': cat, 'valor': val} for cat, val in despesas_por_categoria]
-    })
+    # Lê apenas o resumo mensal; ?periodo=YYYY|YYYY-MM ou ?mes_inicio=&mes_fim=
+    try:
+        inicio, fim = resumo_financeiro.meses_do_periodo(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(resumo_financeiro.resumo_do_periodo(inicio, fim))
 
 @financeiro_bp.route('/categorias', methods=['GET'])
+@em_cache('financeiro', ttl=0)
 def get_categorias():
-    categorias_receita = [
-        'Mensalidades',
-        'Doações',
-        'Eventos e Festivais',
-        'Consultas Espirituais',
-        'Trabalhos Espirituais',
-        'Vendas de Materiais',
-        'Outras Receitas'
-    ]
-    
-    categorias_despesa = [
-        'Materiais Religiosos',
-        'Manutenção do Templo',
-        'Energia Elétrica',
-        'Água',
-        'Internet/Telefone',
-        'Limpeza',
-        'Alimentação (Eventos)',
-        'Transporte',
-        'Documentação',
-        'Outras Despesas'
-    ]
-    
     return jsonify({
-        'receita': categorias_receita,
-        'despesa': categorias_despesa
+        'receita': CATEGORIAS_RECEITA,
+        'despesa': CATEGORIAS_DESPESA
     })
-
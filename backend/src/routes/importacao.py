@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, request
+from src.models import db
+from src.services.cache import invalidar_em_escritas
+from src.services.importacao import ESQUEMAS, inserir, ler_csv, validar
+
+importacao_bp = Blueprint('importacao', __name__)
+invalidar_em_escritas(importacao_bp, 'financeiro', 'membro', 'estoque')
+
+
+@importacao_bp.route('/import/<entidade>', methods=['POST'])
+def importar(entidade):
+    if entidade not in ESQUEMAS:
+        return jsonify({'error': f'Entidade inválida: {entidade}'}), 404
+
+    # ?modo=tudo_ou_nada rejeita a importação inteira se alguma linha for inválida
+    modo = request.args.get('modo', 'parcial')
+    if modo not in ('parcial', 'tudo_ou_nada'):
+        return jsonify({'error': "modo deve ser 'parcial' ou 'tudo_ou_nada'"}), 400
+
+    if 'arquivo' in request.files:
+        registros = ler_csv(request.files['arquivo'].read())
+    elif request.mimetype == 'text/csv':
+        registros = ler_csv(request.get_data())
+    else:
+        registros = request.get_json(silent=True)
+        if not isinstance(registros, list):
+            return jsonify({'error': 'Envie uma lista JSON ou um arquivo CSV'}), 400
+
+    validas, erros = validar(entidade, registros)
+    if erros and modo == 'tudo_ou_nada':
+        return jsonify({'inseridos': 0, 'total': len(registros), 'erros': erros}), 400
+
+    inseridos = inserir(entidade, validas)
+    db.session.commit()
+
+    return jsonify({'inseridos': inseridos, 'total': len(registros), 'erros': erros}), 201
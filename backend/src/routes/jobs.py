@@ -0,0 +1,53 @@
+from flask import Blueprint, jsonify, request, send_file
+from src.models.job import Job
+from src.services import jobs
+from src.services.paginacao import aplicar_filtros, paginar, resposta_paginada
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/jobs', methods=['POST'])
+def submeter_job():
+    # {"tipo": "exportacao", "parametros": {"entidade": "transacoes", "formato": "csv", "gzip": true}}
+    data = request.get_json(silent=True) or {}
+    try:
+        job = jobs.submeter(data.get('tipo'), data.get('parametros', {}))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(job.to_dict()), 202, {'Location': f'/api/jobs/{job.id}'}
+
+@jobs_bp.route('/jobs', methods=['GET'])
+def get_jobs():
+    try:
+        query = aplicar_filtros(Job.query, request.args, {'estado': Job.estado, 'tipo': Job.tipo})
+        lista, cursor = paginar(query, [Job.criado_em, Job.id], request.args, decrescente=True, limite_padrao=50)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(lista, cursor)
+
+@jobs_bp.route('/jobs/tipos', methods=['GET'])
+def get_tipos_job():
+    return jsonify(sorted(jobs.TIPOS))
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
+
+@jobs_bp.route('/jobs/<job_id>/resultado', methods=['GET'])
+def get_resultado_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.estado != 'concluido':
+        return jsonify({'error': f'Job ainda não concluído (estado: {job.estado})'}), 409
+    try:
+        return send_file(job.arquivo, mimetype=job.mimetype, as_attachment=True, download_name=job.nome_arquivo)
+    except FileNotFoundError:
+        return jsonify({'error': 'Resultado não está mais disponível'}), 410
+
+@jobs_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    # Pendente ou executando: cancela; já terminado: apaga o job e o resultado
+    job = Job.query.get_or_404(job_id)
+    if job.estado in jobs.ESTADOS_FINAIS:
+        jobs.excluir(job)
+        return '', 204
+    return jsonify(jobs.cancelar(job).to_dict()), 202
@@ -1,13 +1,24 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime, date
-from src.models.membro import Membro, PagamentoMensalidade, db
+from sqlalchemy.exc import IntegrityError
+from src.models.membro import CobrancaMensalidade, ExecucaoCobranca, Membro, PagamentoMensalidade, db
+from src.services.cache import em_cache, invalidar_em_escritas
+from src.services.cobrancas import estornar_receita, gerar_cobrancas, lancar_receitas, reconciliar
+from src.services.extratos import extrato_membro, extratos, periodo_da_requisicao
+from src.services.paginacao import aplicar_filtros, paginar, resposta_paginada
+from src.services.inadimplencia import listar_inadimplentes, mes_atual, meses_da_requisicao, resumo_membros, validar_mes
 
 membro_bp = Blueprint('membro', __name__)
+# Pagamentos e cobranças também lançam/estornam receitas
+invalidar_em_escritas(membro_bp, 'membro', 'financeiro')
 
 @membro_bp.route('/membros', methods=['GET'])
 def get_membros():
-    membros = Membro.query.filter_by(ativo=True).order_by(Membro.nome).all()
-    return jsonify([membro.to_dict() for membro in membros])
+    try:
+        membros, cursor = paginar(Membro.query.filter_by(ativo=True), [Membro.nome, Membro.id], request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(membros, cursor)
 
 @membro_bp.route('/membros', methods=['POST'])
 def create_membro():
@@ -63,26 +74,64 @@ def delete_membro(membro_id):
 
 @membro_bp.route('/membros/<int:membro_id>/pagamentos', methods=['GET'])
 def get_pagamentos_membro(membro_id):
-    pagamentos = PagamentoMensalidade.query.filter_by(membro_id=membro_id).order_by(PagamentoMensalidade.mes_referencia.desc()).all()
-    return jsonify([pagamento.to_dict() for pagamento in pagamentos])
+    try:
+        pagamentos, cursor = paginar(
+            PagamentoMensalidade.query_listagem().filter(PagamentoMensalidade.membro_id == membro_id),
+            [PagamentoMensalidade.mes_referencia, PagamentoMensalidade.id],
+            request.args,
+            decrescente=True
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(pagamentos, cursor, PagamentoMensalidade.linha_to_dict)
+
+@membro_bp.route('/membros/<int:membro_id>/extrato', methods=['GET'])
+def get_extrato_membro(membro_id):
+    # Desde o ingresso por padrão; aceita ?mes_inicio=&mes_fim=YYYY-MM
+    membro = Membro.query.get_or_404(membro_id)
+    try:
+        mes_inicio, mes_fim = periodo_da_requisicao(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(extrato_membro(membro, mes_inicio, mes_fim))
+
+@membro_bp.route('/extratos', methods=['GET'])
+@em_cache('membro')
+def get_extratos():
+    # Membros ativos por padrão; ?incluir_inativos=1, ?somente_devedores=1
+    try:
+        mes_inicio, mes_fim = periodo_da_requisicao(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(extratos(
+        mes_inicio, mes_fim,
+        incluir_inativos=request.args.get('incluir_inativos') == '1',
+        somente_devedores=request.args.get('somente_devedores') == '1'
+    ))
 
 @membro_bp.route('/pagamentos-mensalidade', methods=['GET'])
 def get_pagamentos():
-    pagamentos = PagamentoMensalidade.query.order_by(PagamentoMensalidade.data_pagamento.desc()).all()
-    return jsonify([pagamento.to_dict() for pagamento in pagamentos])
+    try:
+        query = aplicar_filtros(PagamentoMensalidade.query_listagem(), request.args, {
+            'membro_id': PagamentoMensalidade.membro_id,
+            'mes_referencia': PagamentoMensalidade.mes_referencia
+        }, coluna_data=PagamentoMensalidade.data_pagamento)
+        pagamentos, cursor = paginar(
+            query,
+            [PagamentoMensalidade.data_pagamento, PagamentoMensalidade.id],
+            request.args,
+            decrescente=True
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(pagamentos, cursor, PagamentoMensalidade.linha_to_dict)
 
 @membro_bp.route('/pagamentos-mensalidade', methods=['POST'])
 def create_pagamento():
     data = request.json
-    
-    # Verificar se já existe pagamento para este membro no mês
-    existing = PagamentoMensalidade.query.filter_by(
-        membro_id=data['membro_id'],
-        mes_referencia=data['mes_referencia']
-    ).first()
-    
-    if existing:
-        return jsonify({'error': 'Já existe pagamento para este membro neste mês'}), 400
+    membro = db.session.get(Membro, data['membro_id'])
+    if membro is None:
+        return jsonify({'error': 'Membro não encontrado'}), 400
     
     pagamento = PagamentoMensalidade(
         membro_id=data['membro_id'],
@@ -95,6 +144,16 @@ def create_pagamento():
         pagamento.data_pagamento = datetime.strptime(data['data_pagamento'], '%Y-%m-%d').date()
     
     db.session.add(pagamento)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Índice único (membro_id, mes_referencia)
+        db.session.rollback()
+        return jsonify({'error': 'Já existe pagamento para este membro neste mês'}), 400
+    reconciliar(pagamento.mes_referencia, pagamento.membro_id)
+    if db.session.get(ExecucaoCobranca, pagamento.mes_referencia) is not None:
+        # Mês já cobrado: a receita não espera a próxima execução
+        lancar_receitas(pagamento.mes_referencia, pagamento.membro_id)
     db.session.commit()
     return jsonify(pagamento.to_dict()), 201
 
@@ -102,58 +161,55 @@ def create_pagamento():
 def delete_pagamento(pagamento_id):
     pagamento = PagamentoMensalidade.query.get_or_404(pagamento_id)
     db.session.delete(pagamento)
+    db.session.flush()
+    reconciliar(pagamento.mes_referencia, pagamento.membro_id)
+    estornar_receita(pagamento)
     db.session.commit()
     return '', 204
 
 @membro_bp.route('/membros/inadimplentes', methods=['GET'])
 def get_membros_inadimplentes():
-    # Pegar mês atual
-    mes_atual = datetime.now().strftime('%Y-%m')
-    
-    # Buscar membros ativos que não pagaram este mês
-    membros_ativos = Membro.query.filter_by(ativo=True).all()
-    inadimplentes = []
-    
-    for membro in membros_ativos:
-        pagamento_mes = PagamentoMensalidade.query.filter_by(
-            membro_id=membro.id,
-            mes_referencia=mes_atual
-        ).first()
-        
-        if not pagamento_mes and membro.valor_mensalidade > 0:
-            inadimplentes.append(membro.to_dict())
-    
-    return jsonify(inadimplentes)
+    # Mês atual por padrão; aceita ?mes_referencia=YYYY-MM ou ?mes_inicio=&mes_fim=
+    try:
+        meses = meses_da_requisicao(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(listar_inadimplentes(meses))
 
 @membro_bp.route('/resumo-membros', methods=['GET'])
+@em_cache('membro')
 def get_resumo_membros():
-    total_membros = Membro.query.filter_by(ativo=True).count()
-    
-    # Receita mensal esperada
-    receita_esperada = db.session.query(db.func.sum(Membro.valor_mensalidade)).filter_by(ativo=True).scalar() or 0
-    
-    # Receita do mês atual
-    mes_atual = datetime.now().strftime('%Y-%m')
-    receita_mes = db.session.query(db.func.sum(PagamentoMensalidade.valor_pago)).filter_by(mes_referencia=mes_atual).scalar() or 0
-    
-    # Membros inadimplentes
-    membros_ativos = Membro.query.filter_by(ativo=True).all()
-    inadimplentes = 0
-    
-    for membro in membros_ativos:
-        pagamento_mes = PagamentoMensalidade.query.filter_by(
-            membro_id=membro.id,
-            mes_referencia=mes_atual
-        ).first()
-        
-        if not pagamento_mes and membro.valor_mensalidade > 0:
-            inadimplentes += 1
-    
-    return jsonify({
-        'total_membros': total_membros,
-        'receita_esperada_mensal': receita_esperada,
-        'receita_mes_atual': receita_mes,
-        'membros_inadimplentes': inadimplentes,
-        'percentual_adimplencia': ((total_membros - inadimplentes) / total_membros * 100) if total_membros > 0 else 0
-    })
+    return jsonify(resumo_membros())
+
+@membro_bp.route('/cobrancas/gerar', methods=['POST'])
+def post_gerar_cobrancas():
+    data = request.get_json(silent=True) or {}
+    try:
+        mes = validar_mes(data.get('mes_referencia') or mes_atual())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(gerar_cobrancas(mes).to_dict())
+
+@membro_bp.route('/cobrancas/execucoes', methods=['GET'])
+def get_execucoes_cobranca():
+    execucoes = ExecucaoCobranca.query.order_by(ExecucaoCobranca.mes_referencia.desc()).all()
+    return jsonify([execucao.to_dict() for execucao in execucoes])
 
+@membro_bp.route('/cobrancas', methods=['GET'])
+def get_cobrancas():
+    try:
+        query = aplicar_filtros(CobrancaMensalidade.query, request.args, {
+            'mes_referencia': CobrancaMensalidade.mes_referencia,
+            'status': CobrancaMensalidade.status,
+            'membro_id': CobrancaMensalidade.membro_id
+        })
+        cobrancas, cursor = paginar(
+            query.options(db.joinedload(CobrancaMensalidade.membro)),
+            [CobrancaMensalidade.mes_referencia, CobrancaMensalidade.id],
+            request.args,
+            decrescente=True
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_paginada(cobrancas, cursor)
@@ -0,0 +1,31 @@
+from flask import Blueprint, Response, current_app, jsonify
+from src.services.cache import cache_respostas
+from src.services.metricas import metricas
+
+monitoramento_bp = Blueprint('monitoramento', __name__)
+
+@monitoramento_bp.route('/_cache', methods=['GET'])
+def get_estatisticas_cache():
+    return jsonify(cache_respostas.resumo())
+
+@monitoramento_bp.route('/_metrics', methods=['GET'])
+def get_metricas():
+    linhas = [metricas.prometheus()]
+    
+    # Contadores do cache de respostas no mesmo formato
+    linhas.append('# TYPE response_cache_events_total counter\n')
+    for namespace, valores in sorted(cache_respostas.resumo()['namespaces'].items()):
+        for evento in ('hits', 'misses', 'invalidacoes', 'evictions'):
+            linhas.append(f'response_cache_events_total{{namespace="{namespace}",event="{evento}"}} {valores[evento]}\n')
+    
+    # Fila da trilha de auditoria (pendentes é um gauge, o resto são contadores)
+    auditoria = current_app.extensions['auditoria'].resumo()
+    linhas.append('# TYPE audit_queue_pending gauge\n')
+    linhas.append(f"audit_queue_pending {auditoria['pendentes']}\n")
+    linhas.append('# TYPE audit_records_total counter\n')
+    for estado in ('gravados', 'descartados'):
+        linhas.append(f'audit_records_total{{state="{estado}"}} {auditoria[estado]}\n')
+    linhas.append('# TYPE audit_write_failures_total counter\n')
+    linhas.append(f"audit_write_failures_total {auditoria['falhas']}\n")
+    
+    return Response(''.join(linhas), mimetype='text/plain; version=0.0.4')
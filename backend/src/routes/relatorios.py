@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify, request
+from src.services.cache import em_cache
+from src.services.relatorios import fluxo_caixa, intervalo_da_requisicao
+
+relatorios_bp = Blueprint('relatorios', __name__)
+
+@relatorios_bp.route('/relatorios/fluxo-caixa', methods=['GET'])
+@em_cache('financeiro')
+def get_fluxo_caixa():
+    # ?data_inicio=YYYY-MM-DD&data_fim=YYYY-MM-DD&granularidade=dia|semana|mes|ano
+    try:
+        inicio, fim, granularidade = intervalo_da_requisicao(request.args)
+        return jsonify(fluxo_caixa(inicio, fim, granularidade))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
@@ -0,0 +1,227 @@
+"""Feed de alterações para sincronização incremental dos clientes.
+
+Toda inserção, alteração ou exclusão de um registro com id inteiro (membros,
+materiais, transações, pagamentos, cobranças, movimentações, usuários) ganha
+uma linha em `alteracoes`, na mesma transação da escrita. As escritas pelo
+ORM são capturadas pelos eventos after_insert/after_update/after_delete; os
+caminhos que escrevem direto com SQL (importação, movimentação de estoque,
+cobrança em lote) chamam `registrar` com os ids do RETURNING. Resumos,
+consumo, snapshots e jobs ficam de fora: são derivados ou internos.
+
+O cliente guarda o último `seq` recebido e pede `/api/changes?since=<seq>`;
+a resposta traz só o estado atual dos registros alterados desde então (várias
+alterações do mesmo registro viram uma só). Para começar do zero: pedir
+/api/changes sem `since` (devolve o seq atual), carregar as listas e então
+sincronizar a partir desse seq. Como o SQLite tem um só escritor por vez, os
+seq ficam visíveis na ordem em que foram gerados: um cliente nunca pula uma
+alteração que ainda não tinha sido confirmada.
+
+Cada cliente do stream (SSE) ocupa uma thread do worker enquanto está
+conectado. Por isso o stream fecha a cada DURACAO_STREAM (o EventSource
+reconecta sozinho) e cada processo aceita no máximo MAX_STREAMS ao mesmo
+tempo (WEB_THREADS do gunicorn precisa ser maior, para sobrar thread para as
+outras rotas); acima disso a rota responde 503 e o cliente usa /api/changes.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from src.models import db
+from src.models.alteracao import Alteracao
+
+OPERACOES = ('insert', 'update', 'delete')
+INTERVALO_STREAM = 1.0  # segundos entre consultas do stream
+HEARTBEAT_STREAM = 15.0
+DURACAO_STREAM = 60.0  # depois disso o stream fecha e o EventSource reconecta com Last-Event-ID
+MAX_STREAMS = int(os.environ.get('MAX_STREAMS', 2))  # por processo
+
+_vagas_stream = threading.BoundedSemaphore(MAX_STREAMS)
+
+
+class HistoricoIndisponivel(LookupError):
+    """O `since` pedido é anterior à retenção (ou posterior ao log): refazer a carga completa."""
+
+
+def rastreado(mapper):
+    chave = mapper.primary_key
+    return (
+        mapper.class_ is not Alteracao
+        and len(chave) == 1 and chave[0].name == 'id'
+        and isinstance(chave[0].type, db.Integer)
+    )
+
+
+def modelos_rastreados():
+    return {
+        mapper.local_table.name: mapper.class_
+        for mapper in db.Model.registry.mappers if rastreado(mapper)
+    }
+
+
+def registrar(tabela, ids, operacao, executar=None):
+    """Anota a alteração de `ids` em `tabela` na transação atual."""
+    if not ids:
+        return
+    agora = datetime.utcnow()
+    (executar or db.session.execute)(Alteracao.__table__.insert(), [
+        {'tabela': tabela, 'registro_id': registro_id, 'operacao': operacao, 'criado_em': agora}
+        for registro_id in ids
+    ])
+
+
+def _ouvinte(operacao):
+    def anotar(mapper, connection, target):
+        if not rastreado(mapper):
+            return
+        if operacao == 'update':
+            # after_update também dispara para objetos "sujos" sem mudança real
+            estado = inspect(target)
+            if not any(estado.attrs[c.key].history.has_changes() for c in mapper.column_attrs):
+                return
+        registrar(mapper.local_table.name, [target.id], operacao, connection.execute)
+    return anotar
+
+
+_OUVINTES = {operacao: _ouvinte(operacao) for operacao in OPERACOES}
+
+
+def instalar_alteracoes():
+    """Liga os eventos do ORM em todos os modelos (idempotente)."""
+    for operacao in OPERACOES:
+        nome = f'after_{operacao}'
+        if not event.contains(db.Model, nome, _OUVINTES[operacao]):
+            event.listen(db.Model, nome, _OUVINTES[operacao], propagate=True)
+
+
+def seq_atual():
+    return db.session.query(db.func.max(Alteracao.seq)).scalar() or 0
+
+
+def tabelas_da_requisicao(args):
+    rastreadas = modelos_rastreados()
+    tabelas = [t.strip() for t in (args.get('tabelas') or '').split(',') if t.strip()]
+    invalidas = [t for t in tabelas if t not in rastreadas]
+    if invalidas:
+        raise ValueError(f'tabelas inválidas: {", ".join(invalidas)} (use {", ".join(sorted(rastreadas))})')
+    return tabelas
+
+
+def _verificar_since(since):
+    """Retorna o último seq do log."""
+    primeiro, ultimo = db.session.query(db.func.min(Alteracao.seq), db.func.max(Alteracao.seq)).one()
+    ultimo = ultimo or 0
+    if since > ultimo:
+        raise HistoricoIndisponivel(f'since={since} é posterior ao log (último seq: {ultimo})')
+    if primeiro is not None and since < primeiro - 1:
+        raise HistoricoIndisponivel(f'alterações anteriores ao seq {primeiro} já foram removidas')
+    return ultimo
+
+
+def _carregar(modelo, ids):
+    if hasattr(modelo, 'query_listagem'):
+        linhas = modelo.query_listagem().filter(modelo.id.in_(ids)).all()
+        return {linha.id: modelo.linha_to_dict(linha) for linha in linhas}
+    query = modelo.query.filter(modelo.id.in_(ids))
+    for relacao in modelo.__mapper__.relationships:
+        if not relacao.uselist:  # o to_dict lê o nome do membro/material
+            query = query.options(db.selectinload(getattr(modelo, relacao.key)))
+    return {registro.id: registro.to_dict() for registro in query}
+
+
+def alteracoes_desde(since, limite, tabelas=()):
+    """Alterações com seq > since, no máximo `limite` entradas do log por vez.
+
+    Retorna {'ultimo_seq', 'tem_mais', 'alteracoes'}; cada alteração traz o
+    estado atual do registro em 'dados' (None se ele não existe mais).
+    """
+    ultimo = _verificar_since(since)  # mesma transação de leitura das entradas
+    query = Alteracao.query.filter(Alteracao.seq > since)
+    if tabelas:
+        query = query.filter(Alteracao.tabela.in_(tabelas))
+    entradas = query.order_by(Alteracao.seq).limit(limite).all()
+
+    # Várias alterações do mesmo registro: vale a última
+    ultimas = {}
+    for entrada in entradas:
+        ultimas.pop((entrada.tabela, entrada.registro_id), None)
+        ultimas[(entrada.tabela, entrada.registro_id)] = entrada
+
+    modelos = modelos_rastreados()
+    por_tabela = {}
+    for (tabela, registro_id), entrada in ultimas.items():
+        if entrada.operacao != 'delete':
+            por_tabela.setdefault(tabela, []).append(registro_id)
+    atuais = {tabela: _carregar(modelos[tabela], ids) for tabela, ids in por_tabela.items()}
+
+    alteracoes = []
+    for (tabela, registro_id), entrada in ultimas.items():
+        dados = atuais.get(tabela, {}).get(registro_id)
+        alteracoes.append({
+            'seq': entrada.seq,
+            'tabela': tabela,
+            'id': registro_id,
+            'operacao': entrada.operacao if dados is not None else 'delete',
+            'dados': dados
+        })
+    # Com filtro de tabelas, o log pode ter andado sem nenhuma entrada que interesse
+    tem_mais = len(entradas) == limite
+    return {
+        'ultimo_seq': entradas[-1].seq if tem_mais else ultimo,
+        'tem_mais': tem_mais,
+        'alteracoes': alteracoes
+    }
+
+
+def reservar_stream():
+    """Ocupa uma das MAX_STREAMS vagas do processo.
+
+    Retorna a função que libera a vaga, ou None se todas estão ocupadas.
+    """
+    if not _vagas_stream.acquire(blocking=False):
+        return None
+    return _vagas_stream.release
+
+
+def stream(since, limite, tabelas=(), serializar=json.dumps):
+    """Gerador de Server-Sent Events: um evento por lote de alterações.
+
+    O `id` de cada evento é o ultimo_seq do lote, então o EventSource retoma
+    do ponto certo (Last-Event-ID) quando reconecta.
+    """
+    inicio = ultimo_envio = time.monotonic()
+    yield f'retry: {int(INTERVALO_STREAM * 1000)}\n\n'
+    while time.monotonic() - inicio < DURACAO_STREAM:
+        try:
+            lote = alteracoes_desde(since, limite, tabelas)
+        except HistoricoIndisponivel as e:
+            yield f'event: historico_indisponivel\ndata: {serializar({"error": str(e)})}\n\n'
+            return
+        finally:
+            # Não segura uma conexão do pool enquanto espera
+            db.session.close()
+        since = lote['ultimo_seq']
+        if lote['alteracoes']:
+            yield f'id: {since}\nevent: alteracoes\ndata: {serializar(lote)}\n\n'
+            ultimo_envio = time.monotonic()
+            if lote['tem_mais']:
+                continue
+        elif time.monotonic() - ultimo_envio >= HEARTBEAT_STREAM:
+            yield ': ping\n\n'
+            ultimo_envio = time.monotonic()
+        time.sleep(INTERVALO_STREAM)
+
+
+def limpar_alteracoes(dias):
+    """Remove entradas com mais de `dias` dias, preservando sempre a mais recente.
+
+    Clientes com since anterior ao que sobrou recebem 410 e refazem a carga.
+    """
+    limite = datetime.utcnow() - timedelta(days=dias)
+    removidas = Alteracao.query.filter(
+        Alteracao.criado_em < limite,
+        Alteracao.seq < db.session.query(db.func.max(Alteracao.seq)).scalar_subquery()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return removidas
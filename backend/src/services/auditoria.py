@@ -0,0 +1,272 @@
+"""Trilha de auditoria: o antes/depois de toda alteração, gravado fora da requisição.
+
+Os registros são montados no flush da sessão (quando o ORM ainda tem o
+histórico de cada atributo) e ficam em `session.info` até o commit; só então
+vão para uma fila em memória, e um rollback os descarta. Uma thread por
+processo esvazia a fila em lotes num banco SQLite separado
+(AUDITORIA_DATABASE_URL), onde gatilhos recusam UPDATE e DELETE. A
+requisição não espera nenhuma escrita da auditoria: um registro aparece na
+consulta com até INTERVALO segundos de atraso, e o que estiver na fila se
+perde se o processo morrer sem sair normalmente. O escritor do app vai junto
+com os registros pendentes da sessão, então o commit não depende de haver um
+app context ativo.
+
+As escritas com SQL direto (importação, movimentação de estoque, cobrança em
+lote) não passam pelo flush e chamam `anotar`. O usuário vem do cabeçalho
+X-Usuario, já que o app ainda não tem login.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import weakref
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app, has_app_context, has_request_context, request
+from sqlalchemy import event, inspect, text
+from src.models import db
+from src.models.auditoria import RegistroAuditoria
+from src.services.alteracoes import rastreado
+
+LOTE = 500  # registros por INSERT em lote
+INTERVALO = 0.2  # segundos que o escritor espera juntando um lote
+MAX_PENDENTES = 100_000  # acima disso a fila descarta (e conta) em vez de crescer sem limite
+TENTATIVAS = 3
+
+# Escritores vivos do processo; um só gancho de saída para todos
+_escritores = weakref.WeakSet()
+
+ESQUEMA = [
+    'CREATE TABLE IF NOT EXISTS auditoria ('
+    ' seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,'
+    ' criado_em DATETIME NOT NULL,'
+    ' entidade VARCHAR(50) NOT NULL,'
+    ' registro_id INTEGER NOT NULL,'
+    ' operacao VARCHAR(10) NOT NULL,'
+    ' usuario VARCHAR(100),'
+    ' ip VARCHAR(45),'
+    ' requisicao VARCHAR(300),'
+    ' antes TEXT,'
+    ' depois TEXT)',
+    'CREATE INDEX IF NOT EXISTS ix_auditoria_entidade ON auditoria (entidade, registro_id, seq)',
+    'CREATE INDEX IF NOT EXISTS ix_auditoria_usuario ON auditoria (usuario, seq)',
+    'CREATE INDEX IF NOT EXISTS ix_auditoria_criado_em ON auditoria (criado_em)',
+    "CREATE TRIGGER IF NOT EXISTS auditoria_sem_update BEFORE UPDATE ON auditoria"
+    " BEGIN SELECT RAISE(ABORT, 'auditoria aceita apenas inclusões'); END",
+    "CREATE TRIGGER IF NOT EXISTS auditoria_sem_delete BEFORE DELETE ON auditoria"
+    " BEGIN SELECT RAISE(ABORT, 'auditoria aceita apenas inclusões'); END",
+]
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f'{type(valor).__name__} não é serializável')
+
+
+def _json(valores):
+    return None if valores is None else json.dumps(valores, default=_serializar, ensure_ascii=False)
+
+
+class EscritorAuditoria:
+    """Fila em memória + thread que grava os registros em lotes."""
+
+    def __init__(self, engine, logger):
+        self.engine = engine
+        self.logger = logger
+        self.gravados = 0
+        self.descartados = 0
+        self.falhas = 0
+        self._pid = None
+        self._iniciar_estado()
+
+    def _iniciar_estado(self):
+        self._fila = queue.Queue()
+        self._pendentes = 0
+        self._condicao = threading.Condition()
+        self._thread = None
+
+    def _garantir_thread(self):
+        # Uma thread por processo; depois de um fork a fila herdada é do pai
+        if self._pid != os.getpid():
+            self._iniciar_estado()
+            self._pid = os.getpid()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._rodar, name='auditoria', daemon=True)
+            self._thread.start()
+
+    def enfileirar(self, registros):
+        with self._condicao:
+            self._garantir_thread()
+            if self._pendentes >= MAX_PENDENTES:
+                self.descartados += len(registros)
+                self.logger.error('Fila da auditoria cheia: %d registros descartados', len(registros))
+                return
+            self._pendentes += len(registros)
+        self._fila.put(registros)
+
+    def _coletar(self):
+        registros = self._fila.get()
+        if registros is None:
+            return None
+        prazo = time.monotonic() + INTERVALO
+        while len(registros) < LOTE:
+            try:
+                mais = self._fila.get(timeout=max(prazo - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if mais is None:
+                self._fila.put(None)  # termina depois de gravar este lote
+                break
+            registros = registros + mais
+        return registros
+
+    def _rodar(self):
+        while True:
+            registros = self._coletar()
+            if registros is None:
+                return
+            self._gravar(registros)
+
+    def _gravar(self, registros):
+        linhas = [dict(r, antes=_json(r['antes']), depois=_json(r['depois'])) for r in registros]
+        for tentativa in range(1, TENTATIVAS + 1):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(RegistroAuditoria.__table__.insert(), linhas)
+                self.gravados += len(linhas)
+                break
+            except Exception:
+                self.falhas += 1
+                self.logger.exception('Falha ao gravar %d registros de auditoria (tentativa %d)', len(linhas), tentativa)
+                time.sleep(INTERVALO * tentativa)
+        else:
+            self.descartados += len(linhas)
+        with self._condicao:
+            self._pendentes -= len(registros)
+            self._condicao.notify_all()
+
+    def descarregar(self, timeout=5.0):
+        """Espera a fila esvaziar; retorna False se o prazo acabar antes."""
+        with self._condicao:
+            return self._condicao.wait_for(lambda: self._pendentes == 0, timeout)
+
+    def parar(self, timeout=5.0):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._fila.put(None)
+            self._thread.join(timeout)
+
+    def resumo(self):
+        return {
+            'pendentes': self._pendentes,
+            'gravados': self.gravados,
+            'descartados': self.descartados,
+            'falhas': self.falhas
+        }
+
+
+def _contexto():
+    if not has_request_context():
+        return {'usuario': None, 'ip': None, 'requisicao': None}
+    return {
+        'usuario': (request.headers.get('X-Usuario') or '').strip()[:100] or None,
+        'ip': request.remote_addr,
+        'requisicao': f'{request.method} {request.path}'[:300]
+    }
+
+
+def _registro(entidade, registro_id, operacao, antes, depois, contexto):
+    return dict(
+        contexto, criado_em=datetime.utcnow(), entidade=entidade, registro_id=registro_id,
+        operacao=operacao, antes=antes, depois=depois
+    )
+
+
+def _pendentes(session):
+    """Registros da transação; o escritor do app é guardado junto, porque o
+    commit (e o after_commit) pode acontecer fora do app context."""
+    if 'auditoria' not in session.info and has_app_context():
+        session.info['auditoria_escritor'] = current_app.extensions.get('auditoria')
+    return session.info.setdefault('auditoria', [])
+
+
+def anotar(entidade, registro_id, operacao, antes=None, depois=None):
+    """Anota na transação atual uma escrita feita sem o ORM."""
+    _pendentes(db.session()).append(_registro(entidade, registro_id, operacao, antes, depois, _contexto()))
+
+
+def _valores(estado, mapper):
+    # Só o que já está carregado: nunca dispara um SELECT no meio do flush
+    return {attr.key: estado.dict[attr.key] for attr in mapper.column_attrs if attr.key in estado.dict}
+
+
+def _diferencas(estado, mapper):
+    antes, depois = {}, {}
+    for attr in mapper.column_attrs:
+        historico = estado.attrs[attr.key].history
+        if historico.has_changes():
+            antes[attr.key] = historico.deleted[0] if historico.deleted else None
+            depois[attr.key] = historico.added[0] if historico.added else None
+    return antes, depois
+
+
+def _capturar(session, flush_context):
+    # Em after_flush, new/dirty/deleted e o histórico ainda são os de antes do flush
+    contexto = None
+    registros = _pendentes(session)
+    for operacao, objetos in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for objeto in objetos:
+            estado = inspect(objeto)
+            mapper = estado.mapper
+            if not rastreado(mapper):
+                continue
+            if operacao == 'update':
+                antes, depois = _diferencas(estado, mapper)
+                if not depois:
+                    continue
+            elif operacao == 'insert':
+                antes, depois = None, _valores(estado, mapper)
+            else:
+                antes, depois = _valores(estado, mapper), None
+            contexto = contexto or _contexto()
+            registro_id = estado.dict.get('id') or estado.identity[0]
+            registros.append(_registro(mapper.local_table.name, registro_id, operacao, antes, depois, contexto))
+
+
+def _enviar(session):
+    registros = session.info.pop('auditoria', None)
+    escritor = session.info.pop('auditoria_escritor', None)  # apps montados sem o create_app não auditam
+    if registros and escritor is not None:
+        escritor.enfileirar(registros)
+
+
+def _descartar(session):
+    session.info.pop('auditoria', None)
+    session.info.pop('auditoria_escritor', None)
+
+
+@atexit.register
+def _parar_escritores():
+    for escritor in list(_escritores):
+        escritor.parar()
+
+
+_EVENTOS = {'after_flush': _capturar, 'after_commit': _enviar, 'after_rollback': _descartar}
+
+
+def instalar_auditoria(app):
+    """Prepara o banco da auditoria e liga os eventos da sessão (idempotente)."""
+    engine = db.engines['auditoria']
+    with engine.begin() as conn:
+        for sql in ESQUEMA:
+            conn.execute(text(sql))
+    escritor = EscritorAuditoria(engine, app.logger)
+    app.extensions['auditoria'] = escritor
+    _escritores.add(escritor)
+    for nome, funcao in _EVENTOS.items():
+        if not event.contains(db.session, nome, funcao):
+            event.listen(db.session, nome, funcao)
@@ -0,0 +1,69 @@
+"""Busca textual em membros, materiais e transações com SQLite FTS5.
+
+Os índices (busca_membros, busca_materiais, busca_transacoes) são criados
+pela migração 7 e mantidos por triggers. O tokenizador unicode61 com
+remove_diacritics ignora acentos e caixa: "oxossi" encontra "Oxóssi".
+"""
+import re
+from sqlalchemy import (
+    Float, Integer, String, column, func, literal, literal_column, select, table, text, type_coerce, union_all
+)
+from src.models import db
+from src.models.estoque import Material
+from src.models.financeiro import Transacao
+from src.models.membro import Membro
+
+# tipo -> (índice FTS, modelo, coluna do título, pesos bm25 por coluna indexada, filtro extra)
+FONTES = {
+    'membros': ('busca_membros', Membro, Membro.nome, (10.0, 3.0, 3.0, 1.0), Membro.ativo == True),
+    'materiais': ('busca_materiais', Material, Material.nome, (10.0, 2.0, 3.0), Material.ativo == True),
+    'transacoes': ('busca_transacoes', Transacao, Transacao.descricao, (1.0,), None),
+}
+
+TAMANHO_TRECHO = 12
+
+
+def consulta_fts(termo):
+    """Converte o texto digitado numa consulta FTS5 segura.
+
+    Cada palavra vira um prefixo entre aspas ("vel"* encontra "velas") e
+    todas precisam aparecer; operadores e aspas do usuário são ignorados.
+    """
+    palavras = re.findall(r'\w+', termo or '')
+    if not palavras:
+        raise ValueError('q é obrigatório')
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def tipos_da_requisicao(args):
+    tipos = [t.strip() for t in args.get('tipos', '').split(',') if t.strip()] or list(FONTES)
+    invalidos = [t for t in tipos if t not in FONTES]
+    if invalidos:
+        raise ValueError(f'tipos inválidos: {", ".join(invalidos)} (use {", ".join(FONTES)})')
+    return tipos
+
+
+def _select(tipo, consulta):
+    indice, modelo, titulo, pesos, filtro = FONTES[tipo]
+    fts = literal_column(indice)
+    tabela_fts = table(indice, column('rowid'))
+    stmt = select(
+        type_coerce(literal(tipo), String).label('tipo'),
+        type_coerce(modelo.id, Integer).label('id'),
+        titulo.label('titulo'),
+        func.snippet(fts, -1, '[', ']', '…', TAMANHO_TRECHO).label('trecho'),
+        # bm25 é negativo: quanto menor, mais relevante
+        type_coerce(func.bm25(fts, *pesos), Float).label('relevancia')
+    ).select_from(
+        tabela_fts.join(modelo.__table__, modelo.id == tabela_fts.c.rowid)
+    ).where(text(f'{indice} MATCH :consulta').bindparams(consulta=consulta))
+    if filtro is not None:
+        stmt = stmt.where(filtro)
+    return stmt
+
+
+def query_busca(termo, tipos=None):
+    """Query única (UNION ALL) com os resultados de todas as fontes pedidas."""
+    consulta = consulta_fts(termo)
+    resultados = union_all(*[_select(tipo, consulta) for tipo in (tipos or FONTES)]).subquery('resultados')
+    return db.session.query(resultados), [resultados.c.relevancia, resultados.c.tipo, resultados.c.id]
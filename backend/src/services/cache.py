@@ -0,0 +1,138 @@
+"""Cache em memória (TTL + LRU) para as rotas de resumo, com ETag/Last-Modified.
+
+Cada rota em cache pertence a um namespace (normalmente o blueprint); as
+escritas bem-sucedidas no blueprint invalidam o namespace inteiro.
+
+O cache é de cada processo, mas a validade não: toda entrada guarda o `seq`
+do feed de alterações de quando foi montada, e a cada leitura o seq atual
+(um MAX na chave primária) é comparado com ele. Uma escrita feita por outro
+worker do gunicorn, pela linha de comando ou por um job avança o seq e
+derruba as entradas de todos os processos na próxima requisição. O TTL só
+limita respostas que mudam com o relógio (previsões calculadas até hoje).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, request
+from src.services.alteracoes import seq_atual
+
+METODOS_ESCRITA = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class CacheRespostas:
+    def __init__(self, max_entradas=256, ttl_padrao=30):
+        self.max_entradas = max_entradas
+        self.ttl_padrao = ttl_padrao
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.estatisticas = defaultdict(lambda: {'hits': 0, 'misses': 0, 'invalidacoes': 0, 'evictions': 0})
+
+    def obter(self, chave, versao=None):
+        namespace = chave[0]
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada['versao'] != versao:
+                # Alterado por outro processo desde que a entrada foi montada
+                del self._entradas[chave]
+                self.estatisticas[namespace]['invalidacoes'] += 1
+                entrada = None
+            if entrada is None or (entrada['expira_em'] is not None and entrada['expira_em'] < time.monotonic()):
+                if entrada is not None:
+                    del self._entradas[chave]
+                self.estatisticas[namespace]['misses'] += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.estatisticas[namespace]['hits'] += 1
+            return entrada
+
+    def guardar(self, chave, corpo, mimetype, ttl, versao=None):
+        entrada = {
+            'versao': versao,
+            'corpo': corpo,
+            'mimetype': mimetype,
+            'etag': hashlib.sha1(corpo).hexdigest(),
+            'modificado_em': datetime.now(timezone.utc).replace(microsecond=0),
+            'expira_em': time.monotonic() + ttl if ttl else None
+        }
+        with self._lock:
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                removida, _ = self._entradas.popitem(last=False)
+                self.estatisticas[removida[0]]['evictions'] += 1
+        return entrada
+
+    def invalidar(self, *namespaces):
+        with self._lock:
+            for chave in [c for c in self._entradas if c[0] in namespaces]:
+                del self._entradas[chave]
+            for namespace in namespaces:
+                self.estatisticas[namespace]['invalidacoes'] += 1
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def resumo(self):
+        with self._lock:
+            por_namespace = defaultdict(int)
+            for namespace, _ in self._entradas:
+                por_namespace[namespace] += 1
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'namespaces': {
+                    namespace: dict(valores, entradas=por_namespace[namespace])
+                    for namespace, valores in self.estatisticas.items()
+                }
+            }
+
+
+cache_respostas = CacheRespostas()
+
+
+def _resposta(entrada):
+    response = Response(entrada['corpo'], mimetype=entrada['mimetype'])
+    response.set_etag(entrada['etag'])
+    response.last_modified = entrada['modificado_em']
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def em_cache(namespace, ttl=None):
+    """Guarda a resposta JSON da rota GET; ttl=0 mantém até a próxima invalidação."""
+    def decorador(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            chave = (namespace, request.full_path)
+            # Lido antes da view: uma escrita no meio só faz a entrada expirar mais cedo
+            versao = seq_atual()
+            entrada = cache_respostas.obter(chave, versao)
+            if entrada is None:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                entrada = cache_respostas.guardar(
+                    chave,
+                    response.get_data(),
+                    response.mimetype,
+                    cache_respostas.ttl_padrao if ttl is None else ttl,
+                    versao
+                )
+            return _resposta(entrada)
+        return wrapper
+    return decorador
+
+
+def invalidar_em_escritas(blueprint, *namespaces):
+    """Invalida os namespaces após qualquer escrita bem-sucedida no blueprint."""
+    namespaces = namespaces or (blueprint.name,)
+
+    @blueprint.after_request
+    def _invalidar(response):
+        if request.method in METODOS_ESCRITA and response.status_code < 400:
+            cache_respostas.invalidar(*namespaces)
+        return response
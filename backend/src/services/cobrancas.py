@@ -0,0 +1,158 @@
+"""Execução mensal de cobrança de mensalidades.
+
+`gerar_cobrancas` cria, com um único INSERT ... SELECT, a cobrança do mês
+para cada membro ativo, reconcilia todas com os pagamentos e lança numa só
+leva as receitas 'Mensalidades' dos pagamentos. Pode ser executada de novo
+para o mesmo mês sem duplicar nada: cobranças existentes são ignoradas e só
+os pagamentos ainda sem receita são lançados.
+
+Cada pagamento guarda o id da sua receita (transacao_id). Um pagamento
+registrado num mês que já foi cobrado tem a receita lançada na hora; a
+exclusão do pagamento estorna a receita pelo id. A receita lançada é só de
+leitura pela API de transações: muda ou sai junto com o pagamento. Receitas
+de mensalidade lançadas à mão antes disso foram ligadas aos pagamentos pela
+migração 13, para não serem lançadas de novo.
+"""
+from collections import defaultdict
+from datetime import datetime, time
+from sqlalchemy import text
+from src.models.dinheiro import ZERO, Dinheiro, de_centavos
+from src.models.financeiro import Transacao
+from src.models.membro import ExecucaoCobranca, PagamentoMensalidade, db
+from src.services import resumo_financeiro
+from src.services.alteracoes import registrar
+from src.services.auditoria import anotar
+
+CATEGORIA_MENSALIDADES = 'Mensalidades'
+
+SQL_GERAR = text(
+    "INSERT OR IGNORE INTO cobrancas_mensalidade "
+    "(membro_id, mes_referencia, valor_esperado, valor_pago, status, created_at) "
+    "SELECT id, :mes, valor_mensalidade, 0, 'aberta', :agora FROM membros "
+    "WHERE ativo = 1 AND valor_mensalidade > 0 RETURNING id, membro_id, valor_esperado"
+)
+
+SQL_RECONCILIAR = (
+    "UPDATE cobrancas_mensalidade SET valor_pago = COALESCE(("
+    " SELECT SUM(p.valor_pago) FROM pagamentos_mensalidade p"
+    " WHERE p.membro_id = cobrancas_mensalidade.membro_id"
+    " AND p.mes_referencia = cobrancas_mensalidade.mes_referencia), 0) "
+    "WHERE mes_referencia = :mes{filtro} RETURNING id, valor_pago"
+)
+
+SQL_STATUS = (
+    "UPDATE cobrancas_mensalidade SET status = CASE"
+    " WHEN valor_pago >= valor_esperado THEN 'paga'"
+    " WHEN valor_pago > 0 THEN 'parcial'"
+    " ELSE 'aberta' END "
+    "WHERE mes_referencia = :mes{filtro}"
+)
+
+
+# Pagamentos do mês que ainda não têm receita, pelo índice (mes_referencia)
+SQL_PENDENTES = (
+    "SELECT p.id, p.membro_id, p.valor_pago, p.data_pagamento, p.created_at, m.nome "
+    "FROM pagamentos_mensalidade p JOIN membros m ON m.id = p.membro_id "
+    "WHERE p.mes_referencia = :mes AND p.transacao_id IS NULL{filtro} ORDER BY p.id"
+)
+
+
+def reconciliar(mes, membro_id=None):
+    """Atualiza valor_pago/status das cobranças do mês (ou de um membro)."""
+    filtro = ' AND membro_id = :membro_id' if membro_id is not None else ''
+    params = {'mes': mes, 'membro_id': membro_id}
+    linhas = db.session.execute(text(SQL_RECONCILIAR.format(filtro=filtro)), params).all()
+    db.session.execute(text(SQL_STATUS.format(filtro=filtro)), params)
+    registrar('cobrancas_mensalidade', [linha.id for linha in linhas], 'update')
+    for linha in linhas:
+        anotar('cobrancas_mensalidade', linha.id, 'update', depois={'valor_pago': de_centavos(linha.valor_pago)})
+
+
+def lancar_receitas(mes, membro_id=None):
+    """Lança numa só leva as receitas dos pagamentos do mês (ou de um membro) ainda sem receita.
+
+    O id da receita fica no pagamento (transacao_id): é o que torna a
+    execução idempotente e o que o estorno usa. Retorna quantas foram lançadas.
+    """
+    filtro = ' AND p.membro_id = :membro_id' if membro_id is not None else ''
+    sql = text(SQL_PENDENTES.format(filtro=filtro)).columns(
+        valor_pago=Dinheiro, data_pagamento=db.Date, created_at=db.DateTime
+    )
+    pendentes = db.session.execute(sql, {'mes': mes, 'membro_id': membro_id}).all()
+    if not pendentes:
+        return 0
+
+    agora = datetime.utcnow()
+    receitas = [
+        {
+            'descricao': f'Mensalidade {mes} - {p.nome}',
+            'valor': p.valor_pago,
+            'tipo': 'receita',
+            'categoria': CATEGORIA_MENSALIDADES,
+            'subcategoria': mes,
+            'data': datetime.combine(p.data_pagamento, time()) if p.data_pagamento else p.created_at or agora,
+            'membro_id': p.membro_id,
+            'created_at': agora
+        }
+        for p in pendentes
+    ]
+    tabela = Transacao.__table__
+    ids = db.session.execute(
+        tabela.insert().returning(tabela.c.id, sort_by_parameter_order=True), receitas
+    ).scalars().all()
+    db.session.execute(text('UPDATE pagamentos_mensalidade SET transacao_id = :transacao_id WHERE id = :id'), [
+        {'id': p.id, 'transacao_id': transacao_id} for p, transacao_id in zip(pendentes, ids)
+    ])
+
+    # Escritas sem o ORM: feed, auditoria e resumo mensal são anotados aqui
+    registrar('transacoes', ids, 'insert')
+    registrar('pagamentos_mensalidade', [p.id for p in pendentes], 'update')
+    deltas = defaultdict(lambda: [ZERO, 0])
+    for p, transacao_id, receita in zip(pendentes, ids, receitas):
+        anotar('transacoes', transacao_id, 'insert', depois=dict(receita, id=transacao_id))
+        anotar('pagamentos_mensalidade', p.id, 'update', {'transacao_id': None}, {'transacao_id': transacao_id})
+        delta = deltas[receita['data'].strftime('%Y-%m')]
+        delta[0] += receita['valor']
+        delta[1] += 1
+    for ano_mes, (soma, contagem) in deltas.items():
+        resumo_financeiro.aplicar_delta((ano_mes, 'receita', CATEGORIA_MENSALIDADES), soma, contagem)
+    return len(ids)
+
+
+def receita_do_pagamento(transacao_id):
+    """O pagamento cuja receita é a transação `transacao_id` (ou None)."""
+    return PagamentoMensalidade.query.filter_by(transacao_id=transacao_id).first()
+
+
+def estornar_receita(pagamento):
+    """Remove a receita lançada para o pagamento excluído, se houver."""
+    transacao = db.session.get(Transacao, pagamento.transacao_id) if pagamento.transacao_id else None
+    if transacao is not None:
+        db.session.delete(transacao)
+        resumo_financeiro.registrar_remocao(transacao)
+
+
+def gerar_cobrancas(mes):
+    """Executa a cobrança do mês numa única transação e retorna o registro da execução."""
+    agora = datetime.utcnow()
+    linhas = db.session.execute(SQL_GERAR, {'mes': mes, 'agora': agora}).all()
+    registrar('cobrancas_mensalidade', [linha.id for linha in linhas], 'insert')
+    for linha in linhas:
+        anotar('cobrancas_mensalidade', linha.id, 'insert', depois={
+            'membro_id': linha.membro_id, 'mes_referencia': mes,
+            'valor_esperado': de_centavos(linha.valor_esperado), 'status': 'aberta'
+        })
+    geradas = len(linhas)
+    reconciliar(mes)
+    lancadas = lancar_receitas(mes)
+
+    execucao = db.session.get(ExecucaoCobranca, mes)
+    if execucao is None:
+        execucao = ExecucaoCobranca(mes_referencia=mes, cobrancas_geradas=0, transacoes_lancadas=0)
+        db.session.add(execucao)
+    execucao.executada_em = agora
+    execucao.cobrancas_geradas += geradas
+    execucao.transacoes_lancadas += lancadas
+    db.session.commit()
+    return execucao
+
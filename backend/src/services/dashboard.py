@@ -0,0 +1,75 @@
+"""Painel inicial: os três resumos calculados em paralelo numa só resposta.
+
+Cada seção roda numa thread própria, dentro do seu próprio app context e,
+portanto, com sessão e conexão próprias (o SQLite em WAL aceita leitores
+simultâneos e o driver solta o GIL durante a consulta). A latência fica
+limitada pela seção mais lenta. Cada seção reaproveita o cache de respostas
+no namespace da rota equivalente, e é invalidada pelas mesmas escritas.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from src.services.alteracoes import seq_atual
+from src.services.cache import cache_respostas
+from src.services.estoque import resumo_estoque
+from src.services.inadimplencia import resumo_membros
+from src.services.metricas import contador_atual, medindo
+from src.services.resumo_financeiro import resumo_do_periodo
+
+THREADS = 8
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _obter_executor():
+    # Um pool por processo; depois de um fork o pool herdado não tem threads
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix='dashboard')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _secao(app, contador, namespace, chave, calcular, versao):
+    inicio = time.perf_counter()
+    entrada = cache_respostas.obter((namespace, chave), versao)
+    if entrada is not None:
+        dados, em_cache = json.loads(entrada['corpo']), True
+    else:
+        with app.app_context(), medindo(contador):
+            dados = calcular()
+        cache_respostas.guardar(
+            (namespace, chave), app.json.dumps(dados).encode(), 'application/json', cache_respostas.ttl_padrao, versao
+        )
+        em_cache = False
+    return dados, {'ms': round((time.perf_counter() - inicio) * 1000, 2), 'cache': em_cache}
+
+
+def montar_dashboard(inicio_periodo=None, fim_periodo=None):
+    """Retorna {'financeiro', 'membros', 'estoque', 'tempos'}."""
+    app = current_app._get_current_object()
+    contador = contador_atual()  # o SQL das seções conta para a requisição
+    inicio = time.perf_counter()
+    versao = seq_atual()
+    secoes = {
+        'financeiro': ('financeiro', f'dashboard:{inicio_periodo}:{fim_periodo}',
+                       lambda: resumo_do_periodo(inicio_periodo, fim_periodo)),
+        'membros': ('membro', 'dashboard', resumo_membros),
+        'estoque': ('estoque', 'dashboard', resumo_estoque),
+    }
+    futuros = {
+        nome: _obter_executor().submit(_secao, app, contador, namespace, chave, calcular, versao)
+        for nome, (namespace, chave, calcular) in secoes.items()
+    }
+    resposta, tempos = {}, {}
+    for nome, futuro in futuros.items():
+        resposta[nome], tempos[nome] = futuro.result()
+    tempos['total_ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+    resposta['tempos'] = tempos
+    return resposta
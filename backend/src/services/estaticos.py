@@ -0,0 +1,122 @@
+"""Servidor dos arquivos do build do frontend (pasta static/).
+
+A pasta é indexada uma vez na inicialização; cada requisição só consulta um
+dicionário. Se existirem `arquivo.br`/`arquivo.gz` ao lado do original,
+eles são servidos quando o cliente aceita a codificação, desde que não sejam
+mais antigos que o original (uma variante de um build anterior que sobrou
+na pasta é ignorada, e o original vai sem compressão). Os arquivos com
+hash no nome (o Vite gera `assets/index-BzQ1x2Ab.js`) nunca mudam de
+conteúdo, então recebem cache de um ano; o resto, inclusive o index.html,
+é revalidado a cada uso via ETag.
+
+As variantes comprimidas são geradas por `comprimir_estaticos` (comando
+`flask comprimir-estaticos`); o brotli só é usado se o pacote estiver
+instalado.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from flask import request, send_file
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+# O Vite só põe em assets/ arquivos nomeados como nome-<hash de 8 caracteres>.ext
+PASTA_ASSETS = 'assets/'
+PADRAO_HASH = re.compile(r'-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+# Codificação -> extensão, em ordem de preferência
+CODIFICACOES = (('br', '.br'), ('gzip', '.gz'))
+EXTENSOES_COMPRIMIVEIS = ('.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.xml', '.map', '.ico', '.wasm')
+TAMANHO_MINIMO = 1024
+
+
+def _variante_atual(original, variante):
+    return os.path.isfile(variante) and os.path.getmtime(variante) >= os.path.getmtime(original)
+
+
+class IndiceEstatico:
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.arquivos = {}
+        self.indexar()
+
+    def indexar(self):
+        arquivos = {}
+        if self.pasta and os.path.isdir(self.pasta):
+            for raiz, _, nomes in os.walk(self.pasta):
+                for nome in nomes:
+                    caminho = os.path.join(raiz, nome)
+                    relativo = os.path.relpath(caminho, self.pasta).replace(os.sep, '/')
+                    if relativo.endswith(tuple(ext for _, ext in CODIFICACOES)):
+                        continue
+                    arquivos[relativo] = {
+                        'caminho': caminho,
+                        'mimetype': mimetypes.guess_type(nome)[0] or 'application/octet-stream',
+                        'imutavel': relativo.startswith(PASTA_ASSETS) and bool(PADRAO_HASH.search(nome)),
+                        'variantes': {
+                            codificacao: caminho + extensao
+                            for codificacao, extensao in CODIFICACOES
+                            if _variante_atual(caminho, caminho + extensao)
+                        }
+                    }
+        self.arquivos = arquivos
+
+    def _escolher(self, entrada):
+        for codificacao, _ in CODIFICACOES:
+            if codificacao in entrada['variantes'] and request.accept_encodings[codificacao]:
+                return entrada['variantes'][codificacao], codificacao
+        return entrada['caminho'], None
+
+    def servir(self, caminho):
+        """Responde com o arquivo pedido ou, se não existir, com o index.html (SPA)."""
+        entrada = self.arquivos.get(caminho) or self.arquivos.get('index.html')
+        if entrada is None:
+            return None
+        arquivo, codificacao = self._escolher(entrada)
+        response = send_file(arquivo, mimetype=entrada['mimetype'], conditional=True, etag=True)
+        if codificacao:
+            response.headers['Content-Encoding'] = codificacao
+        if entrada['variantes']:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = CACHE_IMUTAVEL if entrada['imutavel'] else CACHE_REVALIDAR
+        return response
+
+
+def comprimir_estaticos(pasta, nivel_gzip=9):
+    """Gera as variantes .gz (e .br, se possível) dos arquivos comprimíveis.
+
+    Pula arquivos pequenos, variantes já atualizadas e as que não ficariam
+    menores que o original. Retorna quantas variantes foram escritas.
+    """
+    escritas = 0
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            if not nome.endswith(EXTENSOES_COMPRIMIVEIS) or os.path.getsize(caminho) < TAMANHO_MINIMO:
+                continue
+            with open(caminho, 'rb') as arquivo:
+                dados = None
+                for codificacao, extensao in CODIFICACOES:
+                    if codificacao == 'br' and brotli is None:
+                        continue
+                    destino = caminho + extensao
+                    if _variante_atual(caminho, destino):
+                        continue
+                    dados = dados if dados is not None else arquivo.read()
+                    if codificacao == 'br':
+                        comprimido = brotli.compress(dados, quality=11)
+                    else:
+                        # mtime=0 deixa o .gz idêntico entre builds
+                        comprimido = gzip.compress(dados, compresslevel=nivel_gzip, mtime=0)
+                    if len(comprimido) >= len(dados):
+                        continue
+                    with open(destino, 'wb') as saida:
+                        saida.write(comprimido)
+                    escritas += 1
+    return escritas
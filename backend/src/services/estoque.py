@@ -0,0 +1,199 @@
+"""Movimentações de estoque aplicadas com UPDATEs condicionais atômicos.
+
+A validação de saldo acontece no próprio UPDATE (`WHERE quantidade_atual >= :q`),
+então duas saídas concorrentes nunca deixam o estoque negativo: o banco
+serializa as escritas e a segunda simplesmente não encontra saldo.
+"""
+from datetime import datetime
+from sqlalchemy import bindparam, text
+from src.models.dinheiro import ZERO
+from src.models.estoque import Material, MovimentacaoEstoque, ResumoEstoqueCategoria, db
+from src.services.alteracoes import registrar
+from src.services.auditoria import anotar
+from src.services.previsao_estoque import registrar_consumo
+
+TIPOS_MOVIMENTACAO = ('entrada', 'saida', 'ajuste')
+
+# Filtro que define "estoque baixo"; igual ao WHERE do índice parcial ix_materiais_estoque_baixo
+FILTRO_ESTOQUE_BAIXO = 'ativo = 1 AND quantidade_atual <= quantidade_minima'
+
+# preco_unitario está em centavos; cada material é arredondado ao centavo
+# (como o valor_total de Material.to_dict) e a soma é inteira
+SQL_RESUMO_CATEGORIAS = (
+    "INSERT INTO resumo_estoque_categoria "
+    "(categoria, total_materiais, valor_total, materiais_baixo_estoque) "
+    "SELECT categoria, COUNT(*), COALESCE(SUM(CAST(ROUND(preco_unitario * quantidade_atual) AS INTEGER)), 0), "
+    "SUM(CASE WHEN quantidade_atual <= quantidade_minima THEN 1 ELSE 0 END) "
+    "FROM materiais WHERE ativo = 1{filtro} GROUP BY categoria"
+)
+
+# A mesma agregação só das linhas `ids`, somada (:sinal = 1) ou subtraída
+# (:sinal = -1) da linha do resumo de cada categoria
+SQL_DELTA_RESUMO = (
+    "INSERT INTO resumo_estoque_categoria "
+    "(categoria, total_materiais, valor_total, materiais_baixo_estoque) "
+    "SELECT categoria, :sinal * COUNT(*), "
+    ":sinal * COALESCE(SUM(CAST(ROUND(preco_unitario * quantidade_atual) AS INTEGER)), 0), "
+    ":sinal * SUM(CASE WHEN quantidade_atual <= quantidade_minima THEN 1 ELSE 0 END) "
+    "FROM materiais WHERE ativo = 1 AND id IN :ids GROUP BY categoria "
+    "ON CONFLICT (categoria) DO UPDATE SET "
+    "total_materiais = total_materiais + excluded.total_materiais, "
+    "valor_total = valor_total + excluded.valor_total, "
+    "materiais_baixo_estoque = materiais_baixo_estoque + excluded.materiais_baixo_estoque"
+)
+
+
+class MaterialNaoEncontrado(LookupError):
+    pass
+
+
+class EstoqueInsuficiente(ValueError):
+    pass
+
+
+def validar_movimentacao(dados):
+    tipo = dados.get('tipo_movimentacao')
+    if tipo not in TIPOS_MOVIMENTACAO:
+        raise ValueError("tipo_movimentacao deve ser 'entrada', 'saida' ou 'ajuste'")
+    try:
+        quantidade = float(dados['quantidade'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('quantidade inválida')
+    if quantidade < 0 or (quantidade == 0 and tipo != 'ajuste'):
+        raise ValueError('quantidade deve ser positiva')
+    if not dados.get('motivo'):
+        raise ValueError('motivo é obrigatório')
+    return tipo, quantidade
+
+
+def aplicar_movimentacao(material_id, dados):
+    """Aplica uma movimentação na transação atual (sem commit)."""
+    tipo, quantidade = validar_movimentacao(dados)
+    tabela = Material.__table__
+    agora = datetime.utcnow()
+    retirar_do_resumo([material_id])
+
+    anterior = None
+    if tipo == 'ajuste':
+        # O RETURNING só traz o valor novo: um UPDATE sem efeito antes do ajuste
+        # lê o anterior já com o lock de escrita, sem janela para outra escrita
+        anterior = db.session.execute(
+            tabela.update().where(tabela.c.id == material_id).values(updated_at=agora)
+            .returning(tabela.c.quantidade_atual)
+        ).scalar()
+
+    stmt = tabela.update().where(tabela.c.id == material_id)
+    if tipo == 'entrada':
+        stmt = stmt.values(quantidade_atual=tabela.c.quantidade_atual + quantidade)
+    elif tipo == 'saida':
+        stmt = stmt.where(tabela.c.quantidade_atual >= quantidade).values(
+            quantidade_atual=tabela.c.quantidade_atual - quantidade
+        )
+    else:
+        stmt = stmt.values(quantidade_atual=quantidade)
+
+    nova_quantidade = db.session.execute(
+        stmt.values(updated_at=agora).returning(tabela.c.quantidade_atual)
+    ).scalar()
+    if nova_quantidade is None:
+        if db.session.get(Material, material_id) is None:
+            raise MaterialNaoEncontrado(f'Material {material_id} não encontrado')
+        raise EstoqueInsuficiente('Quantidade insuficiente em estoque')
+    if anterior is None:
+        anterior = nova_quantidade - quantidade if tipo == 'entrada' else nova_quantidade + quantidade
+    somar_ao_resumo([material_id])
+
+    movimentacao = {
+        'material_id': material_id,
+        'tipo_movimentacao': tipo,
+        'quantidade': quantidade,
+        'motivo': dados['motivo'],
+        'observacoes': dados.get('observacoes'),
+        'data_movimentacao': agora,
+        'created_at': agora
+    }
+    movimentacao_id = db.session.execute(
+        MovimentacaoEstoque.__table__.insert().values(**movimentacao)
+    ).inserted_primary_key[0]
+    # Escritas sem o ORM: os eventos não disparam, feed e auditoria são anotados aqui
+    registrar('materiais', [material_id], 'update')
+    registrar('movimentacoes_estoque', [movimentacao_id], 'insert')
+    anotar('materiais', material_id, 'update', {'quantidade_atual': anterior}, {'quantidade_atual': nova_quantidade})
+    anotar('movimentacoes_estoque', movimentacao_id, 'insert', depois=dict(movimentacao, id=movimentacao_id))
+    if tipo == 'saida':
+        registrar_consumo(material_id, quantidade, agora)
+
+
+def aplicar_lote(movimentacoes, motivo_padrao=None):
+    """Aplica várias movimentações numa única transação, tudo ou nada.
+
+    Retorna os ids dos materiais afetados; em caso de erro desfaz o lote e
+    relança a exceção com o índice (a partir de 0) da movimentação que falhou.
+    """
+    afetados = []
+    try:
+        for indice, dados in enumerate(movimentacoes):
+            if not isinstance(dados, dict) or 'material_id' not in dados:
+                raise ValueError(f'movimentação {indice}: material_id é obrigatório')
+            if motivo_padrao and not dados.get('motivo'):
+                dados = dict(dados, motivo=motivo_padrao)
+            try:
+                aplicar_movimentacao(int(dados['material_id']), dados)
+            except (LookupError, ValueError) as e:
+                raise type(e)(f'movimentação {indice}: {e}')
+            if int(dados['material_id']) not in afetados:
+                afetados.append(int(dados['material_id']))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return afetados
+
+
+def _aplicar_delta_resumo(material_ids, sinal):
+    ids = sorted(set(material_ids))
+    if not ids:
+        return
+    db.session.execute(
+        text(SQL_DELTA_RESUMO).bindparams(bindparam('ids', expanding=True)), {'ids': ids, 'sinal': sinal}
+    )
+    if sinal < 0:
+        db.session.execute(text('DELETE FROM resumo_estoque_categoria WHERE total_materiais <= 0'))
+
+
+def retirar_do_resumo(material_ids):
+    """Subtrai do resumo a contribuição atual dos materiais (sem commit).
+
+    Chamado antes de alterar os materiais, com `somar_ao_resumo` depois: cada
+    escrita custa dois UPSERTs de uma linha, qualquer que seja o tamanho da
+    categoria.
+    """
+    _aplicar_delta_resumo(material_ids, -1)
+
+
+def somar_ao_resumo(material_ids):
+    """Soma ao resumo a contribuição atual dos materiais (sem commit)."""
+    _aplicar_delta_resumo(material_ids, 1)
+
+
+def reconstruir_resumo_estoque(conn=None):
+    executar = conn.execute if conn is not None else db.session.execute
+    executar(text('DELETE FROM resumo_estoque_categoria'))
+    executar(text(SQL_RESUMO_CATEGORIAS.format(filtro='')))
+
+
+def query_alertas():
+    """Materiais com estoque baixo, lidos pelo índice parcial."""
+    return Material.query.filter(text(FILTRO_ESTOQUE_BAIXO))
+
+
+def resumo_estoque():
+    """Corpo de /resumo-estoque, lido só do resumo por categoria."""
+    categorias = ResumoEstoqueCategoria.query.order_by(ResumoEstoqueCategoria.categoria).all()
+    return {
+        'total_materiais': sum(c.total_materiais for c in categorias),
+        'materiais_baixo_estoque': sum(c.materiais_baixo_estoque for c in categorias),
+        'valor_total_estoque': sum((c.valor_total for c in categorias), ZERO),
+        'materiais_por_categoria': [{'categoria': c.categoria, 'quantidade': c.total_materiais} for c in categorias],
+        'categorias': [c.to_dict() for c in categorias]
+    }
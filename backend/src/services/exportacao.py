@@ -0,0 +1,110 @@
+"""Exportação em streaming (CSV/NDJSON) das tabelas grandes, lendo em lotes."""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from src.models import db
+from src.models.financeiro import Transacao
+from src.models.membro import Membro, PagamentoMensalidade
+from src.models.estoque import Material, MovimentacaoEstoque
+from src.services.paginacao import aplicar_filtros
+
+LOTE = 1000
+
+# Colunas, joins, filtros e ordenação de cada entidade exportável
+ENTIDADES = {
+    'transacoes': {
+        'colunas': [
+            Transacao.id, Transacao.data, Transacao.descricao, Transacao.valor, Transacao.tipo,
+            Transacao.categoria, Transacao.subcategoria, Transacao.membro_id, Transacao.created_at
+        ],
+        'joins': [],
+        'filtros': {'tipo': Transacao.tipo, 'categoria': Transacao.categoria, 'membro_id': Transacao.membro_id},
+        'coluna_data': Transacao.data,
+        'ordem': [Transacao.data, Transacao.id]
+    },
+    'pagamentos': {
+        'colunas': [
+            PagamentoMensalidade.id, PagamentoMensalidade.membro_id, Membro.nome.label('membro_nome'),
+            PagamentoMensalidade.mes_referencia, PagamentoMensalidade.valor_pago,
+            PagamentoMensalidade.data_pagamento, PagamentoMensalidade.observacoes, PagamentoMensalidade.created_at
+        ],
+        'joins': [(Membro, PagamentoMensalidade.membro_id == Membro.id)],
+        'filtros': {'membro_id': PagamentoMensalidade.membro_id, 'mes_referencia': PagamentoMensalidade.mes_referencia},
+        'coluna_data': PagamentoMensalidade.data_pagamento,
+        'ordem': [PagamentoMensalidade.data_pagamento, PagamentoMensalidade.id]
+    },
+    'movimentacoes': {
+        'colunas': [
+            MovimentacaoEstoque.id, MovimentacaoEstoque.material_id, Material.nome.label('material_nome'),
+            MovimentacaoEstoque.tipo_movimentacao, MovimentacaoEstoque.quantidade, MovimentacaoEstoque.motivo,
+            MovimentacaoEstoque.observacoes, MovimentacaoEstoque.data_movimentacao, MovimentacaoEstoque.created_at
+        ],
+        'joins': [(Material, MovimentacaoEstoque.material_id == Material.id)],
+        'filtros': {
+            'material_id': MovimentacaoEstoque.material_id,
+            'tipo_movimentacao': MovimentacaoEstoque.tipo_movimentacao
+        },
+        'coluna_data': MovimentacaoEstoque.data_movimentacao,
+        'ordem': [MovimentacaoEstoque.data_movimentacao, MovimentacaoEstoque.id]
+    }
+}
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def _valor(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def montar_query(entidade, args):
+    config = ENTIDADES[entidade]
+    query = db.session.query(*config['colunas'])
+    for modelo, condicao in config['joins']:
+        query = query.outerjoin(modelo, condicao)
+    query = aplicar_filtros(query, args, config['filtros'], coluna_data=config['coluna_data'])
+    return query.order_by(*config['ordem'])
+
+
+def gerar_linhas(query, formato):
+    """Gera o arquivo em blocos de LOTE linhas, lendo o cursor aos poucos."""
+    nomes = [coluna['name'] for coluna in query.column_descriptions]
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if formato == 'csv':
+        escritor.writerow(nomes)
+
+    pendentes = 0
+    for row in query.yield_per(LOTE):
+        if formato == 'csv':
+            escritor.writerow([_valor(v) for v in row])
+        else:
+            buffer.write(json.dumps(dict(zip(nomes, map(_valor, row))), ensure_ascii=False))
+            buffer.write('\n')
+        pendentes += 1
+        if pendentes >= LOTE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pendentes = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def comprimir(blocos):
+    # wbits=31 produz o formato gzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for bloco in blocos:
+        dados = compressor.compress(bloco)
+        if dados:
+            yield dados
+    yield compressor.flush()
@@ -0,0 +1,160 @@
+"""Extrato de mensalidades por membro: meses esperados x pagamentos.
+
+A série de meses vem de um CTE recursivo (um calendário só, do primeiro mês
+de ingresso até o fim do período) juntado a cada membro a partir do seu mês
+de ingresso; cobranças e pagamentos entram por LEFT JOIN nos índices únicos
+(membro_id, mes_referencia). O extrato de todos os membros sai numa única
+consulta agregada.
+
+O valor esperado do mês é o da cobrança gerada, quando existe (preserva o
+valor da época); senão, a mensalidade atual do membro. Pagamentos de meses
+fora do período não entram. Um membro sem data de ingresso nem de cadastro
+é cobrado a partir do início do período (ou só no último mês, sem início).
+
+Os campos seguem /membros/inadimplentes: `meses_em_aberto` é a lista dos
+meses não quitados (em aberto ou parciais) e `meses_devidos`, quantos são.
+"""
+from sqlalchemy import text
+from src.models.dinheiro import ZERO, Dinheiro
+from src.models.membro import db
+from src.services.inadimplencia import mes_atual, validar_mes
+
+SQL_LINHAS = """
+WITH RECURSIVE membros_extrato AS (
+    SELECT id, nome, valor_mensalidade,
+           COALESCE(strftime('%Y-%m', COALESCE(data_ingresso, created_at)), :mes_inicio, :mes_fim) AS mes_ingresso
+    FROM membros WHERE {filtro_membros}
+),
+calendario(mes) AS (
+    SELECT COALESCE(:mes_inicio, (SELECT MIN(mes_ingresso) FROM membros_extrato), :mes_fim)
+    UNION ALL
+    SELECT strftime('%Y-%m', mes || '-01', '+1 month') FROM calendario WHERE mes < :mes_fim
+),
+linhas AS (
+    SELECT m.id AS membro_id, c.mes,
+           COALESCE(cb.valor_esperado, m.valor_mensalidade, 0) AS valor_esperado,
+           COALESCE(p.valor_pago, 0) AS valor_pago,
+           p.data_pagamento
+    FROM membros_extrato m
+    JOIN calendario c ON c.mes >= m.mes_ingresso AND c.mes <= :mes_fim
+    LEFT JOIN cobrancas_mensalidade cb ON cb.membro_id = m.id AND cb.mes_referencia = c.mes
+    LEFT JOIN pagamentos_mensalidade p ON p.membro_id = m.id AND p.mes_referencia = c.mes
+)
+"""
+
+SQL_EXTRATO = SQL_LINHAS + """
+SELECT mes, valor_esperado, valor_pago, data_pagamento FROM linhas ORDER BY mes
+"""
+
+SQL_EXTRATOS = SQL_LINHAS + """
+SELECT m.id AS membro_id, m.nome, m.valor_mensalidade,
+       COUNT(l.mes) AS meses_esperados,
+       COALESCE(SUM(l.valor_esperado > 0 AND l.valor_pago >= l.valor_esperado), 0) AS meses_pagos,
+       COALESCE(SUM(l.valor_pago > 0 AND l.valor_pago < l.valor_esperado), 0) AS meses_parciais,
+       COALESCE(SUM(l.valor_pago < l.valor_esperado), 0) AS meses_devidos,
+       group_concat(CASE WHEN l.valor_pago < l.valor_esperado THEN l.mes END) AS lista_em_aberto,
+       COALESCE(SUM(l.valor_esperado), 0) AS total_esperado,
+       COALESCE(SUM(l.valor_pago), 0) AS total_pago,
+       COALESCE(SUM(MAX(l.valor_esperado - l.valor_pago, 0)), 0) AS valor_devido
+FROM membros_extrato m
+LEFT JOIN linhas l ON l.membro_id = m.id
+GROUP BY m.id
+{having}
+ORDER BY m.nome, m.id
+"""
+
+# Colunas monetárias do SQL textual vêm em centavos
+TIPOS = {
+    'valor_mensalidade': Dinheiro, 'valor_esperado': Dinheiro, 'valor_pago': Dinheiro,
+    'total_esperado': Dinheiro, 'total_pago': Dinheiro, 'valor_devido': Dinheiro
+}
+
+
+def periodo_da_requisicao(args):
+    """(mes_inicio ou None, mes_fim) de ?mes_inicio=&mes_fim=; o fim padrão é o mês atual."""
+    inicio = args.get('mes_inicio')
+    fim = validar_mes(args.get('mes_fim') or mes_atual())
+    if inicio:
+        validar_mes(inicio)
+        if inicio > fim:
+            raise ValueError('mes_inicio deve ser anterior ou igual a mes_fim')
+    return inicio, fim
+
+
+def _executar(modelo, filtro_membros, parametros, having=''):
+    sql = modelo.format(filtro_membros=filtro_membros, having=having)
+    colunas = {nome: tipo for nome, tipo in TIPOS.items() if nome in sql}
+    return db.session.execute(text(sql).columns(**colunas), parametros).all()
+
+
+def _situacao(esperado, pago):
+    if esperado <= 0:
+        return 'isento'
+    if pago >= esperado:
+        return 'pago'
+    return 'parcial' if pago > 0 else 'em_aberto'
+
+
+def extrato_membro(membro, mes_inicio=None, mes_fim=None):
+    """Extrato mês a mês de um membro, com os totais do período."""
+    mes_fim = mes_fim or mes_atual()
+    linhas = _executar(SQL_EXTRATO, 'id = :membro_id', {
+        'membro_id': membro.id, 'mes_inicio': mes_inicio, 'mes_fim': mes_fim
+    })
+    meses = [
+        {
+            'mes': linha.mes,
+            'valor_esperado': linha.valor_esperado,
+            'valor_pago': linha.valor_pago,
+            'data_pagamento': linha.data_pagamento,
+            'situacao': _situacao(linha.valor_esperado, linha.valor_pago)
+        }
+        for linha in linhas
+    ]
+    total_esperado = sum((m['valor_esperado'] for m in meses), ZERO)
+    total_pago = sum((m['valor_pago'] for m in meses), ZERO)
+    em_aberto = [m['mes'] for m in meses if m['situacao'] in ('parcial', 'em_aberto')]
+    return {
+        'membro_id': membro.id,
+        'nome': membro.nome,
+        'valor_mensalidade': membro.valor_mensalidade,
+        'mes_inicio': meses[0]['mes'] if meses else mes_inicio,
+        'mes_fim': mes_fim,
+        'meses_esperados': len(meses),
+        'meses_pagos': sum(1 for m in meses if m['situacao'] == 'pago'),
+        'meses_parciais': sum(1 for m in meses if m['situacao'] == 'parcial'),
+        'meses_em_aberto': em_aberto,
+        'meses_devidos': len(em_aberto),
+        'total_esperado': total_esperado,
+        'total_pago': total_pago,
+        'valor_devido': sum((max(m['valor_esperado'] - m['valor_pago'], ZERO) for m in meses), ZERO),
+        'saldo': total_pago - total_esperado,
+        'meses': meses
+    }
+
+
+def extratos(mes_inicio=None, mes_fim=None, incluir_inativos=False, somente_devedores=False):
+    """Totais do extrato de todos os membros, numa única consulta."""
+    linhas = _executar(
+        SQL_EXTRATOS,
+        '1 = 1' if incluir_inativos else 'ativo = 1',
+        {'mes_inicio': mes_inicio, 'mes_fim': mes_fim or mes_atual()},
+        having='HAVING valor_devido > 0' if somente_devedores else ''
+    )
+    return [
+        {
+            'membro_id': linha.membro_id,
+            'nome': linha.nome,
+            'valor_mensalidade': linha.valor_mensalidade,
+            'meses_esperados': linha.meses_esperados,
+            'meses_pagos': linha.meses_pagos,
+            'meses_parciais': linha.meses_parciais,
+            'meses_em_aberto': sorted(linha.lista_em_aberto.split(',')) if linha.lista_em_aberto else [],
+            'meses_devidos': linha.meses_devidos,
+            'total_esperado': linha.total_esperado,
+            'total_pago': linha.total_pago,
+            'valor_devido': linha.valor_devido,
+            'saldo': linha.total_pago - linha.total_esperado
+        }
+        for linha in linhas
+    ]
@@ -0,0 +1,193 @@
+"""Posição de estoque em qualquer data, reaplicando o livro de movimentações.
+
+Entradas e saídas são deltas, mas um 'ajuste' grava a quantidade absoluta.
+Por isso a quantidade de um material num instante é: o último ajuste até
+ali (ou o snapshot anterior, ou zero) mais os deltas posteriores a ele.
+
+Snapshots mensais (snapshots_estoque) guardam a quantidade de cada material
+antes do primeiro dia de cada mês; uma consulta parte do snapshot mais
+recente e reaplica só a cauda de movimentações. Cada snapshot novo é
+calculado a partir do anterior, então gerar um mês custa um mês de livro.
+
+A valorização usa o preco_unitario atual, já que o preço não tem histórico.
+"""
+from datetime import date, datetime, timedelta
+from sqlalchemy import DateTime, bindparam, text
+from src.models.dinheiro import ZERO, de_centavos, multiplicar
+from src.models.estoque import MovimentacaoEstoque, SnapshotEstoque, db
+
+TOLERANCIA = 1e-6
+
+SQL_REPLAY = """
+WITH cauda AS (
+    SELECT id, material_id, data_movimentacao, tipo_movimentacao, quantidade
+    FROM movimentacoes_estoque
+    WHERE {filtro_cauda}
+),
+ultimo_ajuste AS (
+    SELECT material_id, id, data_movimentacao, quantidade FROM (
+        SELECT material_id, id, data_movimentacao, quantidade,
+               ROW_NUMBER() OVER (PARTITION BY material_id ORDER BY data_movimentacao DESC, id DESC) AS ordem
+        FROM cauda WHERE tipo_movimentacao = 'ajuste'
+    ) WHERE ordem = 1
+),
+deltas AS (
+    SELECT c.material_id,
+           SUM(CASE WHEN c.tipo_movimentacao = 'entrada' THEN c.quantidade ELSE -c.quantidade END) AS delta
+    FROM cauda c LEFT JOIN ultimo_ajuste u ON u.material_id = c.material_id
+    WHERE c.tipo_movimentacao != 'ajuste'
+      AND (u.id IS NULL OR c.data_movimentacao > u.data_movimentacao
+           OR (c.data_movimentacao = u.data_movimentacao AND c.id > u.id))
+    GROUP BY c.material_id
+)
+SELECT m.id AS material_id, m.nome, m.categoria, m.unidade_medida, m.preco_unitario, m.ativo,
+       m.quantidade_atual,
+       COALESCE(u.quantidade, s.quantidade, 0) + COALESCE(d.delta, 0) AS quantidade
+FROM materiais m
+LEFT JOIN snapshots_estoque s ON s.material_id = m.id AND s.data_corte = :corte
+LEFT JOIN ultimo_ajuste u ON u.material_id = m.id
+LEFT JOIN deltas d ON d.material_id = m.id
+WHERE {filtro_materiais}
+ORDER BY m.categoria, m.nome, m.id
+"""
+
+
+def ultimo_corte(fim=None):
+    """Data do snapshot mais recente que não passa de `fim` (ou None)."""
+    query = db.session.query(db.func.max(SnapshotEstoque.data_corte))
+    if fim is not None:
+        query = query.filter(SnapshotEstoque.data_corte <= fim)
+    return query.scalar()
+
+
+def reaplicar(fim=None, material_ids=None, categoria=None, usar_snapshots=True, incluir_sem_historico=False):
+    """Quantidade de cada material considerando as movimentações antes de `fim`.
+
+    Sem `fim`, reaplica o livro inteiro (o que deveria bater com quantidade_atual).
+    Retorna (linhas, data do snapshot usado, movimentações reaplicadas).
+    """
+    corte = ultimo_corte(fim) if usar_snapshots else None
+    parametros = {'corte': corte, 'fim': fim}
+    filtro_cauda = ['data_movimentacao IS NOT NULL']
+    if corte is not None:
+        filtro_cauda.append('data_movimentacao >= :corte')
+    if fim is not None:
+        filtro_cauda.append('data_movimentacao < :fim')
+    filtro_materiais = [] if incluir_sem_historico else [
+        '(s.material_id IS NOT NULL OR u.material_id IS NOT NULL OR d.material_id IS NOT NULL)'
+    ]
+    if material_ids:
+        filtro_cauda.append('material_id IN :material_ids')
+        filtro_materiais.append('m.id IN :material_ids')
+        parametros['material_ids'] = list(material_ids)
+    if categoria:
+        filtro_materiais.append('m.categoria = :categoria')
+        parametros['categoria'] = categoria
+
+    def _sql(modelo, **partes):
+        sql = modelo.format(**partes)
+        tipos = [
+            bindparam('corte', type_=DateTime),
+            bindparam('fim', type_=DateTime),
+            bindparam('material_ids', expanding=True)
+        ]
+        return text(sql).bindparams(*[b for b in tipos if f':{b.key}' in sql])
+
+    linhas = db.session.execute(_sql(
+        SQL_REPLAY,
+        filtro_cauda=' AND '.join(filtro_cauda),
+        filtro_materiais=' AND '.join(filtro_materiais) or '1 = 1'
+    ), parametros).all()
+    reaplicadas = db.session.execute(_sql(
+        'SELECT COUNT(*) FROM movimentacoes_estoque WHERE {filtro_cauda}', filtro_cauda=' AND '.join(filtro_cauda)
+    ), parametros).scalar()
+    return linhas, corte, reaplicadas
+
+
+def posicao_em(dia, material_ids=None, categoria=None):
+    """Estoque e valorização ao fim do dia `dia` (inclusive)."""
+    fim = datetime.combine(dia + timedelta(days=1), datetime.min.time())
+    linhas, corte, reaplicadas = reaplicar(fim, material_ids, categoria)
+    materiais = [
+        {
+            'material_id': linha.material_id,
+            'nome': linha.nome,
+            'categoria': linha.categoria,
+            'unidade_medida': linha.unidade_medida,
+            'quantidade': linha.quantidade,
+            'preco_unitario': de_centavos(linha.preco_unitario),
+            'valor': multiplicar(de_centavos(linha.preco_unitario), linha.quantidade)
+        }
+        for linha in linhas
+    ]
+    return {
+        'data': dia.isoformat(),
+        'valor_total': sum((material['valor'] for material in materiais), ZERO),
+        'snapshot': corte.isoformat() if corte else None,
+        'movimentacoes_reaplicadas': reaplicadas,
+        'materiais': materiais
+    }
+
+
+def _proximo_mes(dia):
+    return date(dia.year + dia.month // 12, dia.month % 12 + 1, 1)
+
+
+def gerar_snapshots(ate=None):
+    """Cria os snapshots mensais que faltam até o 1º dia do mês de `ate` (inclusive).
+
+    Retorna as datas de corte criadas. Só cria cortes no passado: como novas
+    movimentações recebem a data atual, um snapshot gerado não muda mais.
+    """
+    ate = ate or datetime.utcnow().date()
+    limite = date(ate.year, ate.month, 1)
+    anterior = ultimo_corte()
+    if anterior is not None:
+        dia = _proximo_mes(anterior.date())
+    else:
+        primeira = db.session.query(db.func.min(MovimentacaoEstoque.data_movimentacao)).scalar()
+        if primeira is None:
+            return []
+        dia = _proximo_mes(primeira.date())
+
+    criados = []
+    tabela = SnapshotEstoque.__table__
+    while dia <= limite:
+        corte = datetime.combine(dia, datetime.min.time())
+        linhas, _, _ = reaplicar(corte)
+        if linhas:
+            db.session.execute(tabela.insert(), [
+                {'data_corte': corte, 'material_id': linha.material_id, 'quantidade': linha.quantidade}
+                for linha in linhas
+            ])
+            criados.append(corte)
+        dia = _proximo_mes(dia)
+    db.session.commit()
+    return criados
+
+
+def verificar_consistencia(completo=False):
+    """Compara quantidade_atual com o livro reaplicado, para todos os materiais.
+
+    Com `completo`, ignora os snapshots e reaplica desde a primeira
+    movimentação (útil para validar os próprios snapshots).
+    """
+    linhas, corte, reaplicadas = reaplicar(usar_snapshots=not completo, incluir_sem_historico=True)
+    divergentes = [
+        {
+            'material_id': linha.material_id,
+            'nome': linha.nome,
+            'ativo': bool(linha.ativo),
+            'quantidade_atual': linha.quantidade_atual,
+            'quantidade_livro': linha.quantidade,
+            'diferenca': (linha.quantidade_atual or 0) - linha.quantidade
+        }
+        for linha in linhas
+        if abs((linha.quantidade_atual or 0) - linha.quantidade) > TOLERANCIA
+    ]
+    return {
+        'verificados': len(linhas),
+        'divergentes': divergentes,
+        'snapshot': corte.isoformat() if corte else None,
+        'movimentacoes_reaplicadas': reaplicadas
+    }
@@ -0,0 +1,237 @@
+"""Validação e inserção em lote para a importação de dados históricos."""
+import csv
+import io
+from collections import defaultdict
+from datetime import datetime
+from src.models import db
+from src.models.dinheiro import ZERO, para_decimal
+from src.models.financeiro import Transacao
+from src.models.membro import Membro
+from src.models.estoque import Material, MovimentacaoEstoque
+from src.services import resumo_financeiro
+from src.services.alteracoes import registrar
+from src.services.auditoria import anotar
+from src.services.estoque import somar_ao_resumo
+
+TAMANHO_LOTE = 5000
+
+
+def _texto(valor):
+    return str(valor).strip()
+
+
+def _numero(valor):
+    if isinstance(valor, str):
+        valor = valor.strip().replace(',', '.')
+    return float(valor)
+
+
+def _data(valor):
+    return datetime.strptime(str(valor).strip()[:10], '%Y-%m-%d').date()
+
+
+def _data_hora(valor):
+    valor = str(valor).strip()
+    if len(valor) == 10:
+        return datetime.strptime(valor, '%Y-%m-%d')
+    return datetime.fromisoformat(valor)
+
+
+def _booleano(valor):
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in ('1', 'true', 'sim', 's')
+
+
+def _inteiro(valor):
+    return int(valor)
+
+
+def _tipo_transacao(valor):
+    valor = _texto(valor).lower()
+    if valor not in ('receita', 'despesa'):
+        raise ValueError("deve ser 'receita' ou 'despesa'")
+    return valor
+
+
+# campo -> (conversor, obrigatório)
+ESQUEMAS = {
+    'transacoes': (Transacao, {
+        'descricao': (_texto, True),
+        'valor': (para_decimal, True),
+        'tipo': (_tipo_transacao, True),
+        'categoria': (_texto, True),
+        'subcategoria': (_texto, False),
+        'data': (_data_hora, False),
+        'membro_id': (_inteiro, False)
+    }),
+    'membros': (Membro, {
+        'nome': (_texto, True),
+        'telefone': (_texto, False),
+        'email': (_texto, False),
+        'endereco': (_texto, False),
+        'data_nascimento': (_data, False),
+        'data_ingresso': (_data, False),
+        'valor_mensalidade': (para_decimal, False),
+        'ativo': (_booleano, False),
+        'observacoes': (_texto, False)
+    }),
+    'materiais': (Material, {
+        'nome': (_texto, True),
+        'descricao': (_texto, False),
+        'categoria': (_texto, True),
+        'subcategoria': (_texto, False),
+        'unidade_medida': (_texto, False),
+        'preco_unitario': (para_decimal, True),
+        'quantidade_atual': (_numero, False),
+        'quantidade_minima': (_numero, False),
+        'fornecedor': (_texto, False),
+        'local_armazenamento': (_texto, False),
+        'observacoes': (_texto, False)
+    })
+}
+
+
+# campo -> modelo referenciado; ids inexistentes viram erro da linha
+REFERENCIAS = {
+    'membro_id': Membro
+}
+
+
+def ler_csv(conteudo):
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode('utf-8-sig')
+    return list(csv.DictReader(io.StringIO(conteudo)))
+
+
+def _padrao(modelo, campo, agora):
+    """O valor que o INSERT do ORM usaria para um campo omitido."""
+    coluna = modelo.__table__.c[campo]
+    padrao = coluna.default
+    if padrao is None:
+        return None
+    if padrao.is_scalar:
+        return padrao.arg
+    # Datas padrão (utcnow) ficam iguais em todo o lote
+    if isinstance(coluna.type, db.DateTime):
+        return agora
+    if isinstance(coluna.type, db.Date):
+        return agora.date()
+    return padrao.arg(None)
+
+
+def validar(entidade, registros):
+    """Retorna (linhas válidas, erros por linha). Linhas são numeradas a partir de 1."""
+    modelo, campos = ESQUEMAS[entidade]
+    validas, numeros, erros = [], [], []
+    agora = datetime.utcnow()
+    for numero, registro in enumerate(registros, start=1):
+        if not isinstance(registro, dict):
+            erros.append({'linha': numero, 'erros': ['registro deve ser um objeto']})
+            continue
+
+        linha, problemas = {}, []
+        for campo, (converter, obrigatorio) in campos.items():
+            valor = registro.get(campo)
+            if valor is None or (isinstance(valor, str) and not valor.strip()):
+                if obrigatorio:
+                    problemas.append(f'{campo}: obrigatório')
+                else:
+                    # executemany exige as mesmas chaves em todas as linhas do lote
+                    linha[campo] = _padrao(modelo, campo, agora)
+                continue
+            try:
+                linha[campo] = converter(valor)
+            except (TypeError, ValueError) as e:
+                problemas.append(f'{campo}: {e}')
+
+        if problemas:
+            erros.append({'linha': numero, 'erros': problemas})
+            continue
+
+        validas.append(linha)
+        numeros.append(numero)
+
+    invalidas = _referencias_inexistentes(campos, validas, numeros)
+    if invalidas:
+        erros.extend({'linha': numero, 'erros': problemas} for numero, problemas in invalidas.items())
+        erros.sort(key=lambda erro: erro['linha'])
+        validas = [linha for linha, numero in zip(validas, numeros) if numero not in invalidas]
+    return validas, erros
+
+
+def _referencias_inexistentes(campos, linhas, numeros):
+    """{número da linha: problemas} das linhas que apontam para ids que não existem."""
+    invalidas = defaultdict(list)
+    for campo, referenciado in REFERENCIAS.items():
+        if campo not in campos:
+            continue
+        ids = {linha[campo] for linha in linhas if linha[campo] is not None}
+        if not ids:
+            continue
+        existentes = set(db.session.scalars(db.select(referenciado.id).where(referenciado.id.in_(ids))))
+        for linha, numero in zip(linhas, numeros):
+            if linha[campo] is not None and linha[campo] not in existentes:
+                invalidas[numero].append(f'{campo}: {linha[campo]} não existe')
+    return invalidas
+
+
+def _lotes(linhas):
+    for inicio in range(0, len(linhas), TAMANHO_LOTE):
+        yield linhas[inicio:inicio + TAMANHO_LOTE]
+
+
+def _auditar_insercoes(tabela, ids, linhas):
+    for registro_id, linha in zip(ids, linhas):
+        anotar(tabela, registro_id, 'insert', depois=dict(linha, id=registro_id))
+
+
+def inserir(entidade, linhas):
+    """Insere as linhas com executemany em lotes, na transação da sessão atual."""
+    modelo, _ = ESQUEMAS[entidade]
+    tabela = modelo.__table__
+
+    if entidade == 'materiais':
+        # Precisa dos ids para registrar a movimentação de estoque inicial
+        for lote in _lotes(linhas):
+            ids = db.session.execute(
+                tabela.insert().returning(tabela.c.id, sort_by_parameter_order=True), lote
+            ).scalars().all()
+            movimentacoes = [
+                {
+                    'material_id': material_id,
+                    'tipo_movimentacao': 'entrada',
+                    'quantidade': linha['quantidade_atual'],
+                    'motivo': 'Estoque inicial'
+                }
+                for material_id, linha in zip(ids, lote) if linha.get('quantidade_atual', 0) > 0
+            ]
+            registrar('materiais', ids, 'insert')
+            _auditar_insercoes('materiais', ids, lote)
+            somar_ao_resumo(ids)
+            if movimentacoes:
+                ids_movimentacoes = db.session.execute(
+                    MovimentacaoEstoque.__table__.insert().returning(
+                        MovimentacaoEstoque.id, sort_by_parameter_order=True
+                    ), movimentacoes
+                ).scalars().all()
+                registrar('movimentacoes_estoque', ids_movimentacoes, 'insert')
+                _auditar_insercoes('movimentacoes_estoque', ids_movimentacoes, movimentacoes)
+        return len(linhas)
+
+    for lote in _lotes(linhas):
+        ids = db.session.execute(
+            tabela.insert().returning(tabela.c.id, sort_by_parameter_order=True), lote
+        ).scalars().all()
+        registrar(tabela.name, ids, 'insert')
+        _auditar_insercoes(tabela.name, ids, lote)
+
+    if entidade == 'transacoes':
+        deltas = defaultdict(lambda: [ZERO, 0])
+        for linha in linhas:
+            chave = (linha['data'].strftime('%Y-%m'), linha['tipo'], linha['categoria'])
+            deltas[chave][0] += linha['valor']
+            deltas[chave][1] += 1
+        for chave, (soma, contagem) in deltas.items():
+            resumo_financeiro.aplicar_delta(chave, soma, contagem)
+    return len(linhas)
@@ -0,0 +1,116 @@
+import json
+import re
+from datetime import datetime
+from src.models.dinheiro import ZERO, Dinheiro
+from src.models.membro import CobrancaMensalidade, Membro, PagamentoMensalidade, db
+
+MES_REGEX = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+def mes_atual():
+    return datetime.now().strftime('%Y-%m')
+
+
+def validar_mes(mes):
+    if not mes or not MES_REGEX.match(mes):
+        raise ValueError(f'Mês inválido: {mes!r} (formato esperado: YYYY-MM)')
+    return mes
+
+
+def meses_entre(inicio, fim):
+    """Lista os meses (YYYY-MM) entre inicio e fim, inclusive."""
+    validar_mes(inicio)
+    validar_mes(fim)
+    if inicio > fim:
+        raise ValueError('mes_inicio deve ser anterior ou igual a mes_fim')
+
+    ano, mes = int(inicio[:4]), int(inicio[5:])
+    meses = []
+    while True:
+        atual = f'{ano:04d}-{mes:02d}'
+        meses.append(atual)
+        if atual == fim:
+            return meses
+        mes += 1
+        if mes > 12:
+            ano, mes = ano + 1, 1
+
+
+def meses_da_requisicao(args):
+    """Resolve os meses a partir de ?mes_referencia= ou ?mes_inicio=&mes_fim=."""
+    if args.get('mes_inicio') or args.get('mes_fim'):
+        inicio = args.get('mes_inicio') or args.get('mes_fim')
+        fim = args.get('mes_fim') or args.get('mes_inicio')
+        return meses_entre(inicio, fim)
+    return [validar_mes(args.get('mes_referencia') or mes_atual())]
+
+
+def _query_inadimplencia(meses):
+    # Membros ativos x meses pedidos, com a cobrança e o pagamento de cada mês
+    # por LEFT JOIN nos índices únicos (membro_id, mes_referencia), agregados
+    # por membro numa consulta só. O valor esperado é o da cobrança, quando o
+    # mês já foi cobrado, senão a mensalidade atual; pagamento parcial continua
+    # devendo a diferença. Meses anteriores ao ingresso não contam, e um membro
+    # sem data nenhuma deve desde o primeiro mês pedido: a mesma regra do
+    # extrato (src/services/extratos.py).
+    mes = db.func.json_each(json.dumps(sorted(set(meses)))).table_valued('value').alias('meses')
+    ingresso = db.func.strftime('%Y-%m', db.func.coalesce(Membro.data_ingresso, Membro.created_at))
+    esperado = db.func.coalesce(CobrancaMensalidade.valor_esperado, Membro.valor_mensalidade)
+    pago = db.func.coalesce(PagamentoMensalidade.valor_pago, 0)
+    return db.session.query(
+        Membro,
+        db.func.count().label('meses_devidos'),
+        db.type_coerce(db.func.sum(esperado - pago), Dinheiro).label('valor_devido'),
+        db.func.group_concat(mes.c.value).label('lista_em_aberto')
+    ).select_from(Membro).join(mes, db.true()).outerjoin(
+        CobrancaMensalidade,
+        db.and_(CobrancaMensalidade.membro_id == Membro.id, CobrancaMensalidade.mes_referencia == mes.c.value)
+    ).outerjoin(
+        PagamentoMensalidade,
+        db.and_(PagamentoMensalidade.membro_id == Membro.id, PagamentoMensalidade.mes_referencia == mes.c.value)
+    ).filter(
+        Membro.ativo == True,
+        db.or_(ingresso.is_(None), mes.c.value >= ingresso),
+        esperado > 0,
+        pago < esperado
+    ).group_by(Membro.id)
+
+
+def listar_inadimplentes(meses):
+    """Membros ativos com mensalidade em aberto (ou paga em parte) em algum dos meses informados."""
+    resultado = []
+    for membro, meses_devidos, valor_devido, lista_em_aberto in _query_inadimplencia(meses).order_by(Membro.nome).all():
+        item = membro.to_dict()
+        item['meses_em_aberto'] = sorted(lista_em_aberto.split(','))
+        item['meses_devidos'] = meses_devidos
+        item['valor_devido'] = valor_devido
+        resultado.append(item)
+    return resultado
+
+
+def contar_inadimplentes(meses):
+    subquery = _query_inadimplencia(meses).with_entities(Membro.id).subquery()
+    return db.session.query(db.func.count()).select_from(subquery).scalar() or 0
+
+
+def resumo_membros():
+    """Corpo de /resumo-membros: totais de membros e adimplência do mês atual."""
+    total_membros = Membro.query.filter_by(ativo=True).count()
+    
+    # Receita mensal esperada
+    receita_esperada = db.session.query(db.func.sum(Membro.valor_mensalidade)).filter_by(ativo=True).scalar() or ZERO
+    
+    # Receita do mês atual
+    mes = mes_atual()
+    receita_mes = db.session.query(db.func.sum(PagamentoMensalidade.valor_pago)).filter_by(mes_referencia=mes).scalar() or ZERO
+    
+    # Membros inadimplentes
+    inadimplentes = contar_inadimplentes([mes])
+    
+    return {
+        'total_membros': total_membros,
+        'receita_esperada_mensal': receita_esperada,
+        'receita_mes_atual': receita_mes,
+        'membros_inadimplentes': inadimplentes,
+        'percentual_adimplencia': ((total_membros - inadimplentes) / total_membros * 100) if total_membros > 0 else 0
+    }
@@ -0,0 +1,312 @@
+"""Jobs em segundo plano para exportações e relatórios demorados.
+
+O estado de cada job fica na tabela `jobs`, então qualquer worker do
+gunicorn responde status, download e cancelamento; a execução acontece no
+pool de threads do processo que recebeu o pedido. O resultado vai para um
+arquivo em JOBS_DIR e some depois de JOBS_RETENCAO_HORAS (ou antes, se o
+total passar de JOBS_MAX_MB).
+
+Cancelar um job pendente é imediato; um job em execução recebe o pedido e
+para no próximo relato de progresso.
+
+O estado do job é sempre gravado numa conexão própria e curta: a sessão do
+job pode estar no meio de uma leitura em streaming (exportação), e no SQLite
+um UPDATE na mesma transação dessa leitura esbarra no lock. Cada job guarda o
+pid do processo que o executa; quando um worker sobe (o gunicorn recicla os
+workers a cada max_requests), os jobs de processos que já não existem são
+marcados como falhos na hora, sem esperar TIMEOUT_ORFAO.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.models.job import Job, db
+from src.services import exportacao, historico_estoque, inadimplencia, relatorios
+
+ESTADOS_FINAIS = ('concluido', 'falhou', 'cancelado')
+INTERVALO_PROGRESSO = 1.0  # segundos entre gravações de progresso
+TIMEOUT_ORFAO = timedelta(hours=1)  # sem notícias há mais que isso: o processo morreu
+ERRO_ORFAO = 'Interrompido: o processo que executava o job parou'
+
+TIPOS = {}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+class JobCancelado(Exception):
+    pass
+
+
+def tipo_job(nome, validar=None):
+    """Registra `executar(contexto, parametros, arquivo)` como um tipo de job.
+
+    `validar(parametros)` roda na requisição e deve levantar ValueError;
+    `executar` escreve o resultado em `arquivo` (binário) e retorna
+    (nome do arquivo, mimetype).
+    """
+    def registrar(executar):
+        TIPOS[nome] = (validar or (lambda parametros: None), executar)
+        return executar
+    return registrar
+
+
+class Contexto:
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._ultima_gravacao = 0
+
+    def progresso(self, fracao, mensagem=None):
+        """Grava o progresso (no máximo uma vez por INTERVALO_PROGRESSO) e
+        levanta JobCancelado se alguém pediu o cancelamento."""
+        agora = time.monotonic()
+        if agora - self._ultima_gravacao < INTERVALO_PROGRESSO and fracao < 1:
+            return
+        self._ultima_gravacao = agora
+        with db.engine.begin() as conn:
+            conn.execute(Job.__table__.update().where(Job.id == self.job_id).values(
+                progresso=max(0, min(fracao, 1)), mensagem=mensagem, atualizado_em=datetime.utcnow()
+            ))
+            cancelar = conn.execute(select(Job.cancelar).where(Job.id == self.job_id)).scalar()
+        if cancelar:
+            raise JobCancelado()
+
+
+def _obter_executor():
+    # Um pool por processo; depois de um fork o pool herdado não tem threads
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config['JOBS_WORKERS'], thread_name_prefix='job'
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def submeter(tipo, parametros):
+    if tipo not in TIPOS:
+        raise ValueError(f'tipo inválido: {tipo} (use {", ".join(sorted(TIPOS))})')
+    if not isinstance(parametros, dict):
+        raise ValueError('parametros deve ser um objeto')
+    validar, _ = TIPOS[tipo]
+    validar(parametros)
+
+    limpar_expirados()
+    job = Job(
+        id=uuid.uuid4().hex, tipo=tipo, parametros=json.dumps(parametros),
+        estado='pendente', progresso=0, cancelar=False, processo=os.getpid()
+    )
+    db.session.add(job)
+    db.session.commit()
+    _obter_executor().submit(_executar, current_app._get_current_object(), job.id)
+    return job
+
+
+def _atualizar(job_id, **valores):
+    with db.engine.begin() as conn:
+        conn.execute(Job.__table__.update().where(Job.id == job_id).values(
+            atualizado_em=datetime.utcnow(), **valores
+        ))
+
+
+def _remover_arquivo(caminho):
+    if caminho and os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def _executar(app, job_id):
+    with app.app_context():
+        agora = datetime.utcnow()
+        # Só um executor assume o job, e nunca um que já foi cancelado
+        assumido = Job.query.filter_by(id=job_id, estado='pendente').update({
+            'estado': 'executando', 'processo': os.getpid(), 'iniciado_em': agora, 'atualizado_em': agora
+        })
+        db.session.commit()
+        if not assumido:
+            return
+
+        job = db.session.get(Job, job_id)
+        _, executar = TIPOS[job.tipo]
+        parametros = json.loads(job.parametros)
+        db.session.commit()  # não segura a transação de leitura durante a execução
+        diretorio = app.config['JOBS_DIR']
+        os.makedirs(diretorio, exist_ok=True)
+        parcial = os.path.join(diretorio, f'{job_id}.part')
+        retencao = timedelta(hours=app.config['JOBS_RETENCAO_HORAS'])
+
+        try:
+            with open(parcial, 'wb') as arquivo:
+                nome_arquivo, mimetype = executar(Contexto(job_id), parametros, arquivo)
+            final = os.path.join(diretorio, job_id)
+            os.replace(parcial, final)
+            fim = datetime.utcnow()
+            _atualizar(
+                job_id, estado='concluido', progresso=1, mensagem=None, arquivo=final,
+                nome_arquivo=nome_arquivo, mimetype=mimetype, tamanho=os.path.getsize(final),
+                concluido_em=fim, expira_em=fim + retencao
+            )
+        except JobCancelado:
+            db.session.rollback()
+            _remover_arquivo(parcial)
+            fim = datetime.utcnow()
+            _atualizar(job_id, estado='cancelado', concluido_em=fim, expira_em=fim + retencao)
+        except Exception as e:
+            app.logger.exception('Job %s (%s) falhou', job_id, job.tipo)
+            db.session.rollback()
+            _remover_arquivo(parcial)
+            fim = datetime.utcnow()
+            _atualizar(job_id, estado='falhou', erro=str(e), concluido_em=fim, expira_em=fim + retencao)
+
+
+def cancelar(job):
+    """Cancela um job pendente na hora; num job em execução, só sinaliza."""
+    if job.estado == 'pendente':
+        agora = datetime.utcnow()
+        retencao = timedelta(hours=current_app.config['JOBS_RETENCAO_HORAS'])
+        Job.query.filter_by(id=job.id, estado='pendente').update({
+            'estado': 'cancelado', 'cancelar': True, 'concluido_em': agora,
+            'expira_em': agora + retencao, 'atualizado_em': agora
+        })
+    elif job.estado == 'executando':
+        Job.query.filter_by(id=job.id).update({'cancelar': True})
+    db.session.commit()
+    db.session.refresh(job)
+    return job
+
+
+def excluir(job):
+    _remover_arquivo(job.arquivo)
+    db.session.delete(job)
+    db.session.commit()
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, mas é de outro usuário
+    return True
+
+
+def marcar_orfaos(agora=None):
+    """Marca como falhos os jobs pendentes/em execução cujo processo não existe mais.
+
+    Retorna quantos jobs foram marcados.
+    """
+    agora = agora or datetime.utcnow()
+    ativos = db.session.query(Job.id, Job.processo).filter(
+        Job.estado.in_(('pendente', 'executando')), Job.processo.isnot(None)
+    ).all()
+    orfaos = [job_id for job_id, pid in ativos if pid != os.getpid() and not _processo_vivo(pid)]
+    if orfaos:
+        retencao = timedelta(hours=current_app.config['JOBS_RETENCAO_HORAS'])
+        Job.query.filter(Job.id.in_(orfaos), Job.estado.in_(('pendente', 'executando'))).update({
+            'estado': 'falhou', 'erro': ERRO_ORFAO, 'concluido_em': agora,
+            'expira_em': agora + retencao, 'atualizado_em': agora
+        }, synchronize_session=False)
+    db.session.commit()
+    return len(orfaos)
+
+
+def limpar_expirados(agora=None):
+    """Remove resultados vencidos, marca órfãos como falhos e respeita JOBS_MAX_MB.
+
+    Retorna quantos jobs foram removidos.
+    """
+    agora = agora or datetime.utcnow()
+    retencao = timedelta(hours=current_app.config['JOBS_RETENCAO_HORAS'])
+
+    marcar_orfaos(agora)
+
+    # Sem pid (ou de outra máquina): só o tempo sem notícias indica que o processo morreu
+    Job.query.filter(
+        Job.estado.in_(('pendente', 'executando')),
+        Job.atualizado_em < agora - TIMEOUT_ORFAO
+    ).update({
+        'estado': 'falhou', 'erro': ERRO_ORFAO, 'concluido_em': agora, 'expira_em': agora + retencao
+    }, synchronize_session=False)
+
+    remover = Job.query.filter(Job.estado.in_(ESTADOS_FINAIS), Job.expira_em < agora).all()
+
+    limite = current_app.config['JOBS_MAX_MB'] * 1024 * 1024
+    restantes = Job.query.filter(
+        Job.estado == 'concluido', Job.expira_em >= agora
+    ).order_by(Job.concluido_em.desc()).all()
+    ocupado = 0
+    for job in restantes:
+        ocupado += job.tamanho or 0
+        if ocupado > limite:
+            remover.append(job)
+
+    for job in remover:
+        _remover_arquivo(job.arquivo)
+        db.session.delete(job)
+    db.session.commit()
+    return len(remover)
+
+
+# Tipos de job: reaproveitam as mesmas consultas das rotas síncronas
+
+def _escrever_json(arquivo, dados):
+    # O provider do Flask serializa Decimal (dinheiro) como texto, igual às rotas
+    arquivo.write(current_app.json.dumps(dados, ensure_ascii=False).encode('utf-8'))
+
+
+def _validar_exportacao(parametros):
+    if parametros.get('entidade') not in exportacao.ENTIDADES:
+        raise ValueError(f'entidade deve ser uma de {", ".join(exportacao.ENTIDADES)}')
+    if parametros.get('formato', 'csv') not in exportacao.FORMATOS:
+        raise ValueError('formato deve ser csv ou ndjson')
+    exportacao.montar_query(parametros['entidade'], parametros)
+
+
+@tipo_job('exportacao', _validar_exportacao)
+def _exportar(contexto, parametros, arquivo):
+    entidade, formato = parametros['entidade'], parametros.get('formato', 'csv')
+    nome = f'{entidade}.{formato}'
+    # A leitura em streaming tem uma sessão só dela, que nunca escreve
+    with Session(db.engine) as leitura:
+        query = exportacao.montar_query(entidade, parametros).with_session(leitura)
+        total = query.order_by(None).count() or 1
+        blocos = exportacao.gerar_linhas(query, formato)
+        if parametros.get('gzip'):
+            blocos = exportacao.comprimir(blocos)
+            nome += '.gz'
+
+        escritas = 0
+        for bloco in blocos:
+            arquivo.write(bloco)
+            escritas += 1
+            contexto.progresso(escritas * exportacao.LOTE / total, f'{min(escritas * exportacao.LOTE, total)} de {total} linhas')
+    mimetype = 'application/gzip' if parametros.get('gzip') else exportacao.FORMATOS[formato]
+    return nome, mimetype
+
+
+@tipo_job('fluxo_caixa', relatorios.intervalo_da_requisicao)
+def _fluxo_caixa(contexto, parametros, arquivo):
+    inicio, fim, granularidade = relatorios.intervalo_da_requisicao(parametros)
+    _escrever_json(arquivo, relatorios.fluxo_caixa(inicio, fim, granularidade))
+    return f'fluxo-caixa-{inicio.isoformat()}-{fim.isoformat()}.json', 'application/json'
+
+
+@tipo_job('inadimplentes', inadimplencia.meses_da_requisicao)
+def _inadimplentes(contexto, parametros, arquivo):
+    meses = inadimplencia.meses_da_requisicao(parametros)
+    _escrever_json(arquivo, inadimplencia.listar_inadimplentes(meses))
+    return f'inadimplentes-{meses[0]}-{meses[-1]}.json', 'application/json'
+
+
+@tipo_job('consistencia_estoque')
+def _consistencia_estoque(contexto, parametros, arquivo):
+    _escrever_json(arquivo, historico_estoque.verificar_consistencia(bool(parametros.get('completo'))))
+    return 'consistencia-estoque.json', 'application/json'
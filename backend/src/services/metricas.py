@@ -0,0 +1,207 @@
+"""Métricas por endpoint (latência, comandos SQL, tempo de banco) e
+profiling opcional das requisições mais lentas.
+
+Os valores são por processo: com vários workers do gunicorn, cada um
+expõe os próprios contadores em /api/_metrics.
+
+O SQL é contado pelo `ContadorSql` da requisição, guardado num ContextVar.
+Threads que trabalham para a requisição (as seções do dashboard) somam no
+mesmo contador com `medindo(contador_atual())`. Jobs rodam depois que a
+requisição termina e não entram nas métricas de nenhum endpoint.
+
+METRICAS_PROFILE          '1' liga o cProfile em todas as requisições
+METRICAS_PROFILE_DIR      onde gravar os .prof (padrão: src/database/profiles)
+METRICAS_PROFILE_LIMIAR   ms mínimos para uma requisição ser gravada (padrão: 500)
+METRICAS_PROFILE_MAX      quantos arquivos (os mais lentos) manter (padrão: 10)
+"""
+import cProfile
+import heapq
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+from src.config import DATABASE_DIR
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requisicoes = defaultdict(int)  # (endpoint, metodo, status) -> total
+        self.histogramas = defaultdict(lambda: [0] * (len(BUCKETS) + 1))  # (endpoint, metodo) -> contagens
+        self.soma_latencia = defaultdict(float)
+        self.comandos_sql = defaultdict(int)  # endpoint -> total
+        self.tempo_banco = defaultdict(float)
+
+    def registrar(self, endpoint, metodo, status, duracao, comandos, tempo_banco):
+        with self._lock:
+            self.requisicoes[(endpoint, metodo, status)] += 1
+            contagens = self.histogramas[(endpoint, metodo)]
+            for i, limite in enumerate(BUCKETS):
+                if duracao <= limite:
+                    contagens[i] += 1
+                    break
+            else:
+                contagens[-1] += 1
+            self.soma_latencia[(endpoint, metodo)] += duracao
+            self.comandos_sql[endpoint] += comandos
+            self.tempo_banco[endpoint] += tempo_banco
+
+    def limpar(self):
+        with self._lock:
+            for valores in (self.requisicoes, self.histogramas, self.soma_latencia, self.comandos_sql, self.tempo_banco):
+                valores.clear()
+
+    def prometheus(self):
+        """Exporta no formato de texto do Prometheus."""
+        linhas = []
+        with self._lock:
+            linhas += ['# HELP http_requests_total Requisições atendidas.', '# TYPE http_requests_total counter']
+            for (endpoint, metodo, status), total in sorted(self.requisicoes.items()):
+                linhas.append(f'http_requests_total{{endpoint="{endpoint}",method="{metodo}",status="{status}"}} {total}')
+
+            linhas += [
+                '# HELP http_request_duration_seconds Latência das requisições.',
+                '# TYPE http_request_duration_seconds histogram'
+            ]
+            for (endpoint, metodo), contagens in sorted(self.histogramas.items()):
+                rotulos = f'endpoint="{endpoint}",method="{metodo}"'
+                acumulado = 0
+                for limite, contagem in zip(BUCKETS, contagens):
+                    acumulado += contagem
+                    linhas.append(f'http_request_duration_seconds_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+                acumulado += contagens[-1]
+                linhas.append(f'http_request_duration_seconds_bucket{{{rotulos},le="+Inf"}} {acumulado}')
+                linhas.append(f'http_request_duration_seconds_sum{{{rotulos}}} {self.soma_latencia[(endpoint, metodo)]:.6f}')
+                linhas.append(f'http_request_duration_seconds_count{{{rotulos}}} {acumulado}')
+
+            linhas += ['# HELP db_statements_total Comandos SQL executados.', '# TYPE db_statements_total counter']
+            for endpoint, total in sorted(self.comandos_sql.items()):
+                linhas.append(f'db_statements_total{{endpoint="{endpoint}"}} {total}')
+
+            linhas += ['# HELP db_time_seconds_total Tempo gasto no banco.', '# TYPE db_time_seconds_total counter']
+            for endpoint, total in sorted(self.tempo_banco.items()):
+                linhas.append(f'db_time_seconds_total{{endpoint="{endpoint}"}} {total:.6f}')
+        return '\n'.join(linhas) + '\n'
+
+
+class ProfilerLentas:
+    """Mantém em disco o cProfile das N requisições mais lentas."""
+
+    def __init__(self, diretorio, limiar_ms, maximo):
+        self.diretorio = diretorio
+        self.limiar = limiar_ms / 1000
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._mais_lentas = []  # heap mínimo de (duracao, caminho)
+
+    def considerar(self, profiler, endpoint, duracao):
+        if duracao < self.limiar:
+            return
+        with self._lock:
+            if len(self._mais_lentas) >= self.maximo and duracao <= self._mais_lentas[0][0]:
+                return
+            os.makedirs(self.diretorio, exist_ok=True)
+            nome = endpoint.strip('/').replace('/', '_').replace('<', '').replace('>', '').replace(':', '_') or 'raiz'
+            caminho = os.path.join(self.diretorio, f'{nome}-{int(duracao * 1000)}ms-{time.time_ns()}.prof')
+            profiler.dump_stats(caminho)
+            heapq.heappush(self._mais_lentas, (duracao, caminho))
+            if len(self._mais_lentas) > self.maximo:
+                _, removido = heapq.heappop(self._mais_lentas)
+                if os.path.exists(removido):
+                    os.remove(removido)
+
+
+class ContadorSql:
+    """Comandos SQL e tempo de banco de uma requisição."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.comandos = 0
+        self.tempo_banco = 0.0
+
+    def somar(self, duracao):
+        with self._lock:
+            self.comandos += 1
+            self.tempo_banco += duracao
+
+
+metricas = Metricas()
+_contador = ContextVar('metricas_contador', default=None)
+
+
+def contador_atual():
+    return _contador.get()
+
+
+@contextmanager
+def medindo(contador):
+    """Soma ao `contador` o SQL executado neste bloco, em qualquer thread."""
+    token = _contador.set(contador)
+    try:
+        yield
+    finally:
+        _contador.reset(token)
+
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule else 'nao_encontrado'
+
+
+def instalar_metricas(app, engine):
+    profiler_lentas = None
+    if os.environ.get('METRICAS_PROFILE') == '1':
+        profiler_lentas = ProfilerLentas(
+            os.environ.get('METRICAS_PROFILE_DIR', os.path.join(DATABASE_DIR, 'profiles')),
+            int(os.environ.get('METRICAS_PROFILE_LIMIAR', 500)),
+            int(os.environ.get('METRICAS_PROFILE_MAX', 10))
+        )
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('inicio_comando', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        duracao = time.perf_counter() - conn.info['inicio_comando'].pop()
+        contador = _contador.get()
+        if contador is not None:
+            contador.somar(duracao)
+
+    @app.before_request
+    def _iniciar():
+        g.metricas_contador = ContadorSql()
+        _contador.set(g.metricas_contador)
+        if profiler_lentas:
+            g.metricas_profiler = cProfile.Profile()
+            g.metricas_profiler.enable()
+        g.metricas_inicio = time.perf_counter()
+
+    @app.after_request
+    def _guardar_status(response):
+        g.metricas_status = response.status_code
+        return response
+
+    # teardown roda mesmo quando a view levanta exceção (e after_request não)
+    @app.teardown_request
+    def _registrar(erro):
+        if 'metricas_inicio' not in g:
+            return
+        duracao = time.perf_counter() - g.metricas_inicio
+        # A thread do worker atende outras requisições depois desta
+        _contador.set(None)
+        if profiler_lentas:
+            g.metricas_profiler.disable()
+        endpoint = _endpoint()
+        contador = g.metricas_contador
+        metricas.registrar(
+            endpoint, request.method, g.get('metricas_status', 500), duracao,
+            contador.comandos, contador.tempo_banco
+        )
+        if profiler_lentas:
+            profiler_lentas.considerar(g.metricas_profiler, endpoint, duracao)
@@ -0,0 +1,151 @@
+"""Paginação por cursor (keyset) e filtros comuns às rotas de listagem.
+
+O corpo da resposta continua sendo uma lista JSON e o cursor da próxima
+página vai no cabeçalho `X-Next-Cursor` (e em `Link: rel="next"`). Toda
+listagem é limitada: sem ?limit= vale `LIMITE_PADRAO` (ou o `limite_padrao`
+da rota) e nenhum pedido passa de `LIMITE_MAXIMO`. Quem precisa da lista
+inteira segue o cursor (veja `buscarTodas` no frontend).
+
+Colunas que aceitam NULL entram no cursor com a regra de ordenação do
+SQLite (NULL antes de qualquer valor), para que nenhuma linha fique de fora.
+"""
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+from flask import jsonify, request
+from src.models import db
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 500
+
+
+def _serializar_valor(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _deserializar_valor(coluna, valor):
+    if valor is None:
+        return None
+    tipo = coluna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(valores):
+    dados = json.dumps([_serializar_valor(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, colunas):
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise ValueError
+        return [_deserializar_valor(c, v) for c, v in zip(colunas, valores)]
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+
+def ler_limite(args, limite_padrao=LIMITE_PADRAO):
+    try:
+        limite = int(args.get('limit', limite_padrao))
+    except ValueError:
+        raise ValueError('limit deve ser um número inteiro')
+    if limite < 1:
+        raise ValueError('limit deve ser maior que zero')
+    return min(limite, LIMITE_MAXIMO)
+
+
+def _ler_data(valor, nome):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'{nome} inválida (formato esperado: YYYY-MM-DD)')
+
+
+def aplicar_filtros(query, args, filtros=None, coluna_data=None):
+    """Aplica ?data_inicio=&data_fim= (inclusivos) e filtros de igualdade.
+
+    `filtros` mapeia o nome do parâmetro na query string para a coluna.
+    """
+    for parametro, coluna in (filtros or {}).items():
+        valor = args.get(parametro)
+        if valor not in (None, ''):
+            try:
+                valor = _deserializar_valor(coluna, valor)
+            except ValueError:
+                raise ValueError(f'{parametro} inválido')
+            query = query.filter(coluna == valor)
+
+    if coluna_data is not None:
+        if args.get('data_inicio'):
+            query = query.filter(coluna_data >= _ler_data(args['data_inicio'], 'data_inicio'))
+        if args.get('data_fim'):
+            fim = _ler_data(args['data_fim'], 'data_fim') + timedelta(days=1)
+            query = query.filter(coluna_data < fim)
+    return query
+
+
+def _aceita_nulo(coluna):
+    return getattr(coluna, 'nullable', True)
+
+
+def _depois_de(colunas, valores, decrescente):
+    """Filtro das linhas que vêm depois de `valores` na ordem da listagem."""
+    if not any(_aceita_nulo(c) for c in colunas):
+        chave, cursor = db.tuple_(*colunas), db.tuple_(*valores)
+        return chave < cursor if decrescente else chave > cursor
+
+    coluna, valor = colunas[0], valores[0]
+    if valor is None:
+        # NULL é o menor valor: na ordem decrescente nada vem depois dele
+        depois = db.false() if decrescente else coluna.isnot(None)
+        igual = coluna.is_(None)
+    else:
+        depois = db.or_(coluna < valor, coluna.is_(None)) if decrescente else coluna > valor
+        igual = coluna == valor
+    if len(colunas) == 1:
+        return depois
+    return db.or_(depois, db.and_(igual, _depois_de(colunas[1:], valores[1:], decrescente)))
+
+
+def paginar(query, colunas, args, decrescente=False, limite_padrao=LIMITE_PADRAO):
+    """Retorna (itens, próximo cursor) ordenando por `colunas`.
+
+    A última coluna deve ser única (normalmente o id) para desempatar.
+    """
+    ordem = [c.desc() for c in colunas] if decrescente else [c.asc() for c in colunas]
+    limite = ler_limite(args, limite_padrao)
+    if args.get('cursor'):
+        valores = decodificar_cursor(args['cursor'], colunas)
+        query = query.filter(_depois_de(colunas, valores, decrescente))
+
+    itens = query.order_by(*ordem).limit(limite + 1).all()
+
+    proximo = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        ultimo = itens[-1]
+        proximo = codificar_cursor([getattr(ultimo, c.key) for c in colunas])
+    return itens, proximo
+
+
+def resposta_paginada(itens, proximo_cursor, serializar=None):
+    serializar = serializar or (lambda item: item.to_dict())
+    response = jsonify([serializar(item) for item in itens])
+    if proximo_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = proximo_cursor
+        response.headers['X-Next-Cursor'] = proximo_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
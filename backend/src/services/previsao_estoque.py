@@ -0,0 +1,162 @@
+"""Previsão de consumo de materiais e sugestões de reposição por fornecedor.
+
+Cada saída de estoque soma a quantidade em consumo_diario_material (uma linha
+por material e dia) na mesma transação do banco. As taxas de consumo saem de
+uma única agregação sobre esse resumo, que tem no máximo uma linha por
+material por dia da janela, independente do volume de movimentações.
+"""
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, text
+from sqlalchemy.dialects.sqlite import insert
+from src.models.dinheiro import ZERO, multiplicar
+from src.models.estoque import ConsumoDiarioMaterial, Material, db
+
+JANELAS = (7, 30, 90)
+JANELA_PADRAO = 30
+HORIZONTE_PADRAO = 15
+COBERTURA_PADRAO = 30
+
+SQL_RECONSTRUIR = (
+    "INSERT INTO consumo_diario_material (material_id, dia, quantidade) "
+    "SELECT material_id, date(data_movimentacao), SUM(quantidade) "
+    "FROM movimentacoes_estoque "
+    "WHERE tipo_movimentacao = 'saida' AND data_movimentacao IS NOT NULL "
+    "GROUP BY material_id, date(data_movimentacao)"
+)
+
+
+def registrar_consumo(material_id, quantidade, data=None):
+    """Soma uma saída ao consumo do dia (sem commit)."""
+    dia = (data or datetime.utcnow()).strftime('%Y-%m-%d')
+    tabela = ConsumoDiarioMaterial.__table__
+    stmt = insert(tabela).values(material_id=material_id, dia=dia, quantidade=quantidade)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['material_id', 'dia'],
+        set_={'quantidade': tabela.c.quantidade + quantidade}
+    )
+    db.session.execute(stmt)
+
+
+def reconstruir_consumo(conn=None):
+    executar = conn.execute if conn is not None else db.session.execute
+    executar(text('DELETE FROM consumo_diario_material'))
+    executar(text(SQL_RECONSTRUIR))
+
+
+def _inteiro(args, nome, padrao, minimo=1, maximo=365):
+    valor = args.get(nome, padrao)
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'{nome} deve ser um número inteiro')
+    if not minimo <= valor <= maximo:
+        raise ValueError(f'{nome} deve estar entre {minimo} e {maximo}')
+    return valor
+
+
+def parametros(args):
+    """Lê janela, horizonte e cobertura da query string; ValueError se inválidos."""
+    janela = _inteiro(args, 'janela', JANELA_PADRAO)
+    if janela not in JANELAS:
+        raise ValueError(f'janela deve ser uma de {", ".join(map(str, JANELAS))}')
+    return {
+        'janela': janela,
+        'horizonte': _inteiro(args, 'horizonte', HORIZONTE_PADRAO),
+        'cobertura': _inteiro(args, 'cobertura', COBERTURA_PADRAO)
+    }
+
+
+def _inicio(hoje, dias):
+    # A janela de N dias inclui o dia de hoje
+    return (hoje - timedelta(days=dias - 1)).strftime('%Y-%m-%d')
+
+
+def taxas_consumo(categoria=None, hoje=None):
+    """Consumo de cada material ativo em todas as janelas, numa só consulta."""
+    hoje = hoje or datetime.utcnow().date()
+    consumo = ConsumoDiarioMaterial.__table__.c
+    somas = [
+        func.coalesce(func.sum(case((consumo.dia >= _inicio(hoje, dias), consumo.quantidade), else_=0)), 0)
+        .label(f'consumo_{dias}')
+        for dias in JANELAS
+    ]
+    query = db.session.query(
+        Material.id, Material.nome, Material.categoria, Material.unidade_medida, Material.fornecedor,
+        Material.preco_unitario, Material.quantidade_atual, Material.quantidade_minima, *somas
+    ).outerjoin(
+        ConsumoDiarioMaterial.__table__,
+        and_(consumo.material_id == Material.id, consumo.dia >= _inicio(hoje, max(JANELAS)))
+    ).filter(Material.ativo == True).group_by(Material.id)
+    if categoria:
+        query = query.filter(Material.categoria == categoria)
+    return query.all()
+
+
+def _projetar(linha, janela, hoje):
+    taxa = getattr(linha, f'consumo_{janela}') / janela
+    folga = (linha.quantidade_atual or 0) - (linha.quantidade_minima or 0)
+    if folga <= 0:
+        dias = 0
+    elif taxa > 0:
+        dias = math.floor(folga / taxa)
+    else:
+        dias = None
+    return {
+        'material_id': linha.id,
+        'nome': linha.nome,
+        'categoria': linha.categoria,
+        'fornecedor': linha.fornecedor or None,
+        'unidade_medida': linha.unidade_medida,
+        'quantidade_atual': linha.quantidade_atual,
+        'quantidade_minima': linha.quantidade_minima,
+        'consumo': {str(dias_janela): getattr(linha, f'consumo_{dias_janela}') for dias_janela in JANELAS},
+        'taxa_diaria': round(taxa, 4),
+        'dias_ate_minimo': dias,
+        'data_prevista_minimo': (hoje + timedelta(days=dias)).isoformat() if dias is not None else None
+    }
+
+
+def _ordem(item):
+    # Quem atinge o mínimo primeiro vem antes; sem consumo vai para o fim
+    return (item['dias_ate_minimo'] is None, item['dias_ate_minimo'] or 0, item['nome'])
+
+
+def previsao(janela=JANELA_PADRAO, categoria=None, hoje=None):
+    hoje = hoje or datetime.utcnow().date()
+    itens = [_projetar(linha, janela, hoje) for linha in taxas_consumo(categoria, hoje)]
+    return sorted(itens, key=_ordem)
+
+
+def sugestoes_reposicao(janela=JANELA_PADRAO, horizonte=HORIZONTE_PADRAO, cobertura=COBERTURA_PADRAO,
+                        categoria=None, hoje=None):
+    """Materiais que atingem o mínimo em até `horizonte` dias, agrupados por fornecedor.
+
+    A quantidade sugerida mantém o material acima do mínimo durante o
+    horizonte mais `cobertura` dias no ritmo de consumo da janela.
+    """
+    hoje = hoje or datetime.utcnow().date()
+    fornecedores = {}
+    for linha in taxas_consumo(categoria, hoje):
+        item = _projetar(linha, janela, hoje)
+        if item['dias_ate_minimo'] is None or item['dias_ate_minimo'] > horizonte:
+            continue
+        alvo = (linha.quantidade_minima or 0) + item['taxa_diaria'] * (horizonte + cobertura)
+        sugerida = max(alvo - (linha.quantidade_atual or 0), 0)
+        sugerida = math.ceil(sugerida) if linha.unidade_medida in (None, 'unidade') else round(sugerida, 2)
+        if sugerida <= 0:
+            continue
+        item['quantidade_sugerida'] = sugerida
+        item['valor_estimado'] = multiplicar(linha.preco_unitario, sugerida)
+        fornecedores.setdefault(item['fornecedor'], []).append(item)
+
+    grupos = [
+        {
+            'fornecedor': fornecedor,
+            'itens': sorted(itens, key=_ordem),
+            'valor_estimado': sum((item['valor_estimado'] for item in itens), ZERO)
+        }
+        for fornecedor, itens in fornecedores.items()
+    ]
+    # Fornecedor não informado fica por último
+    return sorted(grupos, key=lambda grupo: (grupo['fornecedor'] is None, grupo['fornecedor'] or ''))
@@ -0,0 +1,139 @@
+"""Relatórios financeiros agregados no banco."""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from src.models.dinheiro import ZERO
+from src.models.financeiro import ResumoMensalTransacao, Transacao, db
+
+# granularidade -> formato do strftime (o mesmo no SQLite e no Python)
+FORMATOS_PERIODO = {
+    'dia': '%Y-%m-%d',
+    'semana': '%Y-W%W',
+    'mes': '%Y-%m',
+    'ano': '%Y'
+}
+MAX_PERIODOS = 3660
+
+
+def _ler_data(valor, nome):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'{nome} inválida (formato esperado: YYYY-MM-DD)')
+
+
+def intervalo_da_requisicao(args):
+    """(inicio, fim, granularidade); por padrão os últimos 12 meses, por mês."""
+    granularidade = args.get('granularidade', 'mes')
+    if granularidade not in FORMATOS_PERIODO:
+        raise ValueError('granularidade deve ser dia, semana, mes ou ano')
+
+    fim = _ler_data(args['data_fim'], 'data_fim') if args.get('data_fim') else date.today()
+    if args.get('data_inicio'):
+        inicio = _ler_data(args['data_inicio'], 'data_inicio')
+    else:
+        ano, mes = fim.year, fim.month - 11
+        if mes < 1:
+            ano, mes = ano - 1, mes + 12
+        inicio = date(ano, mes, 1)
+    if inicio > fim:
+        raise ValueError('data_inicio deve ser anterior ou igual a data_fim')
+    return inicio, fim, granularidade
+
+
+def _periodos(inicio, fim, formato):
+    periodos, dia = [], inicio
+    while dia <= fim:
+        chave = dia.strftime(formato)
+        if not periodos or periodos[-1] != chave:
+            periodos.append(chave)
+            if len(periodos) > MAX_PERIODOS:
+                raise ValueError('Intervalo grande demais para a granularidade escolhida')
+        dia += timedelta(days=1)
+    return periodos
+
+
+def _alinhado_ao_mes(inicio, fim):
+    return inicio.day == 1 and (fim + timedelta(days=1)).day == 1
+
+
+def _saldo(query_soma):
+    receitas, despesas = ZERO, ZERO
+    for tipo, valor in query_soma:
+        if tipo == 'receita':
+            receitas += valor or 0
+        elif tipo == 'despesa':
+            despesas += valor or 0
+    return receitas - despesas
+
+
+def saldo_ate(dia):
+    """Saldo de tudo o que aconteceu antes de `dia`: meses fechados vêm do
+    resumo mensal, e só os dias do mês corrente são lidos de `transacoes`."""
+    inicio_mes = dia.replace(day=1)
+    anterior = _saldo(db.session.query(
+        ResumoMensalTransacao.tipo, db.func.sum(ResumoMensalTransacao.soma)
+    ).filter(ResumoMensalTransacao.ano_mes < inicio_mes.strftime('%Y-%m')).group_by(ResumoMensalTransacao.tipo))
+    parcial = _saldo(db.session.query(
+        Transacao.tipo, db.func.sum(Transacao.valor)
+    ).filter(
+        Transacao.data >= datetime.combine(inicio_mes, datetime.min.time()),
+        Transacao.data < datetime.combine(dia, datetime.min.time())
+    ).group_by(Transacao.tipo))
+    return anterior + parcial
+
+
+def fluxo_caixa(inicio, fim, granularidade):
+    """Série de receitas, despesas e saldo por período, em formato colunar."""
+    formato = FORMATOS_PERIODO[granularidade]
+    periodos = _periodos(inicio, fim, formato)
+
+    if granularidade in ('mes', 'ano') and _alinhado_ao_mes(inicio, fim):
+        # Meses inteiros: basta o resumo mensal, sem tocar em transacoes
+        periodo = db.func.substr(ResumoMensalTransacao.ano_mes, 1, 4 if granularidade == 'ano' else 7)
+        linhas = db.session.query(
+            periodo, ResumoMensalTransacao.tipo, ResumoMensalTransacao.categoria,
+            db.func.sum(ResumoMensalTransacao.soma)
+        ).filter(
+            ResumoMensalTransacao.ano_mes >= inicio.strftime('%Y-%m'),
+            ResumoMensalTransacao.ano_mes <= fim.strftime('%Y-%m')
+        ).group_by(periodo, ResumoMensalTransacao.tipo, ResumoMensalTransacao.categoria).all()
+    else:
+        periodo = db.func.strftime(formato, Transacao.data)
+        linhas = db.session.query(
+            periodo, Transacao.tipo, Transacao.categoria, db.func.sum(Transacao.valor)
+        ).filter(
+            Transacao.data >= datetime.combine(inicio, datetime.min.time()),
+            Transacao.data < datetime.combine(fim + timedelta(days=1), datetime.min.time())
+        ).group_by(periodo, Transacao.tipo, Transacao.categoria).all()
+
+    indice = {chave: i for i, chave in enumerate(periodos)}
+    receitas = [ZERO] * len(periodos)
+    despesas = [ZERO] * len(periodos)
+    categorias = {'receita': defaultdict(lambda: [ZERO] * len(periodos)),
+                  'despesa': defaultdict(lambda: [ZERO] * len(periodos))}
+    for chave, tipo, categoria, valor in linhas:
+        i = indice.get(chave)
+        if i is None or tipo not in categorias:
+            continue
+        (receitas if tipo == 'receita' else despesas)[i] += valor
+        categorias[tipo][categoria][i] += valor
+
+    saldo_inicial = saldo_ate(inicio)
+    saldo_periodo, saldo_acumulado, acumulado = [], [], saldo_inicial
+    for receita, despesa in zip(receitas, despesas):
+        saldo_periodo.append(receita - despesa)
+        acumulado += receita - despesa
+        saldo_acumulado.append(acumulado)
+
+    return {
+        'granularidade': granularidade,
+        'data_inicio': inicio.isoformat(),
+        'data_fim': fim.isoformat(),
+        'saldo_inicial': saldo_inicial,
+        'periodos': periodos,
+        'receitas': receitas,
+        'despesas': despesas,
+        'saldo': saldo_periodo,
+        'saldo_acumulado': saldo_acumulado,
+        'categorias': {tipo: dict(valores) for tipo, valores in categorias.items()}
+    }
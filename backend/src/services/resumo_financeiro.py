@@ -0,0 +1,124 @@
+"""Resumo mensal (ano_mes, tipo, categoria) -> soma, contagem das transações.
+
+As rotas de escrita de transações aplicam deltas nesta tabela dentro da
+mesma transação do banco; `reconstruir_resumo` recalcula tudo do zero.
+"""
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert
+from src.models.dinheiro import ZERO
+from src.models.financeiro import ResumoMensalTransacao, db
+from src.services.inadimplencia import meses_entre, validar_mes
+
+SQL_RECONSTRUIR = (
+    "INSERT INTO resumo_mensal_transacoes (ano_mes, tipo, categoria, soma, contagem) "
+    "SELECT strftime('%Y-%m', data), tipo, categoria, SUM(valor), COUNT(*) "
+    "FROM transacoes WHERE data IS NOT NULL "
+    "GROUP BY strftime('%Y-%m', data), tipo, categoria"
+)
+
+
+def chave(transacao):
+    if transacao.data is None:
+        return None
+    return (transacao.data.strftime('%Y-%m'), transacao.tipo, transacao.categoria)
+
+
+def aplicar_delta(chave_resumo, valor, contagem):
+    """Soma `valor`/`contagem` à linha do resumo, criando-a se preciso."""
+    if chave_resumo is None:
+        return
+    ano_mes, tipo, categoria = chave_resumo
+    tabela = ResumoMensalTransacao.__table__
+    stmt = insert(tabela).values(
+        ano_mes=ano_mes, tipo=tipo, categoria=categoria, soma=valor, contagem=contagem
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['ano_mes', 'tipo', 'categoria'],
+        set_={'soma': tabela.c.soma + valor, 'contagem': tabela.c.contagem + contagem}
+    )
+    db.session.execute(stmt)
+    if contagem < 0:
+        db.session.execute(tabela.delete().where(
+            tabela.c.ano_mes == ano_mes,
+            tabela.c.tipo == tipo,
+            tabela.c.categoria == categoria,
+            tabela.c.contagem <= 0
+        ))
+
+
+def registrar_insercao(transacao):
+    aplicar_delta(chave(transacao), transacao.valor, 1)
+
+
+def registrar_remocao(transacao):
+    aplicar_delta(chave(transacao), -transacao.valor, -1)
+
+
+def registrar_alteracao(chave_anterior, valor_anterior, transacao):
+    if chave_anterior == chave(transacao):
+        aplicar_delta(chave_anterior, transacao.valor - valor_anterior, 0)
+    else:
+        aplicar_delta(chave_anterior, -valor_anterior, -1)
+        registrar_insercao(transacao)
+
+
+def reconstruir_resumo(conn=None):
+    """Recalcula o resumo a partir de `transacoes` (comando `reconstruir-resumo`)."""
+    executar = conn.execute if conn is not None else db.session.execute
+    executar(text('DELETE FROM resumo_mensal_transacoes'))
+    executar(text(SQL_RECONSTRUIR))
+
+
+def meses_do_periodo(args):
+    """Intervalo (inicio, fim) de ?periodo=YYYY|YYYY-MM ou ?mes_inicio=&mes_fim=.
+
+    Retorna (None, None) quando nenhum período é informado (todo o histórico).
+    """
+    periodo = args.get('periodo')
+    if periodo:
+        if len(periodo) == 4 and periodo.isdigit():
+            return f'{periodo}-01', f'{periodo}-12'
+        validar_mes(periodo)
+        return periodo, periodo
+    inicio, fim = args.get('mes_inicio'), args.get('mes_fim')
+    if inicio or fim:
+        inicio, fim = inicio or fim, fim or inicio
+        meses_entre(inicio, fim)  # valida formato e ordem
+        return inicio, fim
+    return None, None
+
+
+def resumo_do_periodo(inicio=None, fim=None):
+    """Corpo de /resumo-financeiro: totais e quebra por categoria no período."""
+    receitas_por_categoria = []
+    despesas_por_categoria = []
+    for tipo, categoria, valor in totais_por_categoria(inicio, fim):
+        if tipo == 'receita':
+            receitas_por_categoria.append({'categoria': categoria, 'valor': valor})
+        elif tipo == 'despesa':
+            despesas_por_categoria.append({'categoria': categoria, 'valor': valor})
+    
+    receitas = sum((item['valor'] for item in receitas_por_categoria), ZERO)
+    despesas = sum((item['valor'] for item in despesas_por_categoria), ZERO)
+    
+    return {
+        'receitas': receitas,
+        'despesas': despesas,
+        'saldo': receitas - despesas,
+        'receitas_por_categoria': receitas_por_categoria,
+        'despesas_por_categoria': despesas_por_categoria,
+        'periodo': {'inicio': inicio, 'fim': fim}
+    }
+
+
+def totais_por_categoria(inicio=None, fim=None):
+    query = db.session.query(
+        ResumoMensalTransacao.tipo,
+        ResumoMensalTransacao.categoria,
+        db.func.sum(ResumoMensalTransacao.soma)
+    )
+    if inicio:
+        query = query.filter(ResumoMensalTransacao.ano_mes >= inicio)
+    if fim:
+        query = query.filter(ResumoMensalTransacao.ano_mes <= fim)
+    return query.group_by(ResumoMensalTransacao.tipo, ResumoMensalTransacao.categoria).all()
@@ -0,0 +1,6 @@
+"""Ponto de entrada WSGI de produção: gunicorn -c gunicorn.conf.py src.wsgi:app"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app  # noqa: E402,F401
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+# src.main monta um app no import; sem isto ele usaria o banco real em src/database
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='testes-'), 'app.db')}")
+
+import pytest  # noqa: E402
+from src.main import create_app  # noqa: E402
+from src.models import db  # noqa: E402
+from src.services.cache import cache_respostas  # noqa: E402
+
+
+@pytest.fixture
+def criar_app(tmp_path):
+    """Fábrica de apps, cada um com o seu banco (e a sua auditoria) em tmp_path."""
+    apps = []
+
+    def criar(nome='app.db', **config):
+        cache_respostas.limpar()  # o cache é do processo, não do app
+        app = create_app(dict({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / nome}"}, **config))
+        apps.append(app)
+        return app
+
+    yield criar
+    for app in apps:
+        app.extensions['auditoria'].parar()
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(criar_app):
+    return criar_app()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
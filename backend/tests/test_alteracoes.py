@@ -0,0 +1,27 @@
+import threading
+from src.services import alteracoes
+
+
+def test_filtro_sem_alteracoes_devolve_o_seq_atual(cliente):
+    inicio = cliente.get('/api/changes').get_json()['ultimo_seq']
+    cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30})
+    atual = cliente.get('/api/changes').get_json()['ultimo_seq']
+    assert atual > inicio
+
+    corpo = cliente.get(f'/api/changes?since={inicio}&tabelas=materiais').get_json()
+    assert (corpo['alteracoes'], corpo['ultimo_seq'], corpo['tem_mais']) == ([], atual, False)
+
+
+def test_stream_recusa_clientes_acima_do_limite(monkeypatch, cliente):
+    monkeypatch.setattr(alteracoes, '_vagas_stream', threading.BoundedSemaphore(1))
+    primeiro = cliente.get('/api/changes/stream')
+    assert primeiro.status_code == 200
+
+    recusado = cliente.get('/api/changes/stream')
+    assert recusado.status_code == 503
+    assert 'Retry-After' in recusado.headers
+
+    primeiro.close()  # o cliente desconectou: a vaga volta
+    segundo = cliente.get('/api/changes/stream')
+    assert segundo.status_code == 200
+    segundo.close()
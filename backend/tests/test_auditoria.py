@@ -0,0 +1,29 @@
+import threading
+from src.models import db
+from src.models.membro import Membro
+
+
+def test_commit_fora_do_app_context_vai_para_o_escritor_do_app(app, cliente):
+    with app.app_context():
+        sessao = db.session()
+        membro = Membro(nome='Ana')
+        sessao.add(membro)
+        sessao.flush()
+        membro_id = membro.id
+
+        # O commit numa thread sem app context (como num job ou comando) ainda audita
+        erros = []
+
+        def confirmar():
+            try:
+                sessao.commit()
+            except Exception as erro:
+                erros.append(erro)
+        thread = threading.Thread(target=confirmar)
+        thread.start()
+        thread.join()
+        assert not erros
+
+    assert app.extensions['auditoria'].descarregar()
+    registros = cliente.get(f'/api/auditoria?entidade=membros&registro_id={membro_id}').get_json()
+    assert [r['operacao'] for r in registros] == ['insert']
@@ -0,0 +1,15 @@
+from src.models import db
+from src.models.membro import Membro
+
+
+def test_escrita_fora_da_requisicao_invalida_o_cache(app, cliente):
+    cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30})
+    assert [m['nome'] for m in cliente.get('/api/extratos').get_json()] == ['Ana']
+    assert cliente.get('/api/extratos').headers.get('ETag')
+
+    # Como faria outro worker, a linha de comando ou um job: sem passar pelo blueprint
+    with app.app_context():
+        db.session.add(Membro(nome='Bia', valor_mensalidade=30))
+        db.session.commit()
+
+    assert [m['nome'] for m in cliente.get('/api/extratos').get_json()] == ['Ana', 'Bia']
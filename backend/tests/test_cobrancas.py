@@ -0,0 +1,99 @@
+from sqlalchemy import text
+from src.models import db
+from src.services.inadimplencia import mes_atual
+
+
+def _membro(cliente, nome, mensalidade=30):
+    resposta = cliente.post('/api/membros', json={'nome': nome, 'valor_mensalidade': mensalidade})
+    assert resposta.status_code == 201, resposta.get_json()
+    return resposta.get_json()['id']
+
+
+def _pagar(cliente, membro_id, valor, mes=None):
+    resposta = cliente.post('/api/pagamentos-mensalidade', json={
+        'membro_id': membro_id, 'mes_referencia': mes or mes_atual(), 'valor_pago': valor
+    })
+    assert resposta.status_code == 201, resposta.get_json()
+    return resposta.get_json()['id']
+
+
+def _inadimplentes(cliente):
+    return [
+        (m['nome'], m['meses_em_aberto'], m['meses_devidos'], m['valor_devido'])
+        for m in cliente.get('/api/membros/inadimplentes').get_json()
+    ]
+
+
+def _mensalidades(cliente):
+    return [t for t in cliente.get('/api/transacoes').get_json() if t['categoria'] == 'Mensalidades']
+
+
+def test_inadimplencia_igual_antes_e_depois_da_cobranca(cliente):
+    mes = mes_atual()
+    _pagar(cliente, _membro(cliente, 'Ana'), 30)
+    _pagar(cliente, _membro(cliente, 'Bia'), 10)
+    _membro(cliente, 'Caio')
+    esperado = [('Bia', [mes], 1, '20.00'), ('Caio', [mes], 1, '30.00')]
+    assert _inadimplentes(cliente) == esperado
+
+    assert cliente.post('/api/cobrancas/gerar', json={'mes_referencia': mes}).status_code == 200
+    assert _inadimplentes(cliente) == esperado
+
+    # Quem entra depois da execução também aparece
+    _membro(cliente, 'Davi')
+    assert _inadimplentes(cliente) == esperado + [('Davi', [mes], 1, '30.00')]
+
+
+def test_cobranca_lanca_as_receitas_e_pagamento_posterior_entra_na_hora(cliente):
+    mes = mes_atual()
+    ana, bia = _membro(cliente, 'Ana'), _membro(cliente, 'Bia')
+    _pagar(cliente, ana, 30)
+    assert _mensalidades(cliente) == []  # mês ainda não cobrado
+
+    execucao = cliente.post('/api/cobrancas/gerar', json={'mes_referencia': mes}).get_json()
+    assert execucao['transacoes_lancadas'] == 1
+    receita, = _mensalidades(cliente)
+    assert (receita['valor'], receita['subcategoria'], receita['membro_id']) == ('30.00', mes, ana)
+
+    # Pagamento depois da execução: a receita entra na hora
+    pagamento_id = _pagar(cliente, bia, 30)
+    assert len(_mensalidades(cliente)) == 2
+    assert cliente.get('/api/resumo-financeiro').get_json()['receitas'] == '60.00'
+
+    # Executar de novo não lança outra
+    execucao = cliente.post('/api/cobrancas/gerar', json={'mes_referencia': mes}).get_json()
+    assert execucao['transacoes_lancadas'] == 1
+    assert len(_mensalidades(cliente)) == 2
+
+    assert cliente.delete(f'/api/pagamentos-mensalidade/{pagamento_id}').status_code == 204
+    assert [t['membro_id'] for t in _mensalidades(cliente)] == [ana]
+    assert cliente.get('/api/resumo-financeiro').get_json()['receitas'] == '30.00'
+
+
+def test_receita_lancada_so_muda_pelo_pagamento(cliente):
+    mes = mes_atual()
+    cliente.post('/api/cobrancas/gerar', json={'mes_referencia': mes})
+    pagamento_id = _pagar(cliente, _membro(cliente, 'Ana'), 30)
+    receita, = _mensalidades(cliente)
+    pagamento = cliente.get('/api/pagamentos-mensalidade').get_json()[0]
+    assert (pagamento['id'], pagamento['transacao_id']) == (pagamento_id, receita['id'])
+
+    assert cliente.put(f"/api/transacoes/{receita['id']}", json={'valor': 1}).status_code == 409
+    assert cliente.delete(f"/api/transacoes/{receita['id']}").status_code == 409
+    assert _mensalidades(cliente)[0]['valor'] == '30.00'
+
+    # Mensalidade lançada à mão continua aceita e editável
+    manual = cliente.post('/api/transacoes', json={
+        'descricao': 'Mensalidade avulsa', 'valor': 30, 'tipo': 'receita', 'categoria': 'Mensalidades'
+    })
+    assert manual.status_code == 201
+    assert cliente.put(f"/api/transacoes/{manual.get_json()['id']}", json={'valor': 25}).status_code == 200
+    assert 'Mensalidades' in cliente.get('/api/categorias').get_json()['receita']
+
+
+def test_estorno_encontra_a_receita_pelo_indice(app):
+    with app.app_context():
+        plano = db.session.execute(text(
+            'EXPLAIN QUERY PLAN SELECT id FROM pagamentos_mensalidade WHERE transacao_id = 1'
+        )).all()
+    assert any('ix_pagamentos_transacao' in linha[-1] for linha in plano)
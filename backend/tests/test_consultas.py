@@ -0,0 +1,38 @@
+"""Regressões de desempenho: N+1 nas listagens e uso de índices nas consultas quentes."""
+import pytest
+from benchmarks.contagem_consultas import ROTAS, contar
+from benchmarks.gerador import popular
+from benchmarks.plano_consultas import planos
+from src.models import db
+from src.models.estoque import Material, MovimentacaoEstoque
+from src.models.financeiro import Transacao
+from src.models.membro import Membro, PagamentoMensalidade
+
+
+def test_listagens_executam_numero_fixo_de_comandos(criar_app):
+    linhas_poucos, poucos = contar(criar_app('poucos.db'), 5)
+    linhas_muitos, muitos = contar(criar_app('muitos.db'), 80)
+
+    # Sem dados, qualquer rota passaria
+    assert all(total >= 5 for total in linhas_poucos.values()), linhas_poucos
+    assert all(total >= 80 for total in linhas_muitos.values()), linhas_muitos
+    for rota in ROTAS:
+        assert poucos[rota] == muitos[rota], f'{rota}: {poucos[rota]} comandos com 5 linhas, {muitos[rota]} com 80'
+
+
+@pytest.fixture
+def app_populado(app):
+    volumes = {'membros': 300, 'meses_pagamento': 6, 'transacoes': 5000, 'materiais': 100, 'movimentacoes': 3000}
+    with app.app_context():
+        popular(volumes, progresso=lambda mensagem: None)  # termina com ANALYZE
+        contagens = {modelo: modelo.query.count() for modelo in
+                     (Membro, PagamentoMensalidade, Transacao, Material, MovimentacaoEstoque)}
+    assert all(contagens.values()), contagens
+    return app
+
+
+def test_consultas_quentes_usam_indices(app_populado):
+    with app_populado.app_context(), db.engine.connect() as conn:
+        resultado = planos(conn)
+    varreduras = {nome: ' | '.join(plano) for nome, (plano, ruins) in resultado.items() if ruins}
+    assert not varreduras
@@ -0,0 +1,24 @@
+import gzip
+import os
+from flask import Flask
+from src.services.estaticos import IndiceEstatico
+
+
+def test_variante_mais_antiga_que_o_original_nao_e_servida(tmp_path):
+    original = tmp_path / 'index.html'
+    original.write_text('<p>novo</p>' * 200)
+    variante = tmp_path / 'index.html.gz'
+    variante.write_bytes(gzip.compress(b'<p>antigo</p>' * 200))
+    os.utime(variante, (original.stat().st_mtime - 60,) * 2)  # sobrou de um build anterior
+
+    indice = IndiceEstatico(str(tmp_path))
+    assert indice.arquivos['index.html']['variantes'] == {}
+    with Flask(__name__).test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = indice.servir('index.html')
+        response.direct_passthrough = False
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data(as_text=True).startswith('<p>novo</p>')
+
+    os.utime(variante, (original.stat().st_mtime + 60,) * 2)
+    indice.indexar()
+    assert indice.arquivos['index.html']['variantes'] == {'gzip': str(variante)}
@@ -0,0 +1,54 @@
+from src.models import db
+from src.models.estoque import ResumoEstoqueCategoria
+from src.services.estoque import reconstruir_resumo_estoque
+
+
+def test_ajuste_registra_a_quantidade_anterior_na_auditoria(app, cliente):
+    material = cliente.post('/api/materiais', json={
+        'nome': 'Vela', 'categoria': 'Velas', 'preco_unitario': '2.50', 'quantidade_atual': 7
+    }).get_json()
+    resposta = cliente.post(f"/api/materiais/{material['id']}/movimentar", json={
+        'tipo_movimentacao': 'ajuste', 'quantidade': 3, 'motivo': 'Inventário'
+    })
+    assert resposta.status_code < 400, resposta.get_json()
+
+    assert app.extensions['auditoria'].descarregar()
+    registros = cliente.get(f"/api/auditoria?entidade=materiais&registro_id={material['id']}&operacao=update").get_json()
+    assert registros[0]['antes'] == {'quantidade_atual': 7}
+    assert registros[0]['depois'] == {'quantidade_atual': 3}
+
+
+def _resumo(app):
+    with app.app_context():
+        return {r.categoria: r.to_dict() for r in ResumoEstoqueCategoria.query}
+
+
+def test_resumo_incremental_igual_a_reconstrucao(app, cliente):
+    ids = [cliente.post('/api/materiais', json={
+        'nome': nome, 'categoria': categoria, 'preco_unitario': preco, 'quantidade_atual': quantidade,
+        'quantidade_minima': 5
+    }).get_json()['id'] for nome, categoria, preco, quantidade in [
+        ('Vela', 'Velas', '2.35', 7), ('Vela grande', 'Velas', '4.99', 3), ('Incenso', 'Ervas', '1.15', 10)
+    ]]
+    cliente.post('/api/import/materiais', json=[
+        {'nome': 'Arruda', 'categoria': 'Ervas', 'preco_unitario': '0,75', 'quantidade_atual': 2.5}
+    ])
+    cliente.put(f'/api/materiais/{ids[1]}', json={'categoria': 'Ervas', 'preco_unitario': '5.05'})
+    cliente.post(f'/api/materiais/{ids[0]}/movimentar', json={
+        'tipo_movimentacao': 'saida', 'quantidade': 3, 'motivo': 'Gira'
+    })
+    cliente.post('/api/movimentacoes/lote', json={'movimentacoes': [
+        {'material_id': ids[2], 'tipo_movimentacao': 'ajuste', 'quantidade': 1.5, 'motivo': 'Inventário'},
+        {'material_id': ids[1], 'tipo_movimentacao': 'entrada', 'quantidade': 4, 'motivo': 'Compra'},
+    ]})
+    cliente.post(f'/api/materiais/{ids[0]}/movimentar', json={  # sem saldo: nada muda
+        'tipo_movimentacao': 'saida', 'quantidade': 99, 'motivo': 'Gira'
+    })
+    assert cliente.delete(f'/api/materiais/{ids[0]}').status_code == 204
+
+    incremental = _resumo(app)
+    assert set(incremental) == {'Ervas'}  # Velas ficou sem materiais ativos
+    with app.app_context():
+        reconstruir_resumo_estoque()
+        db.session.commit()
+    assert _resumo(app) == incremental
@@ -0,0 +1,38 @@
+import gzip
+import time
+from src.services import jobs
+
+
+def _importar(cliente):
+    resposta = cliente.post('/api/import/transacoes', json=[
+        {'descricao': f't{i}', 'valor': 1, 'tipo': 'receita', 'categoria': 'Doações', 'data': '2024-01-02'}
+        for i in range(3)
+    ])
+    assert resposta.status_code == 201, resposta.get_json()
+
+
+def test_exportacao_gzip_entrega_um_arquivo_gz(cliente):
+    _importar(cliente)
+    resposta = cliente.get('/api/export/transacoes?gzip=1')
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in resposta.headers
+    assert resposta.headers['Content-Disposition'].endswith('transacoes.csv.gz')
+    assert len(gzip.decompress(resposta.get_data()).decode().splitlines()) == 4
+
+
+def test_job_de_exportacao_gzip_entrega_um_arquivo_gz(cliente):
+    _importar(cliente)
+    job = cliente.post('/api/jobs', json={
+        'tipo': 'exportacao', 'parametros': {'entidade': 'transacoes', 'gzip': True}
+    }).get_json()
+    for _ in range(200):
+        if cliente.get(f"/api/jobs/{job['id']}").get_json()['estado'] in jobs.ESTADOS_FINAIS:
+            break
+        time.sleep(0.05)
+    resposta = cliente.get(f"/api/jobs/{job['id']}/resultado")
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in resposta.headers
+    assert 'transacoes.csv.gz' in resposta.headers['Content-Disposition']
+    assert len(gzip.decompress(resposta.get_data()).decode().splitlines()) == 4
@@ -0,0 +1,49 @@
+from datetime import date
+from src.models import db
+from src.models.membro import Membro
+from src.services.inadimplencia import mes_atual
+
+
+def test_extratos_usam_os_mesmos_campos_de_inadimplentes(cliente):
+    membro = cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30}).get_json()
+    mes = mes_atual()
+
+    inadimplente, = cliente.get('/api/membros/inadimplentes').get_json()
+    extrato = cliente.get(f"/api/membros/{membro['id']}/extrato").get_json()
+    resumo, = cliente.get('/api/extratos').get_json()
+    for item in (inadimplente, extrato, resumo):
+        assert item['meses_em_aberto'] == [mes]
+        assert item['meses_devidos'] == 1
+
+
+def test_membro_sem_datas_conta_a_partir_do_inicio_do_periodo(app, cliente):
+    membro = cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30}).get_json()
+    with app.app_context():
+        db.session.execute(Membro.__table__.update().values(data_ingresso=None, created_at=None))
+        db.session.commit()
+
+    extrato = cliente.get(f"/api/membros/{membro['id']}/extrato?mes_inicio=2024-01&mes_fim=2024-03").get_json()
+    assert [m['mes'] for m in extrato['meses']] == ['2024-01', '2024-02', '2024-03']
+
+    resumo, = cliente.get('/api/extratos?mes_fim=2024-03').get_json()
+    assert resumo['meses_esperados'] == 1
+    assert resumo['meses_em_aberto'] == ['2024-03']
+
+
+def test_inadimplentes_e_extratos_ignoram_meses_antes_do_ingresso(app, cliente):
+    membro = cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30}).get_json()
+    with app.app_context():
+        db.session.execute(Membro.__table__.update().values(data_ingresso=date(2025, 3, 10)))
+        db.session.commit()
+    cliente.post('/api/pagamentos-mensalidade', json={
+        'membro_id': membro['id'], 'mes_referencia': '2025-04', 'valor_pago': 30
+    })
+
+    periodo = 'mes_inicio=2025-01&mes_fim=2025-05'
+    inadimplente, = cliente.get(f'/api/membros/inadimplentes?{periodo}').get_json()
+    resumo, = cliente.get(f'/api/extratos?{periodo}').get_json()
+    extrato = cliente.get(f"/api/membros/{membro['id']}/extrato?{periodo}").get_json()
+    for item in (inadimplente, resumo, extrato):
+        assert item['meses_em_aberto'] == ['2025-03', '2025-05']
+        assert item['meses_devidos'] == 2
+        assert item['valor_devido'] == '60.00'
@@ -0,0 +1,65 @@
+from src.models.financeiro import Transacao
+from src.models.membro import Membro
+
+
+def test_campos_omitidos_recebem_o_padrao_da_coluna(app, cliente):
+    resposta = cliente.post('/api/import/transacoes', json=[
+        {'descricao': 'sem data', 'valor': '10.50', 'tipo': 'receita', 'categoria': 'Doações'},
+        {'descricao': 'com data', 'valor': 1, 'tipo': 'receita', 'categoria': 'Doações', 'data': '2024-01-02'},
+    ])
+    assert resposta.status_code == 201, resposta.get_json()
+    resposta = cliente.post('/api/import/membros', json=[{'nome': 'Ana'}, {'nome': 'Bia', 'valor_mensalidade': 30}])
+    assert resposta.status_code == 201, resposta.get_json()
+
+    with app.app_context():
+        assert Transacao.query.filter(Transacao.data.is_(None)).count() == 0
+        membros = Membro.query.order_by(Membro.nome).all()
+        assert all(m.data_ingresso is not None and m.ativo for m in membros)
+        assert [str(m.valor_mensalidade) for m in membros] == ['0.00', '30.00']
+
+
+def test_resumo_inclui_transacao_importada_sem_data(cliente):
+    cliente.post('/api/import/transacoes', json=[
+        {'descricao': 'sem data', 'valor': 5, 'tipo': 'despesa', 'categoria': 'Outros'}
+    ])
+    assert cliente.get('/api/resumo-financeiro').get_json()['despesas'] == '5.00'
+
+
+def _transacao(descricao, **campos):
+    return dict({'descricao': descricao, 'valor': 1, 'tipo': 'receita', 'categoria': 'Doações',
+                 'data': '2024-01-02'}, **campos)
+
+
+def test_erros_sao_relatados_por_linha_e_as_validas_entram(app, cliente):
+    membro = cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30}).get_json()
+    resposta = cliente.post('/api/import/transacoes', json=[
+        _transacao('ok', membro_id=membro['id']),
+        _transacao('sem valor', valor=None),
+        _transacao('membro inexistente', membro_id=membro['id'] + 99),
+        _transacao('tipo e data ruins', tipo='outro', data='ontem'),
+        _transacao('também ok'),
+    ])
+    assert resposta.status_code == 201
+    corpo = resposta.get_json()
+    assert (corpo['inseridos'], corpo['total']) == (2, 5)
+    assert [erro['linha'] for erro in corpo['erros']] == [2, 3, 4]
+    assert corpo['erros'][0]['erros'] == ['valor: obrigatório']
+    assert corpo['erros'][1]['erros'] == [f"membro_id: {membro['id'] + 99} não existe"]
+    assert len(corpo['erros'][2]['erros']) == 2
+
+    with app.app_context():
+        assert sorted(t.descricao for t in Transacao.query) == ['ok', 'também ok']
+
+
+def test_tudo_ou_nada_nao_insere_nada_se_alguma_linha_falhar(app, cliente):
+    resposta = cliente.post('/api/import/transacoes?modo=tudo_ou_nada', json=[
+        _transacao('ok'),
+        _transacao('membro inexistente', membro_id=42),
+    ])
+    assert resposta.status_code == 400
+    corpo = resposta.get_json()
+    assert (corpo['inseridos'], [erro['linha'] for erro in corpo['erros']]) == (0, [2])
+
+    with app.app_context():
+        assert Transacao.query.count() == 0
+    assert cliente.get('/api/resumo-financeiro').get_json()['receitas'] == '0.00'
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+import time
+from src.models import db
+from src.models.job import Job
+from src.services import exportacao, jobs
+
+
+def _esperar(cliente, job_id, prazo=30):
+    fim = time.monotonic() + prazo
+    while time.monotonic() < fim:
+        job = cliente.get(f'/api/jobs/{job_id}').get_json()
+        if job['estado'] in jobs.ESTADOS_FINAIS:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} não terminou em {prazo}s')
+
+
+def test_exportacao_com_varios_relatos_de_progresso(monkeypatch, cliente):
+    monkeypatch.setattr(jobs, 'INTERVALO_PROGRESSO', 0)  # grava o progresso a cada bloco
+    quantidade = exportacao.LOTE * 2 + 500
+    resposta = cliente.post('/api/import/transacoes', json=[
+        {'descricao': f't{i}', 'valor': 1, 'tipo': 'receita', 'categoria': 'Doações', 'data': '2024-01-02'}
+        for i in range(quantidade)
+    ])
+    assert resposta.status_code == 201, resposta.get_json()
+
+    job = cliente.post('/api/jobs', json={'tipo': 'exportacao', 'parametros': {'entidade': 'transacoes'}}).get_json()
+    job = _esperar(cliente, job['id'])
+    assert job['estado'] == 'concluido', job['erro']
+    assert job['progresso'] == 1
+
+    resultado = cliente.get(f"/api/jobs/{job['id']}/resultado")
+    assert resultado.status_code == 200
+    assert len(resultado.get_data(as_text=True).splitlines()) == quantidade + 1  # + cabeçalho
+
+
+def test_jobs_de_processo_morto_sao_marcados_como_falhos(app):
+    morto = subprocess.Popen([sys.executable, '-c', 'pass'])
+    morto.wait()
+    with app.app_context():
+        db.session.add_all([
+            Job(id='orfao', tipo='exportacao', parametros='{}', estado='executando', progresso=0.5,
+                cancelar=False, processo=morto.pid),
+            Job(id='vivo', tipo='exportacao', parametros='{}', estado='pendente', progresso=0,
+                cancelar=False, processo=None),
+        ])
+        db.session.commit()
+
+        assert jobs.marcar_orfaos() == 1
+        orfao, vivo = db.session.get(Job, 'orfao'), db.session.get(Job, 'vivo')
+        assert (orfao.estado, orfao.erro) == ('falhou', jobs.ERRO_ORFAO)
+        assert orfao.expira_em is not None
+        assert vivo.estado == 'pendente'
@@ -0,0 +1,33 @@
+import sys
+import pytest
+from src.services.metricas import metricas
+
+
+@pytest.fixture(autouse=True)
+def _zerar_metricas():
+    metricas.limpar()  # os contadores são do processo
+    yield
+    metricas.limpar()
+
+
+def test_excecao_na_view_desliga_o_profiler_e_conta_o_500(monkeypatch, tmp_path, criar_app):
+    monkeypatch.setenv('METRICAS_PROFILE', '1')
+    monkeypatch.setenv('METRICAS_PROFILE_DIR', str(tmp_path / 'profiles'))
+    app = criar_app(PROPAGATE_EXCEPTIONS=True)  # a exceção escapa do Flask: after_request não roda
+
+    def falhar():
+        raise RuntimeError('falhou')
+    app.add_url_rule('/api/_falhar', 'falhar', falhar)
+
+    with pytest.raises(RuntimeError):
+        app.test_client().get('/api/_falhar')
+    assert sys.getprofile() is None
+    assert metricas.requisicoes[('/api/_falhar', 'GET', 500)] == 1
+
+
+def test_sql_das_secoes_do_dashboard_conta_para_a_requisicao(cliente):
+    cliente.post('/api/membros', json={'nome': 'Ana', 'valor_mensalidade': 30})
+    metricas.limpar()
+    assert cliente.get('/api/dashboard').status_code == 200
+    # Só o seq_atual() roda na thread da requisição; as três seções, no pool
+    assert metricas.comandos_sql['/api/dashboard'] > 3
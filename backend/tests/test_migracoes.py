@@ -0,0 +1,46 @@
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from src.migrations import MIGRACOES, aplicar_migracoes, versao_atual, versoes_aplicadas
+
+
+def _aplicar_ate(engine, ultima):
+    with engine.begin() as conn:
+        aplicadas = versoes_aplicadas(conn)
+    for versao, nome, funcao in MIGRACOES:
+        if versao > ultima:
+            break
+        if versao in aplicadas:
+            continue
+        with engine.begin() as conn:
+            funcao(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (versao, nome, aplicada_em) VALUES (:v, :n, :d)'),
+                {'v': versao, 'n': nome, 'd': datetime.utcnow()}
+            )
+
+
+def test_migracoes_antigas_usam_o_sql_da_sua_versao(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'antigo.db'}")
+    _aplicar_ate(engine, 1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO materiais (nome, categoria, preco_unitario, quantidade_atual, quantidade_minima, ativo) "
+            "VALUES ('Vela', 'Velas', 2.5, 3, 1, 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO transacoes (descricao, valor, tipo, categoria, data) "
+            "VALUES ('Doação', 10.5, 'receita', 'Doações', '2024-01-02 00:00:00')"
+        ))
+
+    # Até a v9 os valores ainda são FLOAT em reais
+    _aplicar_ate(engine, 9)
+    with engine.begin() as conn:
+        assert conn.execute(text('SELECT valor_total FROM resumo_estoque_categoria')).scalar() == 7.5
+        assert conn.execute(text('SELECT soma FROM resumo_mensal_transacoes')).scalar() == 10.5
+
+    aplicar_migracoes(engine)
+    assert versao_atual(engine) == MIGRACOES[-1][0]
+    with engine.begin() as conn:
+        assert conn.execute(text('SELECT valor_total FROM resumo_estoque_categoria')).scalar() == 750
+        assert conn.execute(text('SELECT soma FROM resumo_mensal_transacoes')).scalar() == 1050
+    engine.dispose()
@@ -0,0 +1,61 @@
+import pytest
+from src.models import db
+from src.models.financeiro import Transacao
+from src.services.paginacao import LIMITE_MAXIMO, LIMITE_PADRAO, paginar
+
+
+def _importar_transacoes(cliente, quantidade):
+    resposta = cliente.post('/api/import/transacoes', json=[
+        {'descricao': f't{i}', 'valor': 1, 'tipo': 'receita', 'categoria': 'Doações',
+         'data': f'2024-01-{i % 28 + 1:02d}'}
+        for i in range(quantidade)
+    ])
+    assert resposta.status_code == 201, resposta.get_json()
+
+
+def test_listagem_sem_limit_devolve_a_primeira_pagina_com_cursor(cliente):
+    _importar_transacoes(cliente, LIMITE_MAXIMO + 20)
+    resposta = cliente.get('/api/transacoes')
+    assert len(resposta.get_json()) == LIMITE_PADRAO
+    assert 'X-Next-Cursor' in resposta.headers
+
+    resposta = cliente.get(f'/api/transacoes?limit={LIMITE_MAXIMO * 10}')
+    assert len(resposta.get_json()) == LIMITE_MAXIMO
+    assert 'X-Next-Cursor' in resposta.headers
+
+
+def test_cursor_percorre_todas_as_transacoes_inclusive_sem_data(app, cliente):
+    _importar_transacoes(cliente, 25)
+    with app.app_context():
+        db.session.execute(Transacao.__table__.update().where(Transacao.id % 4 == 0).values(data=None))
+        db.session.commit()
+        total = Transacao.query.count()
+
+    vistos, url = [], '/api/transacoes?limit=4'
+    while url:
+        resposta = cliente.get(url)
+        assert resposta.status_code == 200, resposta.get_json()
+        vistos += [t['id'] for t in resposta.get_json()]
+        cursor = resposta.headers.get('X-Next-Cursor')
+        url = f'/api/transacoes?limit=4&cursor={cursor}' if cursor else None
+    assert sorted(vistos) == list(range(1, total + 1))
+    assert len(vistos) == total
+
+
+@pytest.mark.parametrize('decrescente', [False, True])
+def test_paginar_com_coluna_nula_nas_duas_ordens(app, cliente, decrescente):
+    _importar_transacoes(cliente, 10)
+    with app.app_context():
+        db.session.execute(Transacao.__table__.update().where(Transacao.id <= 3).values(data=None))
+        db.session.commit()
+        esperado = [t.id for t in paginar(Transacao.query, [Transacao.data, Transacao.id], {}, decrescente)[0]]
+
+        vistos, args = [], {'limit': '3'}
+        while True:
+            itens, cursor = paginar(Transacao.query, [Transacao.data, Transacao.id], args, decrescente)
+            vistos += [t.id for t in itens]
+            if not cursor:
+                break
+            args = {'limit': '3', 'cursor': cursor}
+    assert vistos == esperado
+    assert len(vistos) == 10
@@ -4,3 +4,28 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+// O backend envia valores monetários como texto decimal exato ("10.50")
+export function dinheiro(valor) {
+  return Number(valor ?? 0)
+}
+
+export function formatarDinheiro(valor) {
+  return dinheiro(valor).toFixed(2)
+}
+
+// As listagens da API vêm em páginas; o cursor da próxima está em X-Next-Cursor
+export async function buscarTodas(url, limite = 500) {
+  const itens = []
+  let cursor = null
+  do {
+    const pagina = new URL(url)
+    pagina.searchParams.set('limit', limite)
+    if (cursor) pagina.searchParams.set('cursor', cursor)
+    const response = await fetch(pagina)
+    if (!response.ok) throw new Error(`HTTP ${response.status} em ${pagina}`)
+    itens.push(...await response.json())
+    cursor = response.headers.get('X-Next-Cursor')
+  } while (cursor)
+  return itens
+}
@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { DollarSign, Package, TrendingUp, AlertTriangle, Users, Calendar } from 'lucide-react'
+import { dinheiro, formatarDinheiro } from '@/lib/utils'
 
 export function Dashboard() {
   const [resumoFinanceiro, setResumoFinanceiro] = useState(null)
@@ -11,18 +12,12 @@ export function Dashboard() {
   useEffect(() => {
     const fetchResumos = async () => {
       try {
-        const [financeiroRes, materiaisRes, membrosRes] = await Promise.all([
-          fetch('http://localhost:5000/api/resumo-financeiro'),
-          fetch('http://localhost:5000/api/resumo-estoque'),
-          fetch('http://localhost:5000/api/resumo-membros')
-        ])
-        
-        const financeiro = await financeiroRes.json()
-        const materiais = await materiaisRes.json()
-        const membros = await membrosRes.json()
+        // Os três resumos numa só requisição
+        const response = await fetch('http://localhost:5000/api/dashboard')
+        const { financeiro, estoque, membros } = await response.json()
         
         setResumoFinanceiro(financeiro)
-        setResumoMateriais(materiais)
+        setResumoMateriais(estoque)
         setResumoMembros(membros)
       } catch (error) {
         console.error('Erro ao carregar resumos:', error)
@@ -75,9 +70,9 @@ export function Dashboard() {
           </CardHeader>
           <CardContent>
             <div className={`text-2xl font-bold ${
-              (resumoFinanceiro?.saldo || 0) >= 0 ? 'text-green-600' : 'text-red-600'
+              dinheiro(resumoFinanceiro?.saldo) >= 0 ? 'text-green-600' : 'text-red-600'
             }`}>
-              R$ {resumoFinanceiro?.saldo?.toFixed(2) || '0,00'}
+              R$ {formatarDinheiro(resumoFinanceiro?.saldo)}
             </div>
             <p className="text-xs text-muted-foreground">
               Receitas - Despesas
@@ -128,7 +123,7 @@ export function Dashboard() {
           </CardHeader>
           <CardContent>
             <div className="text-2xl font-bold text-green-600">
-              R$ {resumoMembros?.receita_mes_atual?.toFixed(2) || '0,00'}
+              R$ {formatarDinheiro(resumoMembros?.receita_mes_atual)}
             </div>
             <p className="text-xs text-muted-foreground">
               Mensalidades recebidas
@@ -183,22 +178,22 @@ export function Dashboard() {
             <div className="flex justify-between">
               <span className="text-sm font-medium">Receitas Totais:</span>
               <span className="text-sm text-green-600 font-medium">
-                R$ {resumoFinanceiro?.receitas?.toFixed(2) || '0,00'}
+                R$ {formatarDinheiro(resumoFinanceiro?.receitas)}
               </span>
             </div>
             <div className="flex justify-between">
               <span className="text-sm font-medium">Despesas Totais:</span>
               <span className="text-sm text-red-600 font-medium">
-                R$ {resumoFinanceiro?.despesas?.toFixed(2) || '0,00'}
+                R$ {formatarDinheiro(resumoFinanceiro?.despesas)}
               </span>
             </div>
             <div className="border-t pt-4">
               <div className="flex justify-between">
                 <span className="font-medium">Saldo Atual:</span>
                 <span className={`font-medium ${
-                  (resumoFinanceiro?.saldo || 0) >= 0 ? 'text-green-600' : 'text-red-600'
+                  dinheiro(resumoFinanceiro?.saldo) >= 0 ? 'text-green-600' : 'text-red-600'
                 }`}>
-                  R$ {resumoFinanceiro?.saldo?.toFixed(2) || '0,00'}
+                  R$ {formatarDinheiro(resumoFinanceiro?.saldo)}
                 </span>
               </div>
             </div>
@@ -206,7 +201,7 @@ export function Dashboard() {
               <div className="flex justify-between">
                 <span className="text-sm font-medium">Receita Esperada/Mês:</span>
                 <span className="text-sm font-medium">
-                  R$ {resumoMembros?.receita_esperada_mensal?.toFixed(2) || '0,00'}
+                  R$ {formatarDinheiro(resumoMembros?.receita_esperada_mensal)}
                 </span>
               </div>
             </div>
@@ -230,13 +225,13 @@ export function Dashboard() {
             <div className="flex justify-between">
               <span className="text-sm font-medium">Receita Esperada:</span>
               <span className="text-sm text-green-600 font-medium">
-                R$ {resumoMembros?.receita_esperada_mensal?.toFixed(2) || '0,00'}
+                R$ {formatarDinheiro(resumoMembros?.receita_esperada_mensal)}
               </span>
             </div>
             <div className="flex justify-between">
               <span className="text-sm font-medium">Receita do Mês:</span>
               <span className="text-sm text-blue-600 font-medium">
-                R$ {resumoMembros?.receita_mes_atual?.toFixed(2) || '0,00'}
+                R$ {formatarDinheiro(resumoMembros?.receita_mes_atual)}
               </span>
             </div>
             <div className="border-t pt-4">
@@ -276,7 +271,7 @@ export function Dashboard() {
             </div>
             <div className="text-center">
               <div className="text-2xl font-bold text-green-600">
-                R$ {resumoMateriais?.valor_total_estoque?.toFixed(2) || '0,00'}
+                R$ {formatarDinheiro(resumoMateriais?.valor_total_estoque)}
               </div>
               <div className="text-sm text-muted-foreground">Valor Total</div>
             </div>
@@ -7,6 +7,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog'
 import { Badge } from '@/components/ui/badge'
 import { Plus, DollarSign, TrendingUp, TrendingDown, Trash2, Edit } from 'lucide-react'
+import { buscarTodas, dinheiro, formatarDinheiro } from '@/lib/utils'
 
 export function Financeiro() {
   const [transacoes, setTransacoes] = useState([])
@@ -29,8 +30,7 @@ export function Financeiro() {
 
   const fetchTransacoes = async () => {
     try {
-      const response = await fetch('http://localhost:5000/api/transacoes')
-      const data = await response.json()
+      const data = await buscarTodas('http://localhost:5000/api/transacoes')
       setTransacoes(data)
     } catch (error) {
       console.error('Erro ao carregar transações:', error)
@@ -106,11 +106,11 @@ export function Financeiro() {
 
   const totalReceitas = transacoes
     .filter(t => t.tipo === 'receita')
-    .reduce((sum, t) => sum + t.valor, 0)
+    .reduce((sum, t) => sum + dinheiro(t.valor), 0)
 
   const totalDespesas = transacoes
     .filter(t => t.tipo === 'despesa')
-    .reduce((sum, t) => sum + t.valor, 0)
+    .reduce((sum, t) => sum + dinheiro(t.valor), 0)
 
   const saldo = totalReceitas - totalDespesas
 
@@ -317,7 +317,7 @@ export function Financeiro() {
                     <span className={`font-bold ${
                       transacao.tipo === 'receita' ? 'text-green-600' : 'text-red-600'
                     }`}>
-                      {transacao.tipo === 'receita' ? '+' : '-'} R$ {transacao.valor.toFixed(2)}
+                      {transacao.tipo === 'receita' ? '+' : '-'} R$ {formatarDinheiro(transacao.valor)}
                     </span>
                     <Button
                       variant="outline"
@@ -9,6 +9,7 @@ import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, Di
 import { Badge } from '@/components/ui/badge'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 import { Plus, Package, AlertTriangle, DollarSign, Trash2, Edit, ArrowUpDown, ArrowUp, ArrowDown } from 'lucide-react'
+import { buscarTodas, dinheiro, formatarDinheiro } from '@/lib/utils'
 
 export function Materiais() {
   const [materiais, setMateriais] = useState([])
@@ -47,8 +48,7 @@ export function Materiais() {
 
   const fetchMateriais = async () => {
     try {
-      const response = await fetch('http://192.168.18.150:5000/api/materiais')
-      const data = await response.json()
+      const data = await buscarTodas('http://192.168.18.150:5000/api/materiais')
       setMateriais(data)
     } catch (error) {
       console.error('Erro ao carregar materiais:', error)
@@ -179,7 +179,7 @@ export function Materiais() {
 
   const totalMateriais = materiais.length
   const materiaisBaixoEstoque = materiais.filter(m => m.estoque_baixo).length
-  const valorTotalEstoque = materiais.reduce((sum, m) => sum + m.valor_total, 0)
+  const valorTotalEstoque = materiais.reduce((sum, m) => sum + dinheiro(m.valor_total), 0)
 
   const getMovimentacaoIcon = (tipo) => {
     switch (tipo) {
@@ -470,7 +470,7 @@ export function Materiais() {
                         </div>
                         <p className="text-sm text-muted-foreground">
                           {material.quantidade_atual} {material.unidade_medida} • 
-                          R$ {material.preco_unitario.toFixed(2)}/{material.unidade_medida}
+                          R$ {formatarDinheiro(material.preco_unitario)}/{material.unidade_medida}
                           {material.local_armazenamento && ` • ${material.local_armazenamento}`}
                         </p>
                         {material.descricao && (
@@ -481,7 +481,7 @@ export function Materiais() {
                       </div>
                       <div className="flex items-center gap-4">
                         <div className="text-right">
-                          <div className="font-bold">R$ {material.valor_total.toFixed(2)}</div>
+                          <div className="font-bold">R$ {formatarDinheiro(material.valor_total)}</div>
                           <div className="text-sm text-muted-foreground">
                             Valor total
                           </div>
@@ -8,6 +8,7 @@ import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, Di
 import { Badge } from '@/components/ui/badge'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 import { Plus, Users, DollarSign, AlertTriangle, Trash2, Edit, CreditCard } from 'lucide-react'
+import { buscarTodas, dinheiro, formatarDinheiro } from '@/lib/utils'
 
 export function Membros() {
   const [membros, setMembros] = useState([])
@@ -40,8 +41,7 @@ export function Membros() {
 
   const fetchMembros = async () => {
     try {
-      const response = await fetch('http://localhost:5000/api/membros')
-      const data = await response.json()
+      const data = await buscarTodas('http://localhost:5000/api/membros')
       setMembros(data)
     } catch (error) {
       console.error('Erro ao carregar membros:', error)
@@ -52,8 +52,7 @@ export function Membros() {
 
   const fetchPagamentos = async () => {
     try {
-      const response = await fetch('http://localhost:5000/api/pagamentos-mensalidade')
-      const data = await response.json()
+      const data = await buscarTodas('http://localhost:5000/api/pagamentos-mensalidade')
       setPagamentos(data)
     } catch (error) {
       console.error('Erro ao carregar pagamentos:', error)
@@ -163,10 +162,10 @@ export function Membros() {
   }
 
   const totalMembros = membros.length
-  const receitaEsperada = membros.reduce((sum, m) => sum + m.valor_mensalidade, 0)
+  const receitaEsperada = membros.reduce((sum, m) => sum + dinheiro(m.valor_mensalidade), 0)
   const mesAtual = new Date().toISOString().slice(0, 7)
   const pagamentosMesAtual = pagamentos.filter(p => p.mes_referencia === mesAtual)
-  const receitaMesAtual = pagamentosMesAtual.reduce((sum, p) => sum + p.valor_pago, 0)
+  const receitaMesAtual = pagamentosMesAtual.reduce((sum, p) => sum + dinheiro(p.valor_pago), 0)
 
   if (loading) {
     return (
@@ -221,7 +220,7 @@ export function Membros() {
                     <option value="">Selecione um membro</option>
                     {membros.map((membro) => (
                       <option key={membro.id} value={membro.id}>
-                        {membro.nome} - R$ {membro.valor_mensalidade.toFixed(2)}
+                        {membro.nome} - R$ {formatarDinheiro(membro.valor_mensalidade)}
                       </option>
                     ))}
                   </select>
@@ -451,7 +450,7 @@ export function Membros() {
                           <h3 className="font-medium">{membro.nome}</h3>
                           {membro.valor_mensalidade > 0 && (
                             <Badge variant="outline">
-                              R$ {membro.valor_mensalidade.toFixed(2)}/mês
+                              R$ {formatarDinheiro(membro.valor_mensalidade)}/mês
                             </Badge>
                           )}
                         </div>
@@ -521,7 +520,7 @@ export function Membros() {
                       </div>
                       <div className="flex items-center gap-2">
                         <span className="font-bold text-green-600">
-                          R$ {pagamento.valor_pago.toFixed(2)}
+                          R$ {formatarDinheiro(pagamento.valor_pago)}
                         </span>
                         <Button
                           variant="outline"